@@ -1,73 +1,277 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, Query
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from typing import List
-
-from app import models, schemas, crud
-from app.database import get_db
-from app.auth import get_current_admin_user, get_current_active_user # Import both
-from app.main import templates # Import templates from main.py
-
-router = APIRouter()
-
-# Route to serve the HTML shell for the dashboard
-@router.get("/dashboard", response_class=HTMLResponse)
-async def admin_dashboard_shell(request: Request):
-    # This route loads the page structure.
-    # Client-side JS will verify admin status and fetch data.
-    return templates.TemplateResponse("admin/dashboard.html", {
-        "request": request,
-        "title": "Admin Dashboard"
-        # No user or users_list passed here initially
-    })
-
-# New API endpoint to fetch dashboard data (protected)
-@router.get("/api/dashboard-data")
-async def get_admin_dashboard_data(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user), # Ensures only admin can access
-    search_query: str = Query(None, alias="search")
-):
-    if search_query:
-        user = crud.get_user_by_email(db, email=search_query)
-        users_list = [schemas.User.from_orm(user)] if user else [] # Convert to schema
-    else:
-        users = crud.get_users(db, limit=100)
-        users_list = [schemas.User.from_orm(u) for u in users] # Convert list to schema
-
-    # Return data needed by the dashboard template's JS
-    return {"users_list": users_list, "search_query": search_query, "admin_email": current_user.email}
-
-
-# Route to view specific user details (protected)
-# This serves an HTML page, so it will also need the client-side auth check pattern
-@router.get("/users/{user_id}", response_class=HTMLResponse)
-async def admin_view_user_details_shell(request: Request, user_id: int):
-    # Serve the shell page. JS will fetch details.
-     return templates.TemplateResponse("admin/user_details.html", {
-        "request": request,
-        "user_id": user_id, # Pass user_id for JS to use
-        "title": f"User Details" # Generic title initially
-    })
-
-# New API endpoint to fetch specific user details (protected)
-@router.get("/api/users/{user_id}")
-async def get_admin_user_details_data(
-    user_id: int,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
-):
-    target_user = crud.get_user(db, user_id=user_id)
-    if not target_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user_inputs_orm = crud.get_user_data_inputs_by_user_id(db, user_id=user_id, limit=100)
-    
-    # Convert ORM objects to Pydantic schemas for JSON response
-    target_user_schema = schemas.User.from_orm(target_user)
-    user_inputs_schema = [schemas.UserDataInputResponse.from_orm(item) for item in user_inputs_orm]
-
-    return {
-        "target_user": target_user_schema,
-        "user_inputs": user_inputs_schema
-    }
+import asyncio
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
+
+from app import models, schemas, crud, async_crud
+from app.database import get_async_db
+from app.auth import get_current_admin_user, get_current_active_user # Import both
+from app.main import templates # Import templates from main.py
+from app.services import chatbot_service, data_service, history_export, input_backfill, log_archive, retention
+
+router = APIRouter()
+
+# Route to serve the HTML shell for the dashboard
+@router.get("/dashboard", response_class=HTMLResponse)
+async def admin_dashboard_shell(request: Request):
+    # This route loads the page structure.
+    # Client-side JS will verify admin status and fetch data.
+    return templates.TemplateResponse("admin/dashboard.html", {
+        "request": request,
+        "title": "Admin Dashboard"
+        # No user or users_list passed here initially
+    })
+
+# New API endpoint to fetch dashboard data (protected)
+# Users come a page at a time: pass next_cursor back as ?cursor= for the following page
+@router.get("/api/dashboard-data")
+async def get_admin_dashboard_data(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_admin_user), # Ensures only admin can access
+    search_query: str = Query(None, alias="search"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=crud.MAX_PAGE_SIZE)
+):
+    total_matches = None
+    if search_query and search_query.strip():
+        # Any part of the email, best matches first
+        users, next_cursor = await _page(async_crud.search_users_page(db, search_query, cursor=cursor, limit=limit))
+        total_matches = await async_crud.count_user_search(db, search_query)
+    else:
+        users, next_cursor = await _page(async_crud.get_users_page(db, cursor=cursor, limit=limit))
+    users_list = [schemas.User.from_orm(u) for u in users] # Convert list to schema
+
+    # Return data needed by the dashboard template's JS
+    return {
+        "users_list": users_list,
+        "next_cursor": next_cursor,
+        "total_users": await async_crud.count_users(db),
+        "total_matches": total_matches,
+        "search_query": search_query,
+        "admin_email": current_user.email
+    }
+
+async def _page(query):
+    # Keyset page queries raise ValueError for a cursor they did not issue
+    try:
+        return await query
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Users in id order, or with ?search= the users whose email contains it, best matches first
+@router.get("/api/users", response_model=schemas.UserPage)
+async def get_admin_users_page(
+    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    if search and search.strip():
+        users, next_cursor = await _page(async_crud.search_users_page(db, search, cursor=cursor, limit=limit))
+        return {"users": users, "next_cursor": next_cursor, "total": await async_crud.count_user_search(db, search)}
+    users, next_cursor = await _page(async_crud.get_users_page(db, cursor=cursor, limit=limit))
+    return {"users": users, "next_cursor": next_cursor, "total": await async_crud.count_users(db)}
+
+# Stored inputs newest first, of one user or everyone, optionally filtered on the typed columns
+# (e.g. ?risk_appetite=High&min_salary=100000&min_equity_pct=50); ?archived=true reads the
+# inputs the retention job moved out of the live table instead
+@router.get("/api/inputs", response_model=schemas.UserDataInputPage)
+async def get_admin_inputs_page(
+    user_id: Optional[int] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=crud.MAX_PAGE_SIZE),
+    archived: bool = Query(False),
+    filters: schemas.UserDataInputFilters = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    items, next_cursor = await _page(async_crud.get_user_data_inputs_page(db, user_id=user_id, cursor=cursor, limit=limit, filters=filters, archived=archived))
+    total = await async_crud.count_user_data_inputs(db, user_id=user_id, filters=filters, archived=archived)
+    return {"inputs": items, "next_cursor": next_cursor, "total": total}
+
+# Count and average salary, savings and allocation per risk appetite, lifecycle stage, horizon or model,
+# aggregated in SQL over the typed columns
+@router.get("/api/inputs/summary")
+async def get_admin_inputs_summary(
+    group_by: str = Query("risk_appetite"),
+    filters: schemas.UserDataInputFilters = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    if group_by not in crud.SUMMARY_GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by '{group_by}', expected one of {list(crud.SUMMARY_GROUP_BY)}")
+    return {"group_by": group_by, "groups": await async_crud.summarize_user_data_inputs(db, group_by, filters)}
+
+# Retention: the configured period, the archival job's progress, and a run on demand
+@router.get("/api/retention")
+async def get_admin_retention_status(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return retention.get_retention_status()
+
+@router.post("/api/retention/run")
+async def run_admin_retention(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    if retention.RETENTION_DAYS is None:
+        raise HTTPException(status_code=400, detail="No retention period configured (RETENTION_DAYS is None)")
+    result = await asyncio.to_thread(retention.archive_old_inputs)
+    if "error" in result:
+        raise HTTPException(status_code=409, detail=result["error"])
+    return result
+
+# Typed columns of rows written before they existed: progress of the backfill, and a run on demand
+@router.get("/api/inputs/backfill")
+async def get_admin_inputs_backfill_status(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return input_backfill.get_backfill_status()
+
+@router.post("/api/inputs/backfill")
+async def run_admin_inputs_backfill(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    result = await asyncio.to_thread(input_backfill.backfill_typed_columns)
+    if "error" in result:
+        raise HTTPException(status_code=409, detail=result["error"])
+    return result
+
+
+# Route to view specific user details (protected)
+# This serves an HTML page, so it will also need the client-side auth check pattern
+@router.get("/users/{user_id}", response_class=HTMLResponse)
+async def admin_view_user_details_shell(request: Request, user_id: int):
+    # Serve the shell page. JS will fetch details.
+     return templates.TemplateResponse("admin/user_details.html", {
+        "request": request,
+        "user_id": user_id, # Pass user_id for JS to use
+        "title": f"User Details" # Generic title initially
+    })
+
+# New API endpoint to fetch specific user details (protected)
+@router.get("/api/users/{user_id}")
+async def get_admin_user_details_data(
+    user_id: int,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=crud.MAX_PAGE_SIZE),
+    archived: bool = Query(False), # the user's archived inputs instead of the live ones
+    db: AsyncSession = Depends(get_async_db),
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    target_user = await async_crud.get_user(db, user_id=user_id)
+    if not target_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Newest first, a page at a time
+    user_inputs_orm, next_cursor = await _page(async_crud.get_user_data_inputs_page(db, user_id=user_id, cursor=cursor, limit=limit, archived=archived))
+    
+    # Convert ORM objects to Pydantic schemas for JSON response
+    target_user_schema = schemas.User.from_orm(target_user)
+    user_inputs_schema = [schemas.UserDataInputResponse.from_orm(item) for item in user_inputs_orm]
+
+    return {
+        "target_user": target_user_schema,
+        "user_inputs": user_inputs_schema,
+        "next_cursor": next_cursor,
+        "total_inputs": await async_crud.count_user_data_inputs(db, user_id=user_id, archived=archived),
+        "archived": archived
+    }
+
+
+# Every stored input matching the filters, streamed as NDJSON or CSV straight from a database cursor
+# (end is exclusive; dates are compared with the stored UTC timestamps)
+@router.get("/api/export")
+async def export_admin_user_data_inputs(
+    export_format: str = Query("ndjson", alias="format"),
+    user_id: Optional[int] = Query(None),
+    filters: schemas.UserDataInputFilters = Depends(),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    archived: bool = Query(False),
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    if export_format not in history_export.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{export_format}', expected one of {list(history_export.EXPORT_FORMATS)}")
+    start, end = history_export.as_utc(start), history_export.as_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    filename = history_export.export_filename(export_format, {"user": user_id, "model": filters.model_type, "from": start, "to": end, "source": "archive" if archived else None})
+    return StreamingResponse(
+        history_export.export_user_data_inputs(export_format, user_id, filters, start, end, archived=archived),
+        media_type=history_export.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# Inference metrics (prediction cache counters, active engine and model version)
+@router.get("/api/inference-stats")
+async def get_admin_inference_stats(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return chatbot_service.get_inference_stats()
+
+
+# Model registry: version currently served, its load/warm-up timings and the last reload attempt
+@router.get("/api/models")
+async def get_admin_model_status(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return chatbot_service.model_registry.status()
+
+# Loads the model files on disk as a new version in the background; requests keep being served by
+# the current version until the new one is validated and warmed up. wait=true returns once it is done.
+@router.post("/api/models/reload", status_code=202)
+async def reload_admin_models(
+    wait: bool = Query(False),
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    if not chatbot_service.reload_models_in_background():
+        raise HTTPException(status_code=409, detail="A model reload is already in progress")
+    if wait:
+        await asyncio.to_thread(chatbot_service.model_registry.wait_for_reload)
+    return chatbot_service.model_registry.status()
+
+
+# Background CSV writer: queue depth, rows written, flushes, backpressure and dropped rows
+@router.get("/api/csv-log-stats")
+async def get_admin_csv_log_stats(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return data_service.get_csv_writer_stats()
+
+
+# Batched UserDataInput writer: queue depth, records and transactions written, retries and dropped records
+@router.get("/api/input-writer-stats")
+async def get_admin_input_writer_stats(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return data_service.get_input_writer_stats()
+
+
+# "segmented" CSV mode: append the rows the workers have written to their segments to the CSV now
+@router.post("/api/csv-log/merge")
+async def merge_admin_csv_log_segments(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    result = await asyncio.to_thread(data_service.merge_csv_segments)
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
+
+# Columnar archive of the CSV log: partitions on disk, and compaction of the rows appended since the last run
+@router.get("/api/log-archive")
+async def get_admin_log_archive(
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return {"format": log_archive.archive_format(), "partitions": log_archive.list_partitions()}
+
+@router.post("/api/log-archive/compact")
+async def compact_admin_log_archive(
+    rebuild: bool = Query(False),
+    current_admin: models.User = Depends(get_current_admin_user) # Ensure admin access
+):
+    return await asyncio.to_thread(log_archive.compact_csv, None, None, rebuild)
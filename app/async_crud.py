@@ -0,0 +1,89 @@
+import asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, models, schemas
+from .core.security import get_password_hash
+from typing import Any, Dict, List, Optional, Tuple
+
+# Same functions as crud.py for an AsyncSession (request handlers); crud.py stays the
+# synchronous API for startup code, scripts and background jobs.
+
+# --- User CRUD ---
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    return await db.scalar(select(models.User).where(models.User.id == user_id).limit(1))
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    return await db.scalar(select(models.User).where(models.User.email == email).limit(1))
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.User]:
+    return list(await db.scalars(select(models.User).offset(skip).limit(limit)))
+
+async def get_users_page(db: AsyncSession, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[models.User], Optional[str]]:
+    """One page of users in id order and the cursor of the next page (None on the last page)."""
+    users = list(await db.scalars(crud.users_page_statement(cursor, limit)))
+    return users, crud.next_user_cursor(users, limit)
+
+async def count_users(db: AsyncSession) -> int:
+    return await _count(db, models.User)
+
+async def search_users_page(db: AsyncSession, term: str, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[models.User], Optional[str]]:
+    """One page of the users whose email contains `term`, best matches first, and the next page's cursor."""
+    rows = (await db.execute(crud.user_search_statement(term, cursor, limit, crud.uses_user_search_index(db.get_bind())))).all()
+    return [user for user, _ in rows], crud.next_user_search_cursor(rows, limit)
+
+async def count_user_search(db: AsyncSession, term: str) -> int:
+    return await db.scalar(crud.user_search_count_statement(term, crud.uses_user_search_index(db.get_bind())))
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, is_admin: bool = False) -> models.User:
+    # bcrypt is deliberately slow: hash off the event loop
+    hashed_password = await asyncio.to_thread(get_password_hash, user.password)
+    db_user = models.User(email=user.email, hashed_password=hashed_password, is_admin=is_admin)
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def create_admin_user(db: AsyncSession, user: schemas.UserCreate) -> models.User:
+    return await create_user(db, user, is_admin=True)
+
+# --- UserDataInput CRUD ---
+async def create_user_data_input(db: AsyncSession, item: schemas.UserDataInputCreate, user_id: int) -> models.UserDataInput:
+    db_item = models.UserDataInput(**crud.user_data_input_values(item, user_id))
+    db.add(db_item)
+    await db.commit()
+    await db.refresh(db_item)
+    return db_item
+
+async def get_user_data_inputs_by_user_id(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[models.UserDataInput]:
+    query = select(models.UserDataInput).where(models.UserDataInput.user_id == user_id).offset(skip).limit(limit)
+    return list(await db.scalars(query))
+
+async def get_user_data_inputs_page(
+    db: AsyncSession, user_id: Optional[int] = None, cursor: Optional[str] = None, limit: int = 100,
+    filters: Optional[schemas.UserDataInputFilters] = None, archived: bool = False
+) -> Tuple[List[models.UserDataInput], Optional[str]]:
+    """One page of inputs (or archived inputs), newest first, of one user or everyone, and the cursor of the next page."""
+    items = list(await db.scalars(crud.user_data_inputs_page_statement(user_id, cursor, limit, filters, archived)))
+    return items, crud.next_user_data_input_cursor(items, limit)
+
+async def count_user_data_inputs(
+    db: AsyncSession, user_id: Optional[int] = None, filters: Optional[schemas.UserDataInputFilters] = None, archived: bool = False
+) -> int:
+    return await _count(db, crud.input_model(archived), user_id, filters)
+
+async def _count(db: AsyncSession, model: Any, user_id: Optional[int] = None, filters: Optional[schemas.UserDataInputFilters] = None) -> int:
+    if crud.uses_row_counts(db.get_bind()) and model in crud.ROW_COUNTED_MODELS and not crud.has_filters(filters):
+        return await db.scalar(crud.row_count_statement(model, user_id)) or 0
+    return await db.scalar(crud.full_count_statement(model, user_id, filters))
+
+async def summarize_user_data_inputs(db: AsyncSession, group_by: str, filters: Optional[schemas.UserDataInputFilters] = None) -> List[Dict[str, Any]]:
+    result = await db.execute(crud.user_data_inputs_summary_statement(group_by, filters))
+    return [dict(row._mapping) for row in result]
+
+async def get_all_user_data_inputs(db: AsyncSession, skip: int = 0, limit: int = 1000) -> List[models.UserDataInput]:
+    """
+    Fetches all user data inputs, primarily for admin use.
+    Consider pagination for very large datasets.
+    """
+    query = select(models.UserDataInput).order_by(models.UserDataInput.timestamp.desc()).offset(skip).limit(limit)
+    return list(await db.scalars(query))
@@ -1,48 +1,377 @@
-from sqlalchemy.orm import Session
-from . import models, schemas
-from .core.security import get_password_hash
-from typing import List, Optional
-
-# --- User CRUD ---
-def get_user(db: Session, user_id: int) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.id == user_id).first()
-
-def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.email == email).first()
-
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
-    return db.query(models.User).offset(skip).limit(limit).all()
-
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    hashed_password = get_password_hash(user.password)
-    db_user = models.User(email=user.email, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
-
-def create_admin_user(db: Session, user: schemas.UserCreate) -> models.User:
-    hashed_password = get_password_hash(user.password)
-    db_user = models.User(email=user.email, hashed_password=hashed_password, is_admin=True)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
-
-# --- UserDataInput CRUD ---
-def create_user_data_input(db: Session, item: schemas.UserDataInputCreate, user_id: int) -> models.UserDataInput:
-    db_item = models.UserDataInput(**item.dict(), user_id=user_id)
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
-    return db_item
-
-def get_user_data_inputs_by_user_id(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.UserDataInput]:
-    return db.query(models.UserDataInput).filter(models.UserDataInput.user_id == user_id).offset(skip).limit(limit).all()
-
-def get_all_user_data_inputs(db: Session, skip: int = 0, limit: int = 1000) -> List[models.UserDataInput]:
-    """
-    Fetches all user data inputs, primarily for admin use.
-    Consider pagination for very large datasets.
-    """
-    return db.query(models.UserDataInput).order_by(models.UserDataInput.timestamp.desc()).offset(skip).limit(limit).all()
+import base64
+import json
+from sqlalchemy import bindparam, case, column, delete, func, insert, literal_column, select, table, tuple_, update
+from sqlalchemy.orm import Session
+from . import database, models, schemas
+from .core.security import get_password_hash
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAX_PAGE_SIZE = 500
+
+# --- Keyset pagination ---
+# A page is read with "WHERE (sort key) < (last key of the previous page) ORDER BY ... LIMIT n",
+# which an index on the sort key answers without reading the rows before it (unlike OFFSET).
+# The cursor handed to clients is that last key, opaque (urlsafe base64 of a JSON list).
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Raises ValueError for a cursor that was not produced by encode_cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return values
+
+def users_page_statement(cursor: Optional[str] = None, limit: int = 100):
+    """Users in id order, after the cursor."""
+    query = select(models.User).order_by(models.User.id).limit(limit)
+    if cursor:
+        (after_id,) = decode_cursor(cursor)
+        query = query.where(models.User.id > int(after_id))
+    return query
+
+def input_model(archived: bool = False) -> Any:
+    """The live user_data_inputs table, or the archive the retention job moves old rows to."""
+    return models.UserDataInputArchive if archived else models.UserDataInput
+
+def user_data_inputs_page_statement(
+    user_id: Optional[int] = None, cursor: Optional[str] = None, limit: int = 100,
+    filters: Optional[schemas.UserDataInputFilters] = None, archived: bool = False
+):
+    """Inputs newest first ((timestamp, id) descending), of one user or everyone, after the cursor."""
+    model = input_model(archived)
+    query = filter_user_data_inputs(select(model), filters, model)
+    if user_id is not None:
+        query = query.where(model.user_id == user_id)
+    if cursor:
+        timestamp, after_id = decode_cursor(cursor)
+        try:
+            key = (datetime.fromisoformat(timestamp), int(after_id))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+        query = query.where(tuple_(model.timestamp, model.id) < key)
+    return query.order_by(model.timestamp.desc(), model.id.desc()).limit(limit)
+
+def next_user_cursor(users: List[models.User], limit: int) -> Optional[str]:
+    return encode_cursor([users[-1].id]) if len(users) == limit else None
+
+def next_user_data_input_cursor(items: List[models.UserDataInput], limit: int) -> Optional[str]:
+    if len(items) < limit:
+        return None
+    return encode_cursor([items[-1].timestamp.replace(tzinfo=None).isoformat(), items[-1].id])
+
+def row_count_statement(model: Any, user_id: Optional[int] = None):
+    """Maintained count of a table (or of one user's inputs); see models.RowCount."""
+    scope = model.__tablename__ if user_id is None else f"{model.__tablename__}:user:{user_id}"
+    return select(models.RowCount.row_count).where(models.RowCount.scope == scope)
+
+def full_count_statement(model: Any, user_id: Optional[int] = None, filters: Optional[schemas.UserDataInputFilters] = None):
+    query = select(func.count()).select_from(model)
+    if user_id is not None:
+        query = query.where(model.user_id == user_id)
+    return filter_user_data_inputs(query, filters, model)
+
+def has_filters(filters: Optional[schemas.UserDataInputFilters]) -> bool:
+    return filters is not None and bool(filters.dict(exclude_none=True))
+
+def uses_row_counts(bind: Any) -> bool:
+    return bind.dialect.name == "sqlite" # where database.install_row_counters adds the triggers
+
+ROW_COUNTED_MODELS = (models.User, models.UserDataInput)
+
+# --- User search ---
+# Case-insensitive substring search over email, backed by the users_fts trigram index
+# (database.install_user_search) where available and a LIKE scan elsewhere. Trigrams need 3
+# characters, so shorter terms match as email prefixes (on the lower(email) index).
+# Ranking: exact match, then prefix matches, then the rest; shorter emails first within each.
+USER_SEARCH_MIN_TRIGRAM_CHARS = 3
+users_fts = table("users_fts", column("rowid"))
+
+def uses_user_search_index(bind: Any) -> bool:
+    return bind.dialect.name == "sqlite" and database.user_search_indexed
+
+def _user_search_condition(term: str, indexed: bool):
+    if len(term) < USER_SEARCH_MIN_TRIGRAM_CHARS:
+        # Same case-insensitivity as the trigram index
+        email = func.lower(models.User.email)
+        return (email >= term) & (email < term + "\U0010ffff")
+    if indexed:
+        phrase = '"' + term.replace('"', '""') + '"' # one FTS5 phrase, whatever the term contains
+        return models.User.id.in_(select(users_fts.c.rowid).where(literal_column("users_fts").op("MATCH")(phrase)))
+    return func.lower(models.User.email).contains(term, autoescape=True)
+
+def _user_search_rank(term: str):
+    email = func.lower(models.User.email)
+    return case((email == term, 0), (func.substr(email, 1, len(term)) == term, 1), else_=2)
+
+def user_search_statement(term: str, cursor: Optional[str] = None, limit: int = 100, indexed: bool = True):
+    """(User, rank) rows matching `term` in rank order, after the cursor."""
+    term = term.strip().lower()
+    rank = _user_search_rank(term)
+    sort_key = (rank, func.length(models.User.email), models.User.id)
+    query = select(models.User, rank.label("rank")).where(_user_search_condition(term, indexed))
+    if cursor:
+        try:
+            after = tuple(int(value) for value in decode_cursor(cursor))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+        if len(after) != len(sort_key):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        query = query.where(tuple_(*sort_key) > after)
+    return query.order_by(*sort_key).limit(limit)
+
+def user_search_count_statement(term: str, indexed: bool = True):
+    return select(func.count()).select_from(models.User).where(_user_search_condition(term.strip().lower(), indexed))
+
+def next_user_search_cursor(rows: List[Any], limit: int) -> Optional[str]:
+    if len(rows) < limit:
+        return None
+    user, rank = rows[-1]
+    return encode_cursor([rank, len(user.email), user.id])
+
+# --- Typed UserDataInput columns ---
+# Bump when typed_columns changes, so the backfill job recomputes the rows written before
+TYPED_COLUMNS_VERSION = 1
+TYPED_TEXT_INPUTS = {"lifecycle_stage": "Lifecycle_Stage", "risk_appetite": "Risk_Appetite", "investment_horizon": "Investment_Horizon"}
+TYPED_NUMBER_INPUTS = {"salary": "Salary", "savings": "Savings"}
+# Asset classes by name prefix: the ML models answer "Equity"/"Debt"/"Gold"/"FD/Cash", the rule
+# engine finer classes such as "Equity MFs (International)" or "Fixed Deposits / PPF"
+ALLOCATION_CLASSES = {
+    "equity_pct": ("Equity", "Direct Stocks"),
+    "debt_pct": ("Debt",),
+    "gold_pct": ("Gold",),
+    "cash_pct": ("FD", "Fixed Deposits", "Cash"),
+}
+SUMMARY_GROUP_BY = ("model_type", "lifecycle_stage", "risk_appetite", "investment_horizon")
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def typed_columns(input_data: Optional[Dict[str, Any]], output_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """The typed UserDataInput columns for one record; fields it doesn't have stay None."""
+    inputs = input_data if isinstance(input_data, dict) else {}
+    values: Dict[str, Any] = {column: (str(inputs[key]) if inputs.get(key) is not None else None) for column, key in TYPED_TEXT_INPUTS.items()}
+    values.update({column: _to_float(inputs.get(key)) for column, key in TYPED_NUMBER_INPUTS.items()})
+    allocation = output_data if isinstance(output_data, dict) and "error" not in output_data else None
+    for column, prefixes in ALLOCATION_CLASSES.items():
+        if allocation is None:
+            values[column] = None
+            continue
+        shares = [_to_float(share) for asset, share in allocation.items() if asset.startswith(prefixes)]
+        values[column] = round(sum(share for share in shares if share is not None), 2)
+    values["typed_columns_version"] = TYPED_COLUMNS_VERSION
+    return values
+
+def user_data_input_values(item: schemas.UserDataInputCreate, user_id: int) -> Dict[str, Any]:
+    """Column values of a new UserDataInput row, typed columns included."""
+    return dict(item.dict(), user_id=user_id, **typed_columns(item.input_data, item.output_data))
+
+def filter_user_data_inputs(query, filters: Optional[schemas.UserDataInputFilters], model: Any = models.UserDataInput):
+    """Adds the conditions of `filters` (on the typed columns) to a select of `model` (live or archived inputs)."""
+    if filters is None:
+        return query
+    for column in ("model_type", "lifecycle_stage", "risk_appetite", "investment_horizon"):
+        if getattr(filters, column) is not None:
+            query = query.where(getattr(model, column) == getattr(filters, column))
+    if filters.min_salary is not None:
+        query = query.where(model.salary >= filters.min_salary)
+    if filters.max_salary is not None:
+        query = query.where(model.salary <= filters.max_salary)
+    if filters.min_equity_pct is not None:
+        query = query.where(model.equity_pct >= filters.min_equity_pct)
+    if filters.max_equity_pct is not None:
+        query = query.where(model.equity_pct <= filters.max_equity_pct)
+    return query
+
+def user_data_inputs_summary_statement(group_by: str, filters: Optional[schemas.UserDataInputFilters] = None):
+    """Count and averages of the typed columns per value of `group_by` (one of SUMMARY_GROUP_BY)."""
+    model = models.UserDataInput
+    key = getattr(model, group_by)
+    query = select(
+        key.label("value"),
+        func.count().label("count"),
+        func.avg(model.salary).label("avg_salary"),
+        func.avg(model.savings).label("avg_savings"),
+        func.avg(model.equity_pct).label("avg_equity_pct"),
+        func.avg(model.debt_pct).label("avg_debt_pct"),
+        func.avg(model.gold_pct).label("avg_gold_pct"),
+        func.avg(model.cash_pct).label("avg_cash_pct"),
+    )
+    return filter_user_data_inputs(query, filters).group_by(key).order_by(func.count().desc())
+
+# --- User CRUD ---
+def get_user(db: Session, user_id: int) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.id == user_id).first()
+
+def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
+    return db.query(models.User).offset(skip).limit(limit).all()
+
+def get_users_page(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[models.User], Optional[str]]:
+    """One page of users in id order and the cursor of the next page (None on the last page)."""
+    users = list(db.scalars(users_page_statement(cursor, limit)))
+    return users, next_user_cursor(users, limit)
+
+def count_users(db: Session) -> int:
+    return _count(db, models.User)
+
+def search_users_page(db: Session, term: str, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[models.User], Optional[str]]:
+    """One page of the users whose email contains `term`, best matches first, and the next page's cursor."""
+    rows = db.execute(user_search_statement(term, cursor, limit, uses_user_search_index(db.get_bind()))).all()
+    return [user for user, _ in rows], next_user_search_cursor(rows, limit)
+
+def count_user_search(db: Session, term: str) -> int:
+    return db.scalar(user_search_count_statement(term, uses_user_search_index(db.get_bind())))
+
+def create_user(db: Session, user: schemas.UserCreate) -> models.User:
+    hashed_password = get_password_hash(user.password)
+    db_user = models.User(email=user.email, hashed_password=hashed_password)
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+def create_admin_user(db: Session, user: schemas.UserCreate) -> models.User:
+    hashed_password = get_password_hash(user.password)
+    db_user = models.User(email=user.email, hashed_password=hashed_password, is_admin=True)
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+# --- UserDataInput CRUD ---
+def create_user_data_input(db: Session, item: schemas.UserDataInputCreate, user_id: int) -> models.UserDataInput:
+    db_item = models.UserDataInput(**user_data_input_values(item, user_id))
+    db.add(db_item)
+    db.commit()
+    db.refresh(db_item)
+    return db_item
+
+def bulk_create_user_data_inputs(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Inserts many inputs (dicts of UserDataInput columns) in one transaction as a single
+    executemany, without loading them back. Returns the number of rows inserted.
+    """
+    if not rows:
+        return 0
+    db.execute(insert(models.UserDataInput), rows)
+    db.commit()
+    return len(rows)
+
+def get_user_data_inputs_by_user_id(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.UserDataInput]:
+    return db.query(models.UserDataInput).filter(models.UserDataInput.user_id == user_id).offset(skip).limit(limit).all()
+
+def get_user_data_inputs_page(
+    db: Session, user_id: Optional[int] = None, cursor: Optional[str] = None, limit: int = 100,
+    filters: Optional[schemas.UserDataInputFilters] = None, archived: bool = False
+) -> Tuple[List[models.UserDataInput], Optional[str]]:
+    """One page of inputs (or archived inputs), newest first, of one user or everyone, and the cursor of the next page."""
+    items = list(db.scalars(user_data_inputs_page_statement(user_id, cursor, limit, filters, archived)))
+    return items, next_user_data_input_cursor(items, limit)
+
+def count_user_data_inputs(
+    db: Session, user_id: Optional[int] = None, filters: Optional[schemas.UserDataInputFilters] = None, archived: bool = False
+) -> int:
+    return _count(db, input_model(archived), user_id, filters)
+
+def _count(db: Session, model: Any, user_id: Optional[int] = None, filters: Optional[schemas.UserDataInputFilters] = None) -> int:
+    # The maintained counts are per table and per user; filtered totals, and the archive's, are counted
+    if uses_row_counts(db.get_bind()) and model in ROW_COUNTED_MODELS and not has_filters(filters):
+        return db.scalar(row_count_statement(model, user_id)) or 0
+    return db.scalar(full_count_statement(model, user_id, filters))
+
+def summarize_user_data_inputs(db: Session, group_by: str, filters: Optional[schemas.UserDataInputFilters] = None) -> List[Dict[str, Any]]:
+    return [dict(row._mapping) for row in db.execute(user_data_inputs_summary_statement(group_by, filters))]
+
+def backfill_typed_columns_chunk(db: Session, after_id: int = 0, limit: int = 1000, archived: bool = False) -> Tuple[int, Optional[int]]:
+    """
+    Fills the typed columns of the next `limit` rows (by id, after `after_id`) written before
+    them or by an older TYPED_COLUMNS_VERSION, in one transaction. Returns the number of rows
+    updated and the last id seen (None once no such rows are left).
+    """
+    model = input_model(archived)
+    rows = db.execute(
+        select(model.id, model.input_data, model.output_data)
+        .where(model.id > after_id)
+        .where(model.typed_columns_version.is_(None) | (model.typed_columns_version < TYPED_COLUMNS_VERSION))
+        .order_by(model.id).limit(limit)
+    ).all()
+    if not rows:
+        return 0, None
+    # A Core update per id rather than the ORM's bulk update by primary key, which fails the whole
+    # chunk when a row has gone in the meantime (e.g. moved to the archive); such rows match nothing
+    table = model.__table__
+    result = db.execute(
+        update(table).where(table.c.id == bindparam("row_id")),
+        [dict(typed_columns(row.input_data, row.output_data), row_id=row.id) for row in rows]
+    )
+    db.commit()
+    return result.rowcount, rows[-1].id
+
+def archive_user_data_inputs_chunk(db: Session, before: datetime, limit: int = 1000) -> int:
+    """
+    Moves up to `limit` of the oldest inputs stored before `before` to the archive table, in one
+    transaction (copy, then delete). Returns the number of rows moved; 0 once none are left.
+    The row with the highest id always stays live: SQLite hands out max(id) + 1 to the next insert,
+    so an emptied table would reuse ids that are already in the archive.
+    """
+    live, archive = models.UserDataInput, models.UserDataInputArchive
+    # The chunk is picked by a subquery rather than a list of bound ids (SQLite caps the number of
+    # parameters); once the insert holds the write lock nothing else can change the live table, so
+    # the delete's subquery picks the same rows
+    chunk = (
+        select(live.id)
+        .where(live.timestamp < before, live.id < select(func.max(live.id)).scalar_subquery())
+        .order_by(live.timestamp, live.id).limit(limit)
+    )
+    columns = [column.name for column in live.__table__.columns]
+    db.execute(insert(archive).from_select(columns, select(*[live.__table__.c[name] for name in columns]).where(live.id.in_(chunk))))
+    moved = db.execute(delete(live).where(live.id.in_(chunk))).rowcount
+    db.commit()
+    return moved
+
+def get_all_user_data_inputs(db: Session, skip: int = 0, limit: int = 1000) -> List[models.UserDataInput]:
+    """
+    Fetches all user data inputs, primarily for admin use.
+    Consider pagination for very large datasets.
+    """
+    return db.query(models.UserDataInput).order_by(models.UserDataInput.timestamp.desc()).offset(skip).limit(limit).all()
+
+def stream_user_data_inputs(
+    db: Session,
+    user_id: Optional[int] = None,
+    filters: Optional[schemas.UserDataInputFilters] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 1000,
+    archived: bool = False
+) -> Iterator:
+    """
+    Yields (id, user_id, model_type, timestamp, input_data, output_data, equity_pct, debt_pct,
+    gold_pct, cash_pct) rows matching the filters in id order, `batch_size` at a time from a
+    streaming cursor. Plain rows rather than ORM objects, so nothing accumulates in the session
+    however many rows are read. `end` is exclusive.
+    """
+    model = input_model(archived)
+    query = db.query(
+        model.id, model.user_id, model.model_type, model.timestamp, model.input_data, model.output_data,
+        model.equity_pct, model.debt_pct, model.gold_pct, model.cash_pct
+    )
+    query = filter_user_data_inputs(query, filters, model)
+    if user_id is not None:
+        query = query.filter(model.user_id == user_id)
+    if start is not None:
+        query = query.filter(model.timestamp >= start)
+    if end is not None:
+        query = query.filter(model.timestamp < end)
+    return query.order_by(model.id).execution_options(stream_results=True).yield_per(batch_size)
+
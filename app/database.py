@@ -1,26 +1,164 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
-
-DATABASE_URL = "sqlite:///./financial_advisor.db"
-
-# Create the directory for the database if it doesn't exist
-os.makedirs(os.path.dirname(DATABASE_URL.split("///")[-1]), exist_ok=True)
-
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def create_db_and_tables():
-    Base.metadata.create_all(bind=engine)
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = "sqlite:///./financial_advisor.db"
+
+# Same database through an asyncio driver, used by the request handlers:
+# aiosqlite for SQLite, asyncpg for PostgreSQL (both need greenlet, see requirements.txt)
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def _async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+ASYNC_DATABASE_URL = _async_url(DATABASE_URL)
+
+# Create the directory for the database if it doesn't exist
+os.makedirs(os.path.dirname(DATABASE_URL.split("///")[-1]), exist_ok=True)
+
+engine = create_engine(
+    DATABASE_URL, connect_args={"check_same_thread": False}
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Objects stay usable after commit: reloading expired attributes would need another await
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Request-scoped AsyncSession; queries run without blocking the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# SQLite triggers behind models.RowCount: every insert/delete adjusts the table total and, for
+# user_data_inputs, the owner's total, in the same transaction as the change itself
+_COUNT_UPSERT = ("INSERT INTO row_counts (scope, row_count) VALUES ({scope}, {delta}) "
+                 "ON CONFLICT(scope) DO UPDATE SET row_count = row_count + {delta};")
+_USER_SCOPE = "'user_data_inputs:user:' || {row}.user_id"
+ROW_COUNT_TRIGGERS = {
+    "trg_users_count_insert": "AFTER INSERT ON users BEGIN " + _COUNT_UPSERT.format(scope="'users'", delta=1) + " END",
+    "trg_users_count_delete": "AFTER DELETE ON users BEGIN " + _COUNT_UPSERT.format(scope="'users'", delta=-1) + " END",
+    "trg_user_data_inputs_count_insert": "AFTER INSERT ON user_data_inputs BEGIN "
+        + _COUNT_UPSERT.format(scope="'user_data_inputs'", delta=1)
+        + _COUNT_UPSERT.format(scope=_USER_SCOPE.format(row="NEW"), delta=1) + " END",
+    "trg_user_data_inputs_count_delete": "AFTER DELETE ON user_data_inputs BEGIN "
+        + _COUNT_UPSERT.format(scope="'user_data_inputs'", delta=-1)
+        + _COUNT_UPSERT.format(scope=_USER_SCOPE.format(row="OLD"), delta=-1) + " END",
+    "trg_user_data_inputs_count_update": "AFTER UPDATE OF user_id ON user_data_inputs BEGIN "
+        + _COUNT_UPSERT.format(scope=_USER_SCOPE.format(row="OLD"), delta=-1)
+        + _COUNT_UPSERT.format(scope=_USER_SCOPE.format(row="NEW"), delta=1) + " END",
+}
+
+def install_row_counters(bind=None):
+    """
+    Creates the counting triggers that are missing (SQLite only; elsewhere the count helpers in
+    crud fall back to COUNT(*)). The counts are seeded from a full count once, when the triggers
+    are first installed, in the same transaction.
+    """
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as connection:
+        existing = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+        missing = [name for name in ROW_COUNT_TRIGGERS if name not in existing]
+        if not missing:
+            return
+        for name in existing & set(ROW_COUNT_TRIGGERS):
+            connection.execute(text(f"DROP TRIGGER {name}"))
+        connection.execute(text("DELETE FROM row_counts"))
+        connection.execute(text("INSERT INTO row_counts (scope, row_count) SELECT 'users', COUNT(*) FROM users"))
+        connection.execute(text("INSERT INTO row_counts (scope, row_count) SELECT 'user_data_inputs', COUNT(*) FROM user_data_inputs"))
+        connection.execute(text(
+            "INSERT INTO row_counts (scope, row_count) SELECT 'user_data_inputs:user:' || user_id, COUNT(*) "
+            "FROM user_data_inputs WHERE user_id IS NOT NULL GROUP BY user_id"))
+        for name, body in ROW_COUNT_TRIGGERS.items():
+            connection.execute(text(f"CREATE TRIGGER {name} {body}"))
+
+# User search: an FTS5 index of trigrams over these users columns (external content, so the
+# text lives only in users), kept in sync by triggers; needs SQLite 3.34+ for the trigram tokenizer
+USER_SEARCH_COLUMNS = ["email"]
+_USER_SEARCH_VALUES = ", ".join(USER_SEARCH_COLUMNS)
+USER_SEARCH_TRIGGERS = {
+    "trg_users_fts_insert": "AFTER INSERT ON users BEGIN "
+        f"INSERT INTO users_fts (rowid, {_USER_SEARCH_VALUES}) VALUES (NEW.id, {', '.join('NEW.' + c for c in USER_SEARCH_COLUMNS)}); END",
+    "trg_users_fts_delete": "AFTER DELETE ON users BEGIN "
+        f"INSERT INTO users_fts (users_fts, rowid, {_USER_SEARCH_VALUES}) VALUES ('delete', OLD.id, {', '.join('OLD.' + c for c in USER_SEARCH_COLUMNS)}); END",
+    "trg_users_fts_update": f"AFTER UPDATE OF {_USER_SEARCH_VALUES} ON users BEGIN "
+        f"INSERT INTO users_fts (users_fts, rowid, {_USER_SEARCH_VALUES}) VALUES ('delete', OLD.id, {', '.join('OLD.' + c for c in USER_SEARCH_COLUMNS)}); "
+        f"INSERT INTO users_fts (rowid, {_USER_SEARCH_VALUES}) VALUES (NEW.id, {', '.join('NEW.' + c for c in USER_SEARCH_COLUMNS)}); END",
+}
+user_search_indexed = False # set by install_user_search; crud falls back to LIKE scans without it
+
+def install_user_search(bind=None) -> bool:
+    """
+    Creates the users_fts index and its triggers if missing, filling the index from users when
+    either was (re)created. Returns whether the index is available (SQLite with FTS5 trigrams).
+    """
+    global user_search_indexed
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return False
+    with bind.begin() as connection:
+        existing = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")).scalars())
+        missing = [name for name in ["users_fts", *USER_SEARCH_TRIGGERS] if name not in existing]
+        if missing:
+            try:
+                if "users_fts" not in existing:
+                    connection.execute(text(
+                        f"CREATE VIRTUAL TABLE users_fts USING fts5({_USER_SEARCH_VALUES}, "
+                        "content='users', content_rowid='id', tokenize='trigram')"))
+                for name, body in USER_SEARCH_TRIGGERS.items():
+                    if name not in existing:
+                        connection.execute(text(f"CREATE TRIGGER {name} {body}"))
+                connection.execute(text("INSERT INTO users_fts (users_fts) VALUES ('rebuild')"))
+            except OperationalError as e: # no FTS5, or no trigram tokenizer
+                logger.warning(f"User search index not available, searches will scan the users table: {e}")
+                return False
+    user_search_indexed = True
+    return True
+
+def add_missing_columns(bind=None):
+    """
+    Adds the model columns an existing table lacks (create_all only creates missing tables).
+    They are added nullable and without defaults; rows written before get filled by a backfill.
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+def create_db_and_tables():
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    # create_all skips tables that already exist, so add indexes introduced since separately
+    # (IF NOT EXISTS rather than checkfirst: reflection skips expression indexes such as lower(email))
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+    install_row_counters()
+    install_user_search()
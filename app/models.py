@@ -1,28 +1,96 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from .database import Base
-
-class User(Base):
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    hashed_password = Column(String, nullable=False)
-    is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-    inputs = relationship("UserDataInput", back_populates="owner")
-
-class UserDataInput(Base):
-    __tablename__ = "user_data_inputs"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    model_type = Column(String, index=True) # "base", "enhanced", "rule_based"
-    input_data = Column(JSON) # Stores the dictionary of inputs
-    # Output data can also be stored if needed, e.g., portfolio allocation
-    # output_data = Column(JSON) 
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
-
-    owner = relationship("User", back_populates="inputs")
+from sqlalchemy import Column, Integer, Float, String, Boolean, DateTime, JSON, ForeignKey, Index
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from .database import Base
+
+# SQLite keeps timestamps as text and CURRENT_TIMESTAMP has no fraction; binding without
+# microseconds keeps parameters comparable with the stored values (keyset cursors, date filters)
+Timestamp = DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, unique=True, index=True, nullable=False)
+    hashed_password = Column(String, nullable=False)
+    is_admin = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    inputs = relationship("UserDataInput", back_populates="owner")
+
+# Case-insensitive email prefix search (crud's user search, for terms too short for trigrams)
+Index("ix_users_email_lower", func.lower(User.email))
+
+class UserDataInput(Base):
+    __tablename__ = "user_data_inputs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    model_type = Column(String, index=True) # "base", "enhanced", "rule_based"
+    input_data = Column(JSON) # Stores the dictionary of inputs
+    output_data = Column(JSON) # The recommended allocation (None for comparisons)
+    timestamp = Column(Timestamp, server_default=func.now())
+
+    # Common fields copied out of input_data/output_data when the row is written
+    # (crud.typed_columns), so filters and aggregates don't parse every row's JSON
+    lifecycle_stage = Column(String, index=True)
+    risk_appetite = Column(String, index=True)
+    investment_horizon = Column(String, index=True)
+    salary = Column(Float, index=True)
+    savings = Column(Float)
+    equity_pct = Column(Float, index=True) # allocation percentages, summed per asset class
+    debt_pct = Column(Float)
+    gold_pct = Column(Float)
+    cash_pct = Column(Float)
+    typed_columns_version = Column(Integer) # crud.TYPED_COLUMNS_VERSION once filled; NULL until backfilled
+
+    owner = relationship("User", back_populates="inputs")
+
+    __table_args__ = (
+        # Newest-first pages of one user's history, and of everyone's (id breaks timestamp ties)
+        Index("ix_user_data_inputs_user_id_timestamp", "user_id", "timestamp", "id"),
+        Index("ix_user_data_inputs_timestamp_id", "timestamp", "id"),
+    )
+
+class RowCount(Base):
+    """
+    Row counts kept up to date by triggers (see database.install_row_counters), so totals are one
+    primary-key lookup: "users", "user_data_inputs" and "user_data_inputs:user:<id>".
+    """
+    __tablename__ = "row_counts"
+
+    scope = Column(String, primary_key=True)
+    row_count = Column(Integer, nullable=False, default=0)
+
+class UserDataInputArchive(Base):
+    """
+    UserDataInput rows moved out of user_data_inputs by the retention job (services/retention.py),
+    same columns and ids, plus when they were archived. No foreign key, so archived history
+    outlives its user.
+    """
+    __tablename__ = "user_data_inputs_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer)
+    model_type = Column(String)
+    input_data = Column(JSON)
+    output_data = Column(JSON)
+    timestamp = Column(Timestamp)
+    lifecycle_stage = Column(String)
+    risk_appetite = Column(String)
+    investment_horizon = Column(String)
+    salary = Column(Float)
+    savings = Column(Float)
+    equity_pct = Column(Float)
+    debt_pct = Column(Float)
+    gold_pct = Column(Float)
+    cash_pct = Column(Float)
+    typed_columns_version = Column(Integer)
+    archived_at = Column(Timestamp, server_default=func.now())
+
+    __table_args__ = (
+        # Same newest-first pages as the live table; other filters scan the (rarely read) archive
+        Index("ix_user_data_inputs_archive_user_id_timestamp", "user_id", "timestamp", "id"),
+        Index("ix_user_data_inputs_archive_timestamp_id", "timestamp", "id"),
+    )
@@ -1,139 +1,276 @@
-from pydantic import BaseModel, EmailStr, field_validator, model_validator, ValidationInfo
-from typing import Optional, Dict, Any, List
-from datetime import datetime
-
-# --- User Schemas ---
-class UserBase(BaseModel):
-    email: EmailStr
-
-class UserCreate(UserBase):
-    password: str
-    confirm_password: Optional[str] = None # For signup form
-
-    @model_validator(mode='after')
-    def passwords_match(self) -> 'UserCreate':
-        if self.password is not None and self.confirm_password is not None and self.password != self.confirm_password:
-            raise ValueError('Passwords do not match')
-        # Ensure confirm_password is not passed to the User model if it's just for validation
-        # However, our User model doesn't have confirm_password, so it's fine.
-        return self
-
-class User(UserBase):
-    id: int
-    is_admin: bool
-    created_at: datetime
-
-    class Config:
-        from_attributes = True
-
-# --- UserDataInput Schemas ---
-class UserDataInputBase(BaseModel):
-    model_type: str
-    input_data: Dict[str, Any]
-
-class UserDataInputCreate(UserDataInputBase):
-    pass
-
-class UserDataInputResponse(UserDataInputBase):
-    id: int
-    user_id: int
-    timestamp: datetime
-    # output_data: Optional[Dict[str, Any]] = None # If storing output
-
-    class Config:
-        from_attributes = True
-
-class UserWithInputs(User):
-    inputs: List[UserDataInputResponse] = []
-
-    class Config: # Added for consistency, though User already has it.
-        from_attributes = True
-
-
-# --- Token Schemas ---
-class Token(BaseModel):
-    access_token: str
-    token_type: str
-
-class TokenData(BaseModel):
-    email: Optional[str] = None
-
-
-# --- Chatbot Input Schemas (Specific to each model for validation) ---
-# These can be more specific if needed, for now using a generic Dict
-# For example, for Base Model:
-class BaseModeInputSchema(BaseModel):
-    Salary: float
-    Expenses: float
-    Savings: float
-    Lifecycle_Stage: str 
-    Risk_Appetite: str
-    Investment_Horizon: str
-
-    @field_validator('Salary', 'Expenses', 'Savings')
-    @classmethod
-    def check_non_negative_numeric(cls, v: Any, info: ValidationInfo) -> Any:
-        if not isinstance(v, (int, float)):
-            raise ValueError(f"{info.field_name} must be a number")
-        if v < 0:
-            raise ValueError(f"{info.field_name} cannot be negative")
-        return v
-    
-    class Config:
-        from_attributes = True
-
-
-class EnhancedModelInputSchema(BaseModel):
-    Profession: str
-    City: str
-    Salary: float
-    Expenses: float
-    Savings: float
-    Lifecycle_Stage: str
-    Risk_Appetite: str
-    Investment_Horizon: str
-
-    @field_validator('Salary', 'Expenses', 'Savings')
-    @classmethod
-    def check_non_negative_numeric(cls, v: Any, info: ValidationInfo) -> Any:
-        if not isinstance(v, (int, float)):
-            raise ValueError(f"{info.field_name} must be a number")
-        if v < 0:
-            raise ValueError(f"{info.field_name} cannot be negative")
-        return v
-
-    class Config:
-        from_attributes = True
-
-class RuleBasedModelInputSchema(BaseModel):
-    Lifecycle_Stage: str
-    Risk_Appetite: str
-    Investment_Horizon: str
-    Annual_Salary_Package: float
-    Monthly_In_hand_Salary: float
-    Total_Monthly_Expenses: float
-
-    @field_validator('Annual_Salary_Package', 'Monthly_In_hand_Salary', 'Total_Monthly_Expenses')
-    @classmethod
-    def check_non_negative_numeric(cls, v: Any, info: ValidationInfo) -> Any:
-        if not isinstance(v, (int, float)):
-            raise ValueError(f"{info.field_name} must be a number")
-        if v < 0:
-            raise ValueError(f"{info.field_name} cannot be negative")
-        return v
-    
-    class Config:
-        from_attributes = True
-
-# For the chatbot interaction, the form will likely submit a dictionary.
-# The specific schema can be used within the service layer before passing to the model.
-class ChatbotInteractionRequest(BaseModel):
-    model_type: str # "base", "enhanced", "rule_based"
-    inputs: Dict[str, Any]
-
-class ChatbotInteractionResponse(BaseModel):
-    model_type: str
-    user_inputs: Dict[str, Any]
-    recommendation: Dict[str, Any] # e.g., portfolio allocation
-    justification: Optional[List[str]] = None # For rule-based
-    tips: Optional[List[str]] = None # For rule-based
+from pydantic import BaseModel, EmailStr, conint, field_validator, model_validator, ValidationInfo
+from typing import Optional, Dict, Any, List, Union
+from datetime import datetime
+
+# --- User Schemas ---
+class UserBase(BaseModel):
+    email: EmailStr
+
+class UserCreate(UserBase):
+    password: str
+    confirm_password: Optional[str] = None # For signup form
+
+    @model_validator(mode='after')
+    def passwords_match(self) -> 'UserCreate':
+        if self.password is not None and self.confirm_password is not None and self.password != self.confirm_password:
+            raise ValueError('Passwords do not match')
+        # Ensure confirm_password is not passed to the User model if it's just for validation
+        # However, our User model doesn't have confirm_password, so it's fine.
+        return self
+
+class User(UserBase):
+    id: int
+    is_admin: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# --- UserDataInput Schemas ---
+class UserDataInputBase(BaseModel):
+    model_type: str
+    input_data: Dict[str, Any]
+    output_data: Optional[Dict[str, Any]] = None # the recommended allocation
+
+class UserDataInputCreate(UserDataInputBase):
+    pass
+
+class UserDataInputResponse(UserDataInputBase):
+    id: int
+    user_id: int
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+# Query parameters of the admin listings, exports and summaries, matched against the typed columns
+class UserDataInputFilters(BaseModel):
+    model_type: Optional[str] = None
+    lifecycle_stage: Optional[str] = None
+    risk_appetite: Optional[str] = None
+    investment_horizon: Optional[str] = None
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+    min_equity_pct: Optional[float] = None
+    max_equity_pct: Optional[float] = None
+
+class UserPage(BaseModel):
+    users: List[User]
+    next_cursor: Optional[str] = None # pass back as ?cursor= for the next page; None on the last one
+    total: int
+
+class UserDataInputPage(BaseModel):
+    inputs: List[UserDataInputResponse] # newest first
+    next_cursor: Optional[str] = None
+    total: int
+
+class UserWithInputs(User):
+    inputs: List[UserDataInputResponse] = []
+
+    class Config: # Added for consistency, though User already has it.
+        from_attributes = True
+
+
+# --- Token Schemas ---
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+
+class TokenData(BaseModel):
+    email: Optional[str] = None
+
+
+# --- Chatbot Input Schemas (Specific to each model for validation) ---
+# These can be more specific if needed, for now using a generic Dict
+# For example, for Base Model:
+class BaseModeInputSchema(BaseModel):
+    Salary: float
+    Expenses: float
+    Savings: float
+    Lifecycle_Stage: str 
+    Risk_Appetite: str
+    Investment_Horizon: str
+
+    @field_validator('Salary', 'Expenses', 'Savings')
+    @classmethod
+    def check_non_negative_numeric(cls, v: Any, info: ValidationInfo) -> Any:
+        if not isinstance(v, (int, float)):
+            raise ValueError(f"{info.field_name} must be a number")
+        if v < 0:
+            raise ValueError(f"{info.field_name} cannot be negative")
+        return v
+    
+    class Config:
+        from_attributes = True
+
+
+class EnhancedModelInputSchema(BaseModel):
+    Profession: str
+    City: str
+    Salary: float
+    Expenses: float
+    Savings: float
+    Lifecycle_Stage: str
+    Risk_Appetite: str
+    Investment_Horizon: str
+
+    @field_validator('Salary', 'Expenses', 'Savings')
+    @classmethod
+    def check_non_negative_numeric(cls, v: Any, info: ValidationInfo) -> Any:
+        if not isinstance(v, (int, float)):
+            raise ValueError(f"{info.field_name} must be a number")
+        if v < 0:
+            raise ValueError(f"{info.field_name} cannot be negative")
+        return v
+
+    class Config:
+        from_attributes = True
+
+class RuleBasedModelInputSchema(BaseModel):
+    Lifecycle_Stage: str
+    Risk_Appetite: str
+    Investment_Horizon: str
+    Annual_Salary_Package: float
+    Monthly_In_hand_Salary: float
+    Total_Monthly_Expenses: float
+
+    @field_validator('Annual_Salary_Package', 'Monthly_In_hand_Salary', 'Total_Monthly_Expenses')
+    @classmethod
+    def check_non_negative_numeric(cls, v: Any, info: ValidationInfo) -> Any:
+        if not isinstance(v, (int, float)):
+            raise ValueError(f"{info.field_name} must be a number")
+        if v < 0:
+            raise ValueError(f"{info.field_name} cannot be negative")
+        return v
+    
+    class Config:
+        from_attributes = True
+
+class CompareModelsInputSchema(BaseModel):
+    """Superset of the three model inputs, validated once when comparing all models."""
+    Salary: float
+    Expenses: float
+    Savings: float
+    Lifecycle_Stage: str
+    Risk_Appetite: str
+    Investment_Horizon: str
+    Profession: Optional[str] = None # Enhanced model only
+    City: Optional[str] = None # Enhanced model only
+    # Rule-based fields; derived from the monthly Salary/Expenses when not given
+    Annual_Salary_Package: Optional[float] = None
+    Monthly_In_hand_Salary: Optional[float] = None
+    Total_Monthly_Expenses: Optional[float] = None
+
+    @field_validator('Salary', 'Expenses', 'Savings', 'Annual_Salary_Package', 'Monthly_In_hand_Salary', 'Total_Monthly_Expenses')
+    @classmethod
+    def check_non_negative_numeric(cls, v: Any, info: ValidationInfo) -> Any:
+        if v is None:
+            return v
+        if not isinstance(v, (int, float)):
+            raise ValueError(f"{info.field_name} must be a number")
+        if v < 0:
+            raise ValueError(f"{info.field_name} cannot be negative")
+        return v
+
+    @model_validator(mode='after')
+    def derive_rule_based_fields(self) -> 'CompareModelsInputSchema':
+        if self.Monthly_In_hand_Salary is None:
+            self.Monthly_In_hand_Salary = self.Salary
+        if self.Total_Monthly_Expenses is None:
+            self.Total_Monthly_Expenses = self.Expenses
+        if self.Annual_Salary_Package is None:
+            self.Annual_Salary_Package = self.Monthly_In_hand_Salary * 12
+        return self
+
+    class Config:
+        from_attributes = True
+
+class AllocationExplanation(BaseModel):
+    baseline: Dict[str, float] # asset -> share (%) before any feature is taken into account
+    features: Dict[str, Dict[str, float]] # input field -> asset -> percentage points it added (negative: removed)
+
+# For the chatbot interaction, the form will likely submit a dictionary.
+# The specific schema can be used within the service layer before passing to the model.
+class ChatbotInteractionRequest(BaseModel):
+    model_type: str # "base", "enhanced", "rule_based"
+    inputs: Dict[str, Any]
+    include_intervals: bool = False # base/enhanced: add per-asset bands from the individual trees
+    include_explanation: bool = False # base/enhanced: add per-feature contributions and a justification
+    latency_budget_ms: Optional[float] = None # base/enhanced: overrides the service's default budget
+
+class ChatbotInteractionResponse(BaseModel):
+    model_type: str
+    user_inputs: Dict[str, Any]
+    recommendation: Dict[str, Any] # e.g., portfolio allocation
+    justification: Optional[List[str]] = None # For rule-based
+    tips: Optional[List[str]] = None # For rule-based
+    intervals: Optional[Dict[str, Dict[str, float]]] = None # asset -> {"low", "high"} percentage band
+    explanation: Optional[AllocationExplanation] = None
+    degraded: bool = False # True when rule-based advice was served in place of the requested model
+    degraded_reason: Optional[str] = None # "model_unavailable", "deadline_exceeded" or "overloaded"
+
+
+# --- Batch Chatbot Schemas ---
+class ChatbotBatchRequest(BaseModel):
+    model_type: str # "base", "enhanced", "rule_based"
+    inputs: List[Dict[str, Any]] # One input dictionary per profile
+    include_intervals: bool = False
+    include_explanation: bool = False
+
+class ChatbotBatchItem(BaseModel):
+    index: int # Position of the profile in the request
+    recommendation: Optional[Dict[str, Any]] = None
+    justification: Optional[List[str]] = None
+    tips: Optional[List[str]] = None
+    intervals: Optional[Dict[str, Dict[str, float]]] = None
+    explanation: Optional[AllocationExplanation] = None
+    error: Optional[str] = None # Set when this profile could not be scored
+
+class ChatbotBatchResponse(BaseModel):
+    model_type: str
+    error_count: int
+    results: List[ChatbotBatchItem]
+
+
+# --- What-If Sweep Schemas ---
+class SweepRange(BaseModel):
+    start: float
+    stop: float
+    steps: conint(ge=1) # evenly spaced values from start to stop, both included
+
+class ChatbotSweepRequest(BaseModel):
+    model_type: str # "base", "enhanced", "rule_based"
+    inputs: Dict[str, Any] # The base profile; fields not swept keep these values
+    sweep: Dict[str, Union[SweepRange, List[Any]]] # Field -> range or explicit list of values
+
+class ChatbotSweepPoint(BaseModel):
+    inputs: Dict[str, Any] # Values of the swept fields at this point
+    recommendation: Optional[Dict[str, Any]] = None
+    justification: Optional[List[str]] = None
+    tips: Optional[List[str]] = None
+    error: Optional[str] = None
+
+class ChatbotSweepResponse(BaseModel):
+    model_type: str
+    axes: Dict[str, List[Any]] # Swept values per field, in request order
+    shape: List[int] # Points per axis; points are listed row-major (last axis varies fastest)
+    error_count: int
+    points: List[ChatbotSweepPoint]
+
+
+# --- Compare-All-Models Schemas ---
+class ChatbotCompareRequest(BaseModel):
+    inputs: Dict[str, Any] # Superset profile, see CompareModelsInputSchema
+
+class ModelComparisonResult(BaseModel):
+    model_type: str
+    recommendation: Optional[Dict[str, Any]] = None
+    justification: Optional[List[str]] = None
+    tips: Optional[List[str]] = None
+    error: Optional[str] = None
+    elapsed_ms: float # Time until this model's result was available (includes queueing)
+
+class ChatbotCompareResponse(BaseModel):
+    user_inputs: Dict[str, Any] # The validated profile, including derived fields
+    results: List[ModelComparisonResult] # base, enhanced, rule_based
+    total_ms: float
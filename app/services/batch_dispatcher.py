@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Batch sizes are counted in power-of-two buckets: 1, 2, 3-4, 5-8, ...
+_BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatchDispatcher:
+    """
+    Collects concurrent prediction requests per model type for up to `window_ms` (or until
+    `max_batch_size` are waiting), scores them with one `predict_batch(model_type, inputs)` call
+    and resolves each caller's future with its own row.
+
+    `runner`, when given, is awaited as runner(predict_batch, model_type, inputs) so the batch
+    can be scored off the event loop; by default it runs inline.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[str, List[Any]], List[Dict[str, Any]]],
+        window_ms: float = 2.0,
+        max_batch_size: int = 64,
+        runner: Optional[Callable[..., Awaitable[List[Dict[str, Any]]]]] = None
+    ):
+        self.predict_batch = predict_batch
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.runner = runner
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self.running = False
+
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+        self._batch_size_counts = {bucket: 0 for bucket in _BATCH_SIZE_BUCKETS}
+        self._batch_size_counts["more"] = 0
+        self._queue_wait_total_ms = 0.0
+        self._queue_wait_max_ms = 0.0
+        self._recent_queue_waits_ms: Deque[float] = deque(maxlen=2048)
+
+    # --- Lifecycle ---
+    def start(self):
+        self.running = True
+        logger.info(f"Micro-batch dispatcher started (window {self.window_ms} ms, max batch {self.max_batch_size}).")
+
+    async def stop(self):
+        self.running = False
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        # Anything still queued is failed rather than left hanging (the workers fail their own batch)
+        for queue in self._queues.values():
+            pending = []
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            self._fail_stopped(pending)
+        self._workers.clear()
+        self._queues.clear()
+
+    # --- Submission ---
+    async def submit(self, model_type: str, validated_input: Any) -> Dict[str, Any]:
+        if not self.running:
+            raise RuntimeError("Prediction dispatcher is not running")
+        if model_type not in self._queues:
+            # One queue and worker per model type, created on first use inside the running loop
+            self._queues[model_type] = asyncio.Queue()
+            self._workers[model_type] = asyncio.create_task(self._worker(model_type))
+        future = asyncio.get_running_loop().create_future()
+        self._queues[model_type].put_nowait((validated_input, future, time.perf_counter()))
+        return await future
+
+    # --- Worker ---
+    @staticmethod
+    def _fail_stopped(batch: List[Tuple[Any, asyncio.Future, float]]):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction dispatcher stopped"))
+
+    def _drain(self, queue: asyncio.Queue, batch: List[Tuple[Any, asyncio.Future, float]]):
+        while len(batch) < self.max_batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+
+    async def _worker(self, model_type: str):
+        queue = self._queues[model_type]
+        batch: List[Tuple[Any, asyncio.Future, float]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                self._drain(queue, batch)
+                if len(batch) < self.max_batch_size and self.window_ms > 0:
+                    # Give concurrent requests the rest of the window to join this batch
+                    waited_ms = (time.perf_counter() - batch[0][2]) * 1000
+                    if waited_ms < self.window_ms:
+                        await asyncio.sleep((self.window_ms - waited_ms) / 1000)
+                    self._drain(queue, batch)
+
+                batch = [item for item in batch if not item[1].cancelled()]
+                if not batch:
+                    continue
+                self._record_batch(batch)
+                inputs = [item[0] for item in batch]
+                try:
+                    if self.runner is not None:
+                        results = await self.runner(self.predict_batch, model_type, inputs)
+                    else:
+                        results = self.predict_batch(model_type, inputs)
+                except Exception as e:
+                    logger.error(f"Micro-batch prediction failed for {model_type} ({len(batch)} requests): {e}")
+                    for _, future, _ in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            # Cancelled by stop() while collecting or scoring a batch: its callers fail now
+            # instead of waiting out their own timeouts (a finished batch has nothing left to fail)
+            self._fail_stopped(batch)
+
+    # --- Metrics ---
+    def _record_batch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        now = time.perf_counter()
+        size = len(batch)
+        self.batches += 1
+        self.requests += size
+        self.largest_batch = max(self.largest_batch, size)
+        bucket = next((b for b in _BATCH_SIZE_BUCKETS if size <= b), "more")
+        self._batch_size_counts[bucket] += 1
+        for _, _, enqueued_at in batch:
+            wait_ms = (now - enqueued_at) * 1000
+            self._queue_wait_total_ms += wait_ms
+            self._queue_wait_max_ms = max(self._queue_wait_max_ms, wait_ms)
+            self._recent_queue_waits_ms.append(wait_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        recent = sorted(self._recent_queue_waits_ms)
+        def percentile(q: float) -> float:
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))], 3) if recent else 0.0
+        return {
+            "running": self.running,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "batch_size_histogram": {f"<={k}" if k != "more" else f">{_BATCH_SIZE_BUCKETS[-1]}": v
+                                     for k, v in self._batch_size_counts.items()},
+            "queue_wait_ms": {
+                "mean": round(self._queue_wait_total_ms / self.requests, 3) if self.requests else 0.0,
+                "p50": percentile(0.50),
+                "p99": percentile(0.99),
+                "max": round(self._queue_wait_max_ms, 3),
+            },
+        }
+
@@ -1,312 +1,1037 @@
-import joblib
-import pandas as pd
-import os
-from typing import Dict, Any, Tuple, List, Optional
-from app import schemas # Assuming schemas.py is in the same 'app' directory
-import logging
-
-logger = logging.getLogger(__name__)
-
-# --- Model Loading ---
-# Define paths to the model files, assuming they are in app/ml_models/
-MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "ml_models") # app/ml_models
-BASE_MODEL_PATH = os.path.join(MODEL_DIR, "basic_portfolio_model.pkl")
-ENHANCED_MODEL_PATH = os.path.join(MODEL_DIR, "enhanced_portfolio_model.pkl")
-
-# Ensure the ml_models directory exists
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-# Placeholder for loaded models
-base_model_pipeline = None
-enhanced_model_pipeline = None
-
-def load_models():
-    global base_model_pipeline, enhanced_model_pipeline
-    try:
-        if os.path.exists(BASE_MODEL_PATH):
-            base_model_pipeline = joblib.load(BASE_MODEL_PATH)
-            logger.info("Base model loaded successfully.")
-        else:
-            logger.error(f"Base model file not found at {BASE_MODEL_PATH}")
-
-        if os.path.exists(ENHANCED_MODEL_PATH):
-            enhanced_model_pipeline = joblib.load(ENHANCED_MODEL_PATH)
-            logger.info("Enhanced model loaded successfully.")
-        else:
-            logger.error(f"Enhanced model file not found at {ENHANCED_MODEL_PATH}")
-    except Exception as e:
-        logger.error(f"Error loading ML models: {e}")
-
-# Call load_models when this module is imported so they are ready.
-# load_models() # Will be called from main.py or an init step
-
-# --- Base Model Prediction ---
-def predict_base_model(input_data: schemas.BaseModeInputSchema) -> Dict[str, float]:
-    if not base_model_pipeline:
-        logger.error("Base model not loaded. Cannot predict.")
-        # Consider raising an exception or returning an error state
-        return {"error": "Base model not available"}
-
-    try:
-        data = input_data.dict()
-        
-        # Convert categorical features using mappings from the loaded pipeline
-        # These mappings should exist in the .pkl file if saved correctly
-        processed_data = data.copy()
-        processed_data['Lifecycle_Stage'] = base_model_pipeline['mappings']['lifecycle'][data['Lifecycle_Stage']]
-        processed_data['Risk_Appetite'] = base_model_pipeline['mappings']['risk'][data['Risk_Appetite']]
-        processed_data['Investment_Horizon'] = base_model_pipeline['mappings']['horizon'][data['Investment_Horizon']]
-
-        # Create feature array in correct order (must match training)
-        # Order from Reference/basemodel.py: Salary, Expenses, Savings, Lifecycle Stage, Risk Appetite, Investment Horizon
-        X = [
-            processed_data['Salary'],
-            processed_data['Expenses'],
-            processed_data['Savings'],
-            processed_data['Lifecycle_Stage'], # This is now numerical
-            processed_data['Risk_Appetite'],   # This is now numerical
-            processed_data['Investment_Horizon'] # This is now numerical
-        ]
-
-        X_scaled = base_model_pipeline['scaler'].transform([X])
-        pred = base_model_pipeline['model'].predict(X_scaled)[0]
-
-        total = pred.sum()
-        if total == 0: # Avoid division by zero
-            return {'Equity': 0, 'Debt': 0, 'Gold': 0, 'FD/Cash': 0, "error": "Prediction resulted in zero total"}
-
-        final_allocation = {
-            'Equity': round((pred[0]/total)*100, 1),
-            'Debt': round((pred[1]/total)*100, 1),
-            'Gold': round((pred[2]/total)*100, 1),
-            'FD/Cash': round((pred[3]/total)*100, 1)
-        }
-        return final_allocation
-    except KeyError as e:
-        logger.error(f"KeyError during base model prediction: {e}. Check mappings in pipeline or input data keys.")
-        return {"error": f"Missing data or incorrect mapping for {e}"}
-    except Exception as e:
-        logger.error(f"Error in base model prediction: {e}")
-        return {"error": str(e)}
-
-
-# --- Enhanced Model Prediction ---
-def predict_enhanced_model(input_data: schemas.EnhancedModelInputSchema) -> Dict[str, float]:
-    if not enhanced_model_pipeline:
-        logger.error("Enhanced model not loaded. Cannot predict.")
-        return {"error": "Enhanced model not available"}
-
-    try:
-        data = input_data.dict()
-        processed_data = data.copy()
-
-        # Convert categorical features
-        processed_data['Profession'] = enhanced_model_pipeline['profession_encoder'].transform([data['Profession']])[0]
-        processed_data['City'] = enhanced_model_pipeline['city_encoder'].transform([data['City']])[0]
-        processed_data['Lifecycle_Stage'] = enhanced_model_pipeline['mappings']['lifecycle'][data['Lifecycle_Stage']]
-        processed_data['Risk_Appetite'] = enhanced_model_pipeline['mappings']['risk'][data['Risk_Appetite']]
-        processed_data['Investment_Horizon'] = enhanced_model_pipeline['mappings']['horizon'][data['Investment_Horizon']]
-        
-        # Order from Reference/enhancedmodel.py:
-        # ['Profession', 'City', 'Salary', 'Expenses', 'Savings', 'Lifecycle Stage', 'Risk Appetite', 'Investment Horizon']
-        X = [
-            processed_data['Profession'],
-            processed_data['City'],
-            processed_data['Salary'],
-            processed_data['Expenses'],
-            processed_data['Savings'],
-            processed_data['Lifecycle_Stage'],
-            processed_data['Risk_Appetite'],
-            processed_data['Investment_Horizon']
-        ]
-
-        X_scaled = enhanced_model_pipeline['scaler'].transform([X])
-        pred = enhanced_model_pipeline['model'].predict(X_scaled)[0]
-
-        total = pred.sum()
-        if total == 0:
-             return {'Equity': 0, 'Debt': 0, 'Gold': 0, 'FD/Cash': 0, "error": "Prediction resulted in zero total"}
-
-        final_allocation = {
-            'Equity': round((pred[0]/total)*100, 1),
-            'Debt': round((pred[1]/total)*100, 1),
-            'Gold': round((pred[2]/total)*100, 1),
-            'FD/Cash': round((pred[3]/total)*100, 1)
-        }
-        return final_allocation
-    except KeyError as e:
-        logger.error(f"KeyError during enhanced model prediction: {e}. Check mappings/encoders in pipeline or input data keys.")
-        return {"error": f"Missing data or incorrect mapping/encoding for {e}"}
-    except Exception as e:
-        logger.error(f"Error in enhanced model prediction: {e}")
-        return {"error": str(e)}
-
-# --- Rule-Based Model Logic ---
-# (Adapted from Reference/rulebasedmodel.py)
-
-def _allocate_savings_rule_based(
-    monthly_savings: float, 
-    risk_profile: str, 
-    horizon: str, 
-    lifecycle: str
-) -> Tuple[Dict[str, float], List[str]]:
-    allocations = {}
-    justification_points = [
-        f"This allocation considers your {risk_profile} risk profile, {horizon} horizon, and {lifecycle} stage."
-    ]
-    risk_profile = risk_profile.lower() # Ensure consistency
-    horizon = horizon.lower()
-    # Lifecycle stage is already in a good format from schema e.g. "Early Career"
-
-    if risk_profile == "low":
-        allocations = {
-            "Fixed Deposits / Recurring Deposits": 0.35,
-            "Debt Mutual Funds (Liquid/Short Duration)": 0.30,
-            "Gold (SGBs/ETFs)": 0.10,
-            "Equity MFs (Large Cap/Index Funds)": 0.15,
-            "Cash / Savings Account": 0.10
-        }
-        justification_points.append("- Focus on capital preservation and stable returns.")
-    elif risk_profile == "medium":
-        allocations = {
-            "Equity MFs (Diversified - Large & Mid Cap/Flexi Cap)": 0.45,
-            "Debt Mutual Funds": 0.25,
-            "Fixed Deposits / PPF": 0.10,
-            "Gold (SGBs/ETFs)": 0.10,
-            "Equity MFs (International)": 0.05, 
-            "Cash / Savings Account": 0.05
-        }
-        justification_points.append("- Aims for a balance between growth and stability.")
-    elif risk_profile == "high":
-        allocations = {
-            "Equity MFs (Aggressive Growth - Mid/Small Cap, Thematic)": 0.60,
-            "Equity MFs (International)": 0.15,
-            "Direct Stocks (If experienced)": 0.10, 
-            "Debt Mutual Funds (Strategic)": 0.05,
-            "Gold (SGBs/ETFs - Tactical)": 0.05,
-            "Alternative Inv. (REITs/InvITs)": 0.05
-        }
-        justification_points.append("- Focuses on maximizing long-term growth potential.")
-
-    # Normalize percentages (simplified for brevity, original script had more robust normalization)
-    current_total_percentage = sum(allocations.values())
-    if abs(current_total_percentage - 1.0) > 0.001 and current_total_percentage != 0:
-        factor = 1.0 / current_total_percentage
-        allocations = {k: round(v * factor, 3) for k, v in allocations.items()} 
-        # Adjust last item to make sum exactly 1.0 if needed due to rounding
-        sum_val = sum(allocations.values())
-        if sum_val != 1.0 and allocations:
-            key_to_adjust = list(allocations.keys())[-1]
-            allocations[key_to_adjust] += (1.0 - sum_val)
-            allocations[key_to_adjust] = round(allocations[key_to_adjust], 3)
-
-
-    # Convert percentage values to actual amounts based on monthly_savings
-    # The chatbot response schema expects percentages for recommendation, so we return percentages.
-    # The display logic in the template can calculate amounts.
-    
-    # For the ChatbotInteractionResponse, recommendation should be percentages
-    # Let's ensure the values are percentages (0 to 100)
-    final_percentage_allocations = {k: round(v * 100, 1) for k,v in allocations.items()}
-
-    return final_percentage_allocations, justification_points
-
-
-def _get_general_financial_tips(lifecycle_stage: str, monthly_savings: float, monthly_in_hand_salary: float) -> List[str]:
-    tips = []
-    if monthly_in_hand_salary > 0: # Avoid division by zero if salary is 0
-        if monthly_savings <= 0 :
-            tips.append("- Your expenses currently meet or exceed your income. Focus on creating a budget.")
-        else:
-            savings_rate = (monthly_savings / monthly_in_hand_salary) * 100
-            tips.append(f"- Your current savings rate is approximately {savings_rate:.1f}%. Aim for at least 20-30%.")
-    else: # No salary info or zero salary
-        if monthly_savings <= 0:
-             tips.append("- Your expenses currently meet or exceed your income. Focus on creating a budget.")
-
-
-    tips.extend([
-        "- Build & Maintain an Emergency Fund: Aim for 3-6 months of essential living expenses.",
-        "- Get Adequately Insured: Health and Term Life Insurance are crucial.",
-        "- Invest Regularly & Be Disciplined (e.g. SIPs).",
-        "- Review Periodically: Revisit your financial plan annually or on major life events.",
-        "- Understand Your Investments: Know the risks and costs."
-    ])
-    if lifecycle_stage == "Student" or lifecycle_stage == "Early Career":
-        tips.append("- Focus on upskilling and career growth.")
-    if lifecycle_stage == "Late Career/Pre-Retirement" or lifecycle_stage == "Retired": # Assuming "Retired" is a lifecycle stage
-        tips.append("- Plan for healthcare expenses in retirement.")
-    return tips
-
-def predict_rule_based_model(input_data: schemas.RuleBasedModelInputSchema) -> Tuple[Dict[str, float], List[str], List[str]]:
-    data = input_data.dict()
-    
-    monthly_savings = data['Monthly_In_hand_Salary'] - data['Total_Monthly_Expenses']
-
-    if monthly_savings <= 0:
-        allocation = {"message": "Savings are zero or negative. Focus on budgeting first."}
-        justification = ["Investment allocation is not applicable without positive savings."]
-        tips = _get_general_financial_tips(data['Lifecycle_Stage'], monthly_savings, data['Monthly_In_hand_Salary'])
-        tips.insert(0, "Priority: Increase savings or reduce expenses.")
-        return allocation, justification, tips
-
-    allocation, justification = _allocate_savings_rule_based(
-        monthly_savings,
-        data['Risk_Appetite'],
-        data['Investment_Horizon'],
-        data['Lifecycle_Stage']
-    )
-    tips = _get_general_financial_tips(data['Lifecycle_Stage'], monthly_savings, data['Monthly_In_hand_Salary'])
-    
-    return allocation, justification, tips
-
-
-# --- Main Chatbot Interaction Logic ---
-def process_chatbot_interaction(
-    request: schemas.ChatbotInteractionRequest
-) -> schemas.ChatbotInteractionResponse:
-    
-    model_type = request.model_type.lower()
-    inputs = request.inputs
-
-    recommendation: Dict[str, Any] = {}
-    justification: Optional[List[str]] = None
-    tips: Optional[List[str]] = None
-
-    try:
-        if model_type == "base":
-            # Validate inputs against BaseModeInputSchema
-            validated_inputs = schemas.BaseModeInputSchema(**inputs)
-            recommendation = predict_base_model(validated_inputs)
-        elif model_type == "enhanced":
-            validated_inputs = schemas.EnhancedModelInputSchema(**inputs)
-            recommendation = predict_enhanced_model(validated_inputs)
-        elif model_type == "rule_based":
-            validated_inputs = schemas.RuleBasedModelInputSchema(**inputs)
-            recommendation, justification, tips = predict_rule_based_model(validated_inputs)
-        else:
-            raise ValueError("Invalid model type specified")
-
-        # Check for errors from prediction functions
-        if "error" in recommendation:
-             # Propagate the error message
-            return schemas.ChatbotInteractionResponse(
-                model_type=model_type,
-                user_inputs=inputs,
-                recommendation=recommendation, # Contains the error message
-                justification=None,
-                tips=None
-            )
-
-    except Exception as e: # Catch validation errors or other issues
-        logger.error(f"Error processing chatbot interaction for {model_type}: {e}")
-        recommendation = {"error": f"Failed to process request: {str(e)}"}
-
-
-    return schemas.ChatbotInteractionResponse(
-        model_type=model_type,
-        user_inputs=inputs, # Return the original inputs for display
-        recommendation=recommendation,
-        justification=justification,
-        tips=tips
-    )
+import itertools
+import joblib
+import numpy as np
+import pandas as pd
+import os
+import time
+import asyncio
+from typing import Dict, Any, Tuple, List, Optional
+from app import schemas # Assuming schemas.py is in the same 'app' directory
+from app.services import forest_engine, forest_format, response_surface, rule_engine
+from app.services.prediction_cache import PredictionCache
+from app.services.batch_dispatcher import MicroBatchDispatcher
+from app.services.inference_executor import InferenceExecutor, InferenceQueueFull, InferenceTimeout
+from app.services.model_registry import ModelRegistry, ModelVersion, describe_model_file
+from app.services.featurizer import Featurizer, build_base_featurizer, build_enhanced_featurizer
+from pydantic import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- Model Loading ---
+# Define paths to the model files, assuming they are in app/ml_models/
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "ml_models") # app/ml_models
+BASE_MODEL_PATH = os.path.join(MODEL_DIR, "basic_portfolio_model.pkl")
+ENHANCED_MODEL_PATH = os.path.join(MODEL_DIR, "enhanced_portfolio_model.pkl")
+
+# Ensure the ml_models directory exists
+os.makedirs(MODEL_DIR, exist_ok=True)
+
+# "compiled" scores with the array-backed engines, "sklearn" with the pickled pipelines directly
+INFERENCE_ENGINE = "compiled"
+
+# Output order of the portfolio models (matches the training targets)
+ALLOCATION_KEYS = ['Equity', 'Debt', 'Gold', 'FD/Cash']
+
+# Upper bound on the number of profiles accepted by a single batch call
+MAX_BATCH_SIZE = 5000
+
+# Quantiles of the per-tree allocations reported as a band when a request asks for intervals
+INTERVAL_QUANTILES = (0.10, 0.90)
+
+# Features (by total effect) described in the justification of an explained ML allocation
+EXPLANATION_TOP_FEATURES = 3
+
+# Upper bound on the number of grid points a single what-if sweep may expand to
+MAX_SWEEP_POINTS = 10000
+
+# Memoized base/enhanced predictions, keyed on (model type, model version, validated input)
+PREDICTION_CACHE_ENABLED = True
+PREDICTION_CACHE_SIZE = 10000
+PREDICTION_CACHE_TTL_SECONDS = 600
+prediction_cache = PredictionCache(max_entries=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL_SECONDS)
+
+# Micro-batching of concurrent base/enhanced requests (see process_chatbot_interaction_async)
+MICRO_BATCHING_ENABLED = True
+MICRO_BATCH_WINDOW_MS = 2.0
+MICRO_BATCH_MAX_SIZE = 64
+
+# Where base/enhanced inference runs: "thread", "process" (models preloaded per worker) or "inline"
+INFERENCE_BACKEND = "thread"
+INFERENCE_WORKERS = 4
+INFERENCE_MAX_QUEUE_DEPTH = 256 # outstanding calls before new ones are rejected
+INFERENCE_TIMEOUT_SECONDS = 5.0
+
+# "pickle" loads the joblib pipelines; "compact" memory-maps the forests exported next to them by
+# forest_format.export_pipeline (e.g. python -m benchmarks.forest_format), using the pickle where no
+# up-to-date export exists
+MODEL_FORMAT = "pickle"
+
+# Approximate base model allocations from a precomputed grid stored next to the .pkl
+# (response_surface.surface_path_for). Amounts are bucketed on a log grid per field; profiles
+# outside the ranges, and requests asking for intervals/explanations, are scored exactly.
+RESPONSE_SURFACE_ENABLED = False
+RESPONSE_SURFACE_BUILD_ON_LOAD = False # score a missing/outdated grid while loading (~20 s at 8 points per decade)
+RESPONSE_SURFACE_POINTS_PER_DECADE = 8
+RESPONSE_SURFACE_AMOUNT_RANGES = {
+    "Salary": (10000.0, 1000000.0),
+    "Expenses": (5000.0, 500000.0),
+    "Savings": (1000.0, 250000.0),
+}
+
+# Latency budget for base/enhanced chatbot answers (a request may set its own). Past it, or when the
+# model is not loaded or the executor is saturated, rule-based advice is returned flagged as degraded
+# while the ML scoring finishes in the background (its result still lands in the prediction cache).
+RULE_BASED_FALLBACK_ENABLED = True
+LATENCY_BUDGET_MS = 500.0
+
+# Synthetic profiles scored (single row and as one batch) before a new model version goes live
+WARMUP_ROUNDS = 3
+
+def _load_pipeline(path: str, name: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        logger.error(f"{name} model file not found at {path}")
+        return None
+    pipeline = joblib.load(path)
+    logger.info(f"{name} model loaded successfully.")
+    return pipeline
+
+def _load_model(path: str, name: str) -> Tuple[Optional[Dict[str, Any]], Optional[forest_engine.CompiledForest], Dict[str, Any]]:
+    # (pipeline, engine, source file description) in the configured MODEL_FORMAT
+    if MODEL_FORMAT == "compact":
+        compact_path = forest_format.compact_path_for(path)
+        if os.path.exists(compact_path) and (not os.path.exists(path) or os.path.getmtime(compact_path) >= os.path.getmtime(path)):
+            engine, pipeline = forest_format.load_compact(compact_path)
+            logger.info(f"{name} model memory-mapped from {compact_path}.")
+            return pipeline, engine, describe_model_file(compact_path)
+        logger.warning(f"No up-to-date compact {name} model at {compact_path}, loading the pickle.")
+
+    pipeline = _load_pipeline(path, name)
+    # Compile to flat node arrays (scaler folded into the thresholds); None means sklearn is used
+    return pipeline, forest_engine.compile_pipeline(pipeline), describe_model_file(path)
+
+def build_base_surface(models: ModelVersion) -> response_surface.ResponseSurface:
+    """Scores the base model on the configured grid in bulk (every category combination x amount grid)."""
+    pipeline, engine, featurizer = models.base_pipeline, models.base_engine, models.base_featurizer
+    mappings = pipeline['mappings']
+    template = schemas.BaseModeInputSchema(
+        Salary=0.0, Expenses=0.0, Savings=0.0, Lifecycle_Stage=next(iter(mappings['lifecycle'])),
+        Risk_Appetite=next(iter(mappings['risk'])), Investment_Horizon=next(iter(mappings['horizon'])))
+    return response_surface.build_surface(
+        featurizer, lambda X: _predict_raw(pipeline, engine, X), template,
+        [('Lifecycle_Stage', list(mappings['lifecycle'])), ('Risk_Appetite', list(mappings['risk'])),
+         ('Investment_Horizon', list(mappings['horizon']))],
+        RESPONSE_SURFACE_AMOUNT_RANGES, RESPONSE_SURFACE_POINTS_PER_DECADE)
+
+def _load_base_surface(models: ModelVersion) -> Optional[response_surface.ResponseSurface]:
+    # Only a grid scored with this exact model file is used; otherwise it is rebuilt or skipped
+    path = response_surface.surface_path_for(BASE_MODEL_PATH)
+    model_hash = models.sources.get("base", {}).get("sha256")
+    try:
+        if os.path.exists(path):
+            surface, source = response_surface.load_surface(path)
+            if source.get("sha256") == model_hash:
+                logger.info(f"Base model response surface memory-mapped from {path}.")
+                return surface
+            logger.warning(f"Response surface at {path} was built for another base model file.")
+        if not RESPONSE_SURFACE_BUILD_ON_LOAD:
+            return None
+        surface = build_base_surface(models)
+        response_surface.save_surface(surface, path, models.sources.get("base"))
+        logger.info(f"Base model response surface {surface.values.shape} built and saved to {path}.")
+        return response_surface.load_surface(path)[0]
+    except Exception as e:
+        logger.error(f"Could not load the base model response surface, scoring exactly: {e}")
+        return None
+
+def _build_model_version(version: int) -> ModelVersion:
+    base_pipeline, base_engine, base_source = _load_model(BASE_MODEL_PATH, "Base")
+    enhanced_pipeline, enhanced_engine, enhanced_source = _load_model(ENHANCED_MODEL_PATH, "Enhanced")
+    models = ModelVersion(
+        version=version,
+        base_pipeline=base_pipeline,
+        enhanced_pipeline=enhanced_pipeline,
+        base_engine=base_engine,
+        enhanced_engine=enhanced_engine,
+        # Category -> feature value tables, resolved once per version
+        base_featurizer=build_base_featurizer(base_pipeline),
+        enhanced_featurizer=build_enhanced_featurizer(enhanced_pipeline),
+        sources={"base": base_source, "enhanced": enhanced_source}
+    )
+    if RESPONSE_SURFACE_ENABLED and base_pipeline:
+        models.base_surface = _load_base_surface(models)
+    return models
+
+def _synthetic_profiles(pipeline: Dict[str, Any], enhanced: bool) -> List[Any]:
+    # Every lifecycle/risk/horizon combination at a few income levels (and, for the enhanced
+    # model, cycling through the known professions and cities)
+    mappings = pipeline['mappings']
+    profiles = []
+    for salary in (25000.0, 80000.0, 250000.0):
+        for lifecycle in mappings['lifecycle']:
+            for risk in mappings['risk']:
+                for horizon in mappings['horizon']:
+                    data = {'Salary': salary, 'Expenses': salary * 0.6, 'Savings': salary * 0.4,
+                            'Lifecycle_Stage': lifecycle, 'Risk_Appetite': risk, 'Investment_Horizon': horizon}
+                    if enhanced:
+                        professions = pipeline['profession_encoder'].classes_
+                        cities = pipeline['city_encoder'].classes_
+                        profiles.append(schemas.EnhancedModelInputSchema(
+                            **data, Profession=professions[len(profiles) % len(professions)],
+                            City=cities[len(profiles) % len(cities)]))
+                    else:
+                        profiles.append(schemas.BaseModeInputSchema(**data))
+    return profiles
+
+def _warm_up_model_version(candidate: ModelVersion, current: Optional[ModelVersion]):
+    """
+    Rejects (raises) a candidate that would serve less than the current version or produces
+    unusable predictions, then scores synthetic profiles so the first real requests are not cold.
+    """
+    for name, pipeline, engine, featurizer, enhanced in (
+        ("base", candidate.base_pipeline, candidate.base_engine, candidate.base_featurizer, False),
+        ("enhanced", candidate.enhanced_pipeline, candidate.enhanced_engine, candidate.enhanced_featurizer, True),
+    ):
+        if pipeline is None:
+            if current is not None and getattr(current, f"{name}_pipeline") is not None:
+                raise ValueError(f"{name} model could not be loaded")
+            continue
+        required = ('model', 'scaler', 'mappings') + (('profession_encoder', 'city_encoder') if enhanced else ())
+        missing = [key for key in required if key not in pipeline]
+        if missing:
+            raise ValueError(f"{name} pipeline is missing {missing}")
+
+        profiles = _synthetic_profiles(pipeline, enhanced)
+        X, _ = featurizer.transform(profiles)
+        X_scaled, _ = featurizer.transform(profiles, scaled=True)
+        if not np.allclose(X_scaled, pipeline['scaler'].transform(X)):
+            raise ValueError(f"{name} featurizer does not match the pipeline's scaler")
+        predictions = _predict_raw(pipeline, engine, X)
+        if predictions.shape != (len(X), len(ALLOCATION_KEYS)) or not np.all(np.isfinite(predictions)):
+            raise ValueError(f"{name} model returned unusable predictions of shape {predictions.shape}")
+        if engine is not None and pipeline['model'] is not None:
+            compiled = engine.predict(X_scaled if engine.scaled_input else X)
+            if not np.allclose(compiled, pipeline['model'].predict(X_scaled)):
+                raise ValueError(f"compiled {name} model does not match its sklearn pipeline")
+
+        scaled = _takes_scaled_features(pipeline, engine)
+        for _ in range(WARMUP_ROUNDS):
+            _score_feature_matrix(pipeline, engine, featurizer.transform_one(profiles[0], scaled), scaled)
+            _score_feature_matrix(pipeline, engine, X_scaled if scaled else X, scaled)
+
+def _on_model_swap(models: ModelVersion):
+    # Cached predictions are keyed on the version, this just frees them early
+    prediction_cache.clear()
+    if inference_executor.backend == "process":
+        # Process workers hold their own copy of the models; replace them with freshly loaded ones
+        # (calls landing on the old workers meanwhile reload there, see _run_in_worker)
+        inference_executor.initargs = (INFERENCE_ENGINE, models.version)
+        inference_executor.recycle()
+
+model_registry = ModelRegistry(build=_build_model_version, warm_up=_warm_up_model_version, on_swap=[_on_model_swap])
+
+def load_models():
+    """Loads the current model files synchronously (startup); a failed load keeps the previous version."""
+    try:
+        model_registry.load()
+    except Exception as e:
+        logger.error(f"Error loading ML models: {e}")
+
+def reload_models_in_background() -> bool:
+    """Loads, validates and warms up the model files off-thread, then swaps them in atomically."""
+    return model_registry.reload_in_background()
+
+# Call load_models when this module is imported so they are ready.
+# load_models() # Will be called from main.py or an init step
+
+# --- Shared Feature/Allocation Helpers ---
+def _scores_compiled(pipeline: Dict[str, Any], engine: Optional[forest_engine.CompiledForest]) -> bool:
+    # Compact-format versions have no sklearn model to fall back to
+    return engine is not None and (INFERENCE_ENGINE == "compiled" or pipeline.get('model') is None)
+
+def _takes_scaled_features(pipeline: Dict[str, Any], engine: Optional[forest_engine.CompiledForest]) -> bool:
+    # The folded engine takes raw features; sklearn and the compact engine take them pre-scaled
+    return not _scores_compiled(pipeline, engine) or engine.scaled_input
+
+def _predict_raw(pipeline: Dict[str, Any], engine: Optional[forest_engine.CompiledForest], X: np.ndarray, scaled: bool = False) -> np.ndarray:
+    # Raw (unnormalized) model outputs, shape (n_rows, 4). X is the unscaled feature matrix, or the
+    # scaled one when scaled=True (as produced by a featurizer).
+    if not scaled and _takes_scaled_features(pipeline, engine):
+        X = pipeline['scaler'].transform(X)
+    if _scores_compiled(pipeline, engine):
+        return engine.predict(X)
+    return pipeline['model'].predict(X)
+
+def _normalize_allocations(preds: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Turns an (n_rows, 4) array of raw model outputs into percentage allocations.
+    Rows whose outputs sum to zero get the same error payload the single-row path always returned.
+    """
+    totals = preds.sum(axis=1)
+    zero_rows = totals == 0
+    # Avoid division by zero; those rows are replaced by the error payload below
+    percentages = ((preds / np.where(zero_rows, 1.0, totals)[:, None]) * 100).tolist()
+
+    allocations = []
+    for row, is_zero in zip(percentages, zero_rows):
+        if is_zero:
+            allocations.append({'Equity': 0, 'Debt': 0, 'Gold': 0, 'FD/Cash': 0, "error": "Prediction resulted in zero total"})
+        else:
+            # Built-in round on Python floats (np.round breaks some ties the other way)
+            allocations.append({key: round(float(value), 1) for key, value in zip(ALLOCATION_KEYS, row)})
+    return allocations
+
+def _prediction_cache_key(model_type: str, input_data: Any, models: Optional[ModelVersion]) -> Tuple:
+    # Validated inputs already have numeric fields coerced to float, so 60000 and 60000.0 share a key
+    return (model_type, models.version if models else 0, tuple(sorted(input_data.dict().items())))
+
+def get_inference_stats() -> Dict[str, Any]:
+    models = model_registry.current
+    return {
+        "inference_engine": INFERENCE_ENGINE,
+        "model_version": models.version if models else None,
+        "prediction_cache": prediction_cache.stats(),
+        "micro_batching": batch_dispatcher.stats(),
+        "executor": inference_executor.stats(),
+        "rule_based_fallback": fallback_metrics.stats(),
+    }
+
+# --- Base Model Prediction ---
+def predict_base_model(input_data: schemas.BaseModeInputSchema) -> Dict[str, float]:
+    # One snapshot per request: a reload swapping in a new version does not affect this call
+    models = model_registry.current
+    if not models or not models.base_pipeline:
+        logger.error("Base model not loaded. Cannot predict.")
+        # Consider raising an exception or returning an error state
+        return {"error": "Base model not available"}
+
+    if not PREDICTION_CACHE_ENABLED:
+        return _predict_base_model_uncached(input_data, models)
+    return prediction_cache.get_or_compute(
+        _prediction_cache_key("base", input_data, models),
+        lambda: _predict_base_model_uncached(input_data, models)
+    )
+
+def _predict_base_model_uncached(input_data: schemas.BaseModeInputSchema, models: ModelVersion) -> Dict[str, float]:
+    try:
+        if models.base_surface is not None:
+            raw = models.base_surface.lookup_one(input_data)
+            if raw is not None:
+                return _normalize_allocations(raw[None, :])[0]
+        scaled = _takes_scaled_features(models.base_pipeline, models.base_engine)
+        X = models.base_featurizer.transform_one(input_data, scaled)
+
+        return _normalize_allocations(_predict_raw(models.base_pipeline, models.base_engine, X, scaled))[0]
+    except KeyError as e:
+        logger.error(f"KeyError during base model prediction: {e}. Check mappings in pipeline or input data keys.")
+        return {"error": f"Missing data or incorrect mapping for {e}"}
+    except Exception as e:
+        logger.error(f"Error in base model prediction: {e}")
+        return {"error": str(e)}
+
+
+# --- Enhanced Model Prediction ---
+def predict_enhanced_model(input_data: schemas.EnhancedModelInputSchema) -> Dict[str, float]:
+    models = model_registry.current
+    if not models or not models.enhanced_pipeline:
+        logger.error("Enhanced model not loaded. Cannot predict.")
+        return {"error": "Enhanced model not available"}
+
+    if not PREDICTION_CACHE_ENABLED:
+        return _predict_enhanced_model_uncached(input_data, models)
+    return prediction_cache.get_or_compute(
+        _prediction_cache_key("enhanced", input_data, models),
+        lambda: _predict_enhanced_model_uncached(input_data, models)
+    )
+
+def _predict_enhanced_model_uncached(input_data: schemas.EnhancedModelInputSchema, models: ModelVersion) -> Dict[str, float]:
+    try:
+        scaled = _takes_scaled_features(models.enhanced_pipeline, models.enhanced_engine)
+        X = models.enhanced_featurizer.transform_one(input_data, scaled)
+
+        return _normalize_allocations(_predict_raw(models.enhanced_pipeline, models.enhanced_engine, X, scaled))[0]
+    except KeyError as e:
+        logger.error(f"KeyError during enhanced model prediction: {e}. Check mappings/encoders in pipeline or input data keys.")
+        return {"error": f"Missing data or incorrect mapping/encoding for {e}"}
+    except Exception as e:
+        logger.error(f"Error in enhanced model prediction: {e}")
+        return {"error": str(e)}
+
+# --- Batch Prediction (many profiles, one model type) ---
+def _score_feature_matrix(pipeline: Dict[str, Any], engine: Optional[forest_engine.CompiledForest], X: np.ndarray, scaled: bool = False) -> List[Dict[str, Any]]:
+    # One prediction for the whole matrix instead of one per profile
+    return _normalize_allocations(_predict_raw(pipeline, engine, X, scaled))
+
+def _predict_per_tree(pipeline: Dict[str, Any], engine: Optional[forest_engine.CompiledForest], X: np.ndarray, scaled: bool = False) -> np.ndarray:
+    # Raw outputs of every tree, shape (n_trees, n_rows, 4), from a single traversal of the forests
+    if not scaled and _takes_scaled_features(pipeline, engine):
+        X = pipeline['scaler'].transform(X)
+    if _scores_compiled(pipeline, engine):
+        return np.concatenate([engine.predict_trees(X[start:start + forest_engine.PREDICT_CHUNK_ROWS])
+                               for start in range(0, len(X), forest_engine.PREDICT_CHUNK_ROWS)], axis=1)
+    forests = pipeline['model'].estimators_ # one RandomForestRegressor per asset class
+    return np.stack([
+        np.column_stack([forest.estimators_[t].predict(X) for forest in forests])
+        for t in range(len(forests[0].estimators_))
+    ])
+
+def _allocation_intervals(per_tree: np.ndarray) -> List[Dict[str, Dict[str, float]]]:
+    """
+    Percentage band per asset class: the INTERVAL_QUANTILES of the allocations the individual
+    ensemble members (tree t of every asset's forest) would give on their own.
+    """
+    totals = per_tree.sum(axis=2, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shares = np.where(totals > 0, per_tree / totals * 100, np.nan)
+    bands = np.quantile(shares, INTERVAL_QUANTILES, axis=0) # (2, n_rows, 4)
+    # Trees predicting nothing at all have no allocation; nanquantile is ~15x slower, so only for those rows
+    degenerate = np.flatnonzero((totals[..., 0] <= 0).any(axis=0))
+    if len(degenerate):
+        bands[:, degenerate] = np.nanquantile(shares[:, degenerate], INTERVAL_QUANTILES, axis=0)
+    bands = np.round(bands, 1)
+    return [
+        {asset: {"low": low, "high": high} for asset, low, high in zip(ALLOCATION_KEYS, lows, highs)}
+        for lows, highs in zip(bands[0].tolist(), bands[1].tolist())
+    ]
+
+def _allocation_explanations(per_tree: np.ndarray, contributions: np.ndarray, bias: np.ndarray, featurizer: Featurizer) -> List[Dict[str, Any]]:
+    """
+    Moves the tree-path contributions (raw model outputs) into allocation space: the baseline
+    is the share the forests give before any split, and each feature's points per asset add up,
+    together with the baseline, to the allocation before rounding. Rows whose outputs sum to
+    zero have no allocation and get None.
+    """
+    totals = per_tree.sum(axis=0).sum(axis=1) / per_tree.shape[0] # allocation denominator per row
+    baseline = bias / bias.sum() * 100
+    # share_k = 100 * p_k / S, p = bias + sum_f c_f  =>  share_k - baseline_k = sum_f 100 * (c_fk - baseline_k / 100 * sum_j c_fj) / S
+    with np.errstate(invalid='ignore', divide='ignore'):
+        points = (contributions - baseline / 100 * contributions.sum(axis=2, keepdims=True)) * 100 / totals[:, None, None]
+    points = np.round(points, 1).tolist()
+    baseline = dict(zip(ALLOCATION_KEYS, np.round(baseline, 1).tolist()))
+    fields = [column.field for column in featurizer.columns]
+    return [
+        {"baseline": baseline, "features": {field: dict(zip(ALLOCATION_KEYS, row)) for field, row in zip(fields, rows)}}
+        if total != 0 else None
+        for rows, total in zip(points, totals.tolist())
+    ]
+
+def explanation_justification(explanation: Dict[str, Any], input_data: Any) -> List[str]:
+    """Readable summary of an allocation explanation, shown the way rule-based justifications are."""
+    baseline = ", ".join(f"{asset} {share}%" for asset, share in explanation["baseline"].items())
+    lines = [f"Starting point (average training profile): {baseline}."]
+    effects = sorted(explanation["features"].items(), key=lambda item: -sum(abs(v) for v in item[1].values()))
+    for field, points in effects[:EXPLANATION_TOP_FEATURES]:
+        if not any(points.values()):
+            break
+        moves = ", ".join(f"{asset} {value:+.1f}" for asset, value in points.items())
+        lines.append(f"- {field.replace('_', ' ')} ({getattr(input_data, field)}) moved {moves} percentage points.")
+    return lines
+
+def _predict_model_batch(
+    name: str,
+    pipeline: Dict[str, Any],
+    engine: Optional[forest_engine.CompiledForest],
+    featurizer: Featurizer,
+    inputs: List[Any],
+    key_error_message: str,
+    details: Tuple[str, ...] = (),
+    surface: Optional[response_surface.ResponseSurface] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, List[Any]]]:
+    """
+    Rows with unknown categories get their own error; all other rows are scored together.
+    `details` may ask for "intervals" and/or "explanation"; these are computed from the same
+    per-tree traversal that gives the allocation and returned per row (None for failed rows).
+    Without details, rows covered by `surface` are interpolated from it instead of scored.
+    """
+    scaled = _takes_scaled_features(pipeline, engine)
+    X, row_errors = featurizer.transform(inputs, scaled)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+    extra: Dict[str, List[Any]] = {detail: [None] * len(inputs) for detail in details}
+    for i, e in row_errors.items():
+        results[i] = {"error": f"{key_error_message} {e}" if isinstance(e, KeyError) else str(e)}
+    positions = [i for i in range(len(inputs)) if i not in row_errors]
+
+    if positions and surface is not None and not details:
+        raw, covered = surface.lookup([inputs[i] for i in positions])
+        if covered.any():
+            for i, allocation in zip((i for i, hit in zip(positions, covered) if hit), _normalize_allocations(raw[covered])):
+                results[i] = allocation
+            positions = [i for i, hit in zip(positions, covered) if not hit]
+
+    # Attribution needs the node arrays; without a compiled engine (compile_pipeline fell back to
+    # sklearn) the rows get their allocation and no explanation
+    explain = "explanation" in details and engine is not None
+    if positions and "explanation" in details and engine is None:
+        logger.warning(f"No compiled {name} engine, returning allocations without explanations")
+    if positions:
+        X_valid = X[positions] if len(positions) < len(inputs) else X
+        try:
+            if explain:
+                # The allocation still matches the sklearn path bit for bit
+                if scaled != engine.scaled_input:
+                    X_valid = featurizer.transform([inputs[i] for i in positions], engine.scaled_input)[0]
+                per_tree, contributions = engine.explain(X_valid)
+                for i, explanation in zip(positions, _allocation_explanations(per_tree, contributions, engine.bias, featurizer)):
+                    extra["explanation"][i] = explanation
+            elif "intervals" in details:
+                per_tree = _predict_per_tree(pipeline, engine, X_valid, scaled)
+            if explain or "intervals" in details:
+                # Same summation order as the forests' own predict, so the allocation is unchanged
+                allocations = _normalize_allocations(per_tree.sum(axis=0) / per_tree.shape[0])
+                if "intervals" in details:
+                    for i, band in zip(positions, _allocation_intervals(per_tree)):
+                        extra["intervals"][i] = band
+            else:
+                allocations = _score_feature_matrix(pipeline, engine, X_valid, scaled)
+            for i, allocation in zip(positions, allocations):
+                results[i] = allocation
+                if "error" in allocation:
+                    for values in extra.values():
+                        values[i] = None
+        except Exception as e:
+            logger.error(f"Error in {name} model batch prediction: {e}")
+            for i in positions:
+                results[i] = {"error": str(e)}
+            extra = {detail: [None] * len(inputs) for detail in details}
+    return results, extra
+
+def predict_model_batch_with_details(
+    model_type: str,
+    inputs: List[Any],
+    details: Tuple[str, ...]
+) -> Tuple[List[Dict[str, Any]], Dict[str, List[Any]]]:
+    """Batch prediction for "base"/"enhanced" plus the requested per-row details (see _predict_model_batch)."""
+    models = model_registry.current
+    pipeline = getattr(models, f"{model_type}_pipeline", None) if models else None
+    if not pipeline:
+        logger.error(f"{model_type.capitalize()} model not loaded. Cannot predict.")
+        return ([{"error": f"{model_type.capitalize()} model not available"} for _ in inputs],
+                {detail: [None] * len(inputs) for detail in details})
+    key_error_message = "Missing data or incorrect mapping for" if model_type == "base" else "Missing data or incorrect mapping/encoding for"
+    return _predict_model_batch(model_type, pipeline, getattr(models, f"{model_type}_engine"),
+                                getattr(models, f"{model_type}_featurizer"), inputs, key_error_message, details,
+                                getattr(models, f"{model_type}_surface", None))
+
+def predict_base_model_batch(inputs: List[schemas.BaseModeInputSchema]) -> List[Dict[str, Any]]:
+    """
+    Scores many base model profiles in a single vectorized pass.
+    Returns one allocation (or an {"error": ...} dict) per input, in input order.
+    """
+    return predict_model_batch_with_details("base", inputs, ())[0]
+
+def predict_enhanced_model_batch(inputs: List[schemas.EnhancedModelInputSchema]) -> List[Dict[str, Any]]:
+    """
+    Scores many enhanced model profiles in a single vectorized pass.
+    Unknown professions/cities only fail their own row instead of the whole batch.
+    """
+    return predict_model_batch_with_details("enhanced", inputs, ())[0]
+
+# --- Rule-Based Model Logic ---
+# Allocations, justifications and tips come from the rule table compiled in rule_engine
+# (risk x horizon x lifecycle, adapted from Reference/rulebasedmodel.py).
+
+def predict_rule_based_model(input_data: schemas.RuleBasedModelInputSchema) -> Tuple[Dict[str, float], List[str], List[str]]:
+    return rule_engine.evaluate(input_data.dict())
+
+def predict_rule_based_model_batch(inputs: List[schemas.RuleBasedModelInputSchema]) -> List[Tuple[Dict[str, float], List[str], List[str]]]:
+    return predict_rule_based_model_batch_dicts([item.dict() for item in inputs])
+
+def predict_rule_based_model_batch_dicts(profiles: List[Dict[str, Any]]) -> List[Tuple[Dict[str, float], List[str], List[str]]]:
+    # For already validated profiles held as dicts (e.g. expanded sweep points)
+    return rule_engine.evaluate_batch(profiles)
+
+
+# --- Main Chatbot Interaction Logic ---
+def _requested_details(request: Any) -> Tuple[str, ...]:
+    # Optional per-row outputs of the ML models, see _predict_model_batch
+    return tuple(detail for detail, wanted in (("intervals", request.include_intervals),
+                                               ("explanation", request.include_explanation)) if wanted)
+
+_INPUT_SCHEMAS = {
+    "base": schemas.BaseModeInputSchema,
+    "enhanced": schemas.EnhancedModelInputSchema,
+    "rule_based": schemas.RuleBasedModelInputSchema,
+}
+
+# --- Rule-Based Fallback ---
+class FallbackMetrics:
+    """Counters for ML chatbot answers that fell back to rule-based advice (updated on the event loop)."""
+
+    REASONS = ("model_unavailable", "deadline_exceeded", "overloaded")
+
+    def __init__(self):
+        self.ml_requests = 0
+        self.fallbacks = {reason: 0 for reason in self.REASONS}
+        self.budget_overruns = 0 # ML scoring still running when the budget ran out
+        self.late_completions = 0 # ...and later finished (result cached for the next identical request)
+        self.late_failures = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = sum(self.fallbacks.values())
+        return {
+            "enabled": RULE_BASED_FALLBACK_ENABLED,
+            "latency_budget_ms": LATENCY_BUDGET_MS,
+            "ml_requests": self.ml_requests,
+            "fallbacks": dict(self.fallbacks, total=total),
+            "fallback_rate": round(total / self.ml_requests, 4) if self.ml_requests else 0.0,
+            "budget_overruns": self.budget_overruns,
+            "late_completions": self.late_completions,
+            "late_failures": self.late_failures,
+        }
+
+fallback_metrics = FallbackMetrics()
+
+def _model_available(model_type: str) -> bool:
+    models = model_registry.current
+    return models is not None and getattr(models, f"{model_type}_pipeline", None) is not None
+
+def _degraded_response(request: schemas.ChatbotInteractionRequest, reason: str) -> schemas.ChatbotInteractionResponse:
+    """
+    Rule-based advice for a base/enhanced request (monthly Salary/Expenses stand in for the
+    rule-based salary fields, as when comparing models). Invalid inputs get the usual error instead.
+    """
+    model_type = request.model_type.lower()
+    try:
+        validated_inputs = _INPUT_SCHEMAS[model_type](**request.inputs)
+        profile = schemas.CompareModelsInputSchema(**validated_inputs.dict())
+        recommendation, justification, tips = predict_rule_based_model(_derive_model_input("rule_based", profile))
+    except Exception as e:
+        logger.error(f"Error processing chatbot interaction for {model_type}: {e}")
+        return schemas.ChatbotInteractionResponse(
+            model_type=model_type,
+            user_inputs=request.inputs,
+            recommendation={"error": f"Failed to process request: {str(e)}"}
+        )
+    fallback_metrics.fallbacks[reason] += 1
+    logger.warning(f"Serving rule-based advice for a {model_type} model request ({reason}).")
+    return schemas.ChatbotInteractionResponse(
+        model_type=model_type,
+        user_inputs=request.inputs,
+        recommendation=recommendation,
+        justification=justification,
+        tips=tips,
+        degraded=True,
+        degraded_reason=reason
+    )
+
+def _latency_budget_seconds(request: schemas.ChatbotInteractionRequest) -> Optional[float]:
+    budget_ms = request.latency_budget_ms if request.latency_budget_ms is not None else LATENCY_BUDGET_MS
+    return budget_ms / 1000 if budget_ms is not None else None
+
+def _record_late_result(task: "asyncio.Future"):
+    # The request already got rule-based advice; this only keeps the counters (and retrieves errors)
+    if task.cancelled() or task.exception() is not None or "error" in task.result().recommendation:
+        fallback_metrics.late_failures += 1
+    else:
+        fallback_metrics.late_completions += 1
+
+
+def process_chatbot_interaction(
+    request: schemas.ChatbotInteractionRequest
+) -> schemas.ChatbotInteractionResponse:
+    
+    model_type = request.model_type.lower()
+    inputs = request.inputs
+
+    if model_type in ("base", "enhanced") and RULE_BASED_FALLBACK_ENABLED and not _model_available(model_type):
+        return _degraded_response(request, "model_unavailable")
+
+    recommendation: Dict[str, Any] = {}
+    justification: Optional[List[str]] = None
+    tips: Optional[List[str]] = None
+    intervals: Optional[Dict[str, Dict[str, float]]] = None
+    explanation: Optional[Dict[str, Any]] = None
+
+    try:
+        if model_type in ("base", "enhanced") and _requested_details(request):
+            # Per-tree outputs are needed, so this skips the prediction cache
+            validated_inputs = _INPUT_SCHEMAS[model_type](**inputs)
+            results, details = predict_model_batch_with_details(model_type, [validated_inputs], _requested_details(request))
+            recommendation = results[0]
+            intervals = details.get("intervals", [None])[0]
+            explanation = details.get("explanation", [None])[0]
+            if explanation is not None:
+                justification = explanation_justification(explanation, validated_inputs)
+        elif model_type == "base":
+            # Validate inputs against BaseModeInputSchema
+            validated_inputs = schemas.BaseModeInputSchema(**inputs)
+            recommendation = predict_base_model(validated_inputs)
+        elif model_type == "enhanced":
+            validated_inputs = schemas.EnhancedModelInputSchema(**inputs)
+            recommendation = predict_enhanced_model(validated_inputs)
+        elif model_type == "rule_based":
+            validated_inputs = schemas.RuleBasedModelInputSchema(**inputs)
+            recommendation, justification, tips = predict_rule_based_model(validated_inputs)
+        else:
+            raise ValueError("Invalid model type specified")
+
+        # Check for errors from prediction functions
+        if "error" in recommendation:
+             # Propagate the error message
+            return schemas.ChatbotInteractionResponse(
+                model_type=model_type,
+                user_inputs=inputs,
+                recommendation=recommendation, # Contains the error message
+                justification=None,
+                tips=None
+            )
+
+    except Exception as e: # Catch validation errors or other issues
+        logger.error(f"Error processing chatbot interaction for {model_type}: {e}")
+        recommendation = {"error": f"Failed to process request: {str(e)}"}
+
+
+    return schemas.ChatbotInteractionResponse(
+        model_type=model_type,
+        user_inputs=inputs, # Return the original inputs for display
+        recommendation=recommendation,
+        justification=justification,
+        tips=tips,
+        intervals=intervals,
+        explanation=explanation
+    )
+
+
+# --- Off-Loop Execution ---
+# In a process-pool worker: the server's model version the worker's own models were loaded for
+_worker_models_version: Optional[int] = None
+
+def init_inference_worker(engine: str = "compiled", models_version: Optional[int] = None):
+    # Runs once in every process-pool worker so models are loaded there, not shipped per call
+    global INFERENCE_ENGINE, _worker_models_version
+    INFERENCE_ENGINE = engine
+    load_models()
+    _worker_models_version = models_version
+
+def _run_in_worker(engine: str, models_version: Optional[int], fn, *args):
+    # Every process-pool call carries the server's engine and model version, so a worker still
+    # holding models from before a hot reload (e.g. in a pool being recycled) reloads them first
+    global INFERENCE_ENGINE, _worker_models_version
+    INFERENCE_ENGINE = engine
+    if models_version != _worker_models_version:
+        load_models()
+        _worker_models_version = models_version
+    return fn(*args)
+
+def _current_worker_initargs() -> Tuple:
+    models = model_registry.current
+    return (INFERENCE_ENGINE, models.version if models else None)
+
+inference_executor = InferenceExecutor(
+    backend=INFERENCE_BACKEND,
+    max_workers=INFERENCE_WORKERS,
+    max_queue_depth=INFERENCE_MAX_QUEUE_DEPTH,
+    timeout_seconds=INFERENCE_TIMEOUT_SECONDS,
+    initializer=init_inference_worker,
+    initargs=(INFERENCE_ENGINE, None) # set from the loaded models in start_inference
+)
+
+async def _run_inference(fn, *args):
+    # Late-bound so the executor can be swapped (e.g. reconfigured or recycled) at runtime
+    if inference_executor.backend == "process":
+        return await inference_executor.run(_run_in_worker, *_current_worker_initargs(), fn, *args)
+    return await inference_executor.run(fn, *args)
+
+# --- Micro-Batched Chatbot Interaction ---
+def predict_batch(model_type: str, validated_inputs: List[Any]) -> List[Dict[str, Any]]:
+    if model_type == "base":
+        return predict_base_model_batch(validated_inputs)
+    if model_type == "enhanced":
+        return predict_enhanced_model_batch(validated_inputs)
+    raise ValueError(f"Model type {model_type} cannot be micro-batched")
+
+batch_dispatcher = MicroBatchDispatcher(
+    predict_batch,
+    window_ms=MICRO_BATCH_WINDOW_MS,
+    max_batch_size=MICRO_BATCH_MAX_SIZE,
+    runner=_run_inference
+)
+
+def start_inference():
+    """Starts the worker pool and, if enabled, the micro-batch dispatcher (called on app startup)."""
+    inference_executor.initargs = _current_worker_initargs()
+    inference_executor.start()
+    if MICRO_BATCHING_ENABLED:
+        batch_dispatcher.start()
+
+async def stop_inference():
+    await batch_dispatcher.stop()
+    inference_executor.shutdown()
+
+async def _predict_batched(model_type: str, validated_inputs: Any) -> Dict[str, Any]:
+    if not PREDICTION_CACHE_ENABLED:
+        return await batch_dispatcher.submit(model_type, validated_inputs)
+    # Identical requests arriving while one is queued or being scored wait for that one's row
+    return await prediction_cache.get_or_compute_async(
+        _prediction_cache_key(model_type, validated_inputs, model_registry.current),
+        lambda: batch_dispatcher.submit(model_type, validated_inputs)
+    )
+
+async def _score_interaction_async(
+    request: schemas.ChatbotInteractionRequest
+) -> schemas.ChatbotInteractionResponse:
+    # Base/enhanced scoring off the event loop, without any fallback
+    model_type = request.model_type.lower()
+    if not batch_dispatcher.running or _requested_details(request):
+        return await _run_inference(process_chatbot_interaction, request)
+
+    inputs = request.inputs
+    try:
+        validated_inputs = _INPUT_SCHEMAS[model_type](**inputs)
+        recommendation = await _predict_batched(model_type, validated_inputs)
+    except (InferenceQueueFull, InferenceTimeout):
+        raise
+    except Exception as e: # Catch validation errors or other issues
+        logger.error(f"Error processing chatbot interaction for {model_type}: {e}")
+        recommendation = {"error": f"Failed to process request: {str(e)}"}
+
+    return schemas.ChatbotInteractionResponse(
+        model_type=model_type,
+        user_inputs=inputs,
+        recommendation=recommendation
+    )
+
+async def process_chatbot_interaction_async(
+    request: schemas.ChatbotInteractionRequest
+) -> schemas.ChatbotInteractionResponse:
+    """
+    Same contract as process_chatbot_interaction, but model inference never runs on the event loop:
+    while the dispatcher is running base/enhanced predictions are queued and scored in one vectorized
+    call together with concurrent requests, otherwise the whole interaction runs on the executor.
+
+    With RULE_BASED_FALLBACK_ENABLED, a base/enhanced answer that is not ready within the latency
+    budget, or cannot be scored because the model is missing or the executor is saturated, is
+    replaced by rule-based advice with degraded=True. Otherwise raises InferenceQueueFull /
+    InferenceTimeout when the executor is saturated or too slow.
+    """
+    model_type = request.model_type.lower()
+    if model_type not in ("base", "enhanced"):
+        # Rule-based advice is a table lookup, cheaper than a thread hop
+        return process_chatbot_interaction(request)
+    if not RULE_BASED_FALLBACK_ENABLED:
+        return await _score_interaction_async(request)
+
+    fallback_metrics.ml_requests += 1
+    if not _model_available(model_type):
+        return _degraded_response(request, "model_unavailable")
+
+    scoring = asyncio.ensure_future(_score_interaction_async(request))
+    try:
+        # shield: when the budget runs out the scoring carries on, off this request's critical path
+        response = await asyncio.wait_for(asyncio.shield(scoring), _latency_budget_seconds(request))
+    except asyncio.TimeoutError:
+        fallback_metrics.budget_overruns += 1
+        scoring.add_done_callback(_record_late_result)
+        return _degraded_response(request, "deadline_exceeded")
+    except (InferenceQueueFull, InferenceTimeout):
+        return _degraded_response(request, "overloaded")
+
+    if "error" in response.recommendation and not _model_available(model_type):
+        # The model went away while this request was queued
+        return _degraded_response(request, "model_unavailable")
+    return response
+
+
+# --- Batch Chatbot Scoring ---
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors())
+
+def process_chatbot_batch(
+    request: schemas.ChatbotBatchRequest
+) -> schemas.ChatbotBatchResponse:
+    """
+    Validates and scores many profiles for one model type.
+    Invalid rows are reported individually; the valid ones are scored together.
+    """
+    model_type = request.model_type.lower()
+    if model_type not in _INPUT_SCHEMAS:
+        raise ValueError("Invalid model type specified")
+
+    items = [schemas.ChatbotBatchItem(index=i) for i in range(len(request.inputs))]
+    validated_inputs, positions = [], []
+    for i, inputs in enumerate(request.inputs):
+        try:
+            validated_inputs.append(_INPUT_SCHEMAS[model_type](**inputs))
+            positions.append(i)
+        except ValidationError as e:
+            items[i].error = _format_validation_error(e)
+
+    details: Dict[str, List[Any]] = {}
+    if model_type in ("base", "enhanced"):
+        recommendations, details = predict_model_batch_with_details(model_type, validated_inputs, _requested_details(request))
+        outputs = [(rec, None, None) for rec in recommendations]
+    else:
+        outputs = predict_rule_based_model_batch(validated_inputs)
+
+    for n, (i, (recommendation, justification, tips)) in enumerate(zip(positions, outputs)):
+        if "error" in recommendation:
+            items[i].error = recommendation["error"]
+            continue
+        items[i].recommendation = recommendation
+        items[i].justification = justification
+        items[i].tips = tips
+        if "intervals" in details:
+            items[i].intervals = details["intervals"][n]
+        if "explanation" in details and details["explanation"][n] is not None:
+            items[i].explanation = details["explanation"][n]
+            items[i].justification = explanation_justification(details["explanation"][n], validated_inputs[n])
+
+    return schemas.ChatbotBatchResponse(
+        model_type=model_type,
+        error_count=sum(1 for item in items if item.error is not None),
+        results=items
+    )
+
+async def process_chatbot_batch_async(
+    request: schemas.ChatbotBatchRequest
+) -> schemas.ChatbotBatchResponse:
+    return await _run_inference(process_chatbot_batch, request)
+
+
+# --- What-If Sweep ---
+def _sweep_values(spec: Any) -> List[Any]:
+    if isinstance(spec, schemas.SweepRange):
+        return np.linspace(spec.start, spec.stop, spec.steps).tolist()
+    if not spec:
+        raise ValueError("A sweep list needs at least one value")
+    return list(spec)
+
+def sweep_point_count(request: schemas.ChatbotSweepRequest) -> int:
+    count = 1
+    for spec in request.sweep.values():
+        count *= spec.steps if isinstance(spec, schemas.SweepRange) else len(spec)
+    return count
+
+def _validated_sweep_axes(schema: Any, base_inputs: Dict[str, Any], sweep: Dict[str, Any]) -> Tuple[Any, List[Tuple[str, List[Any]]]]:
+    # The base profile and every swept value are validated once, not once per grid point
+    try:
+        validated_base = schema(**base_inputs)
+        axes = []
+        for field, spec in sweep.items():
+            if field not in schema.model_fields:
+                raise ValueError(f"{field} is not an input of this model")
+            axes.append((field, [getattr(schema(**dict(base_inputs, **{field: value})), field)
+                                 for value in _sweep_values(spec)]))
+    except ValidationError as e:
+        raise ValueError(_format_validation_error(e))
+    return validated_base, axes
+
+def _score_sweep_grid(model_type: str, validated_base: Any, axes: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+    # The whole grid is one feature matrix, scored in one vectorized pass
+    models = model_registry.current
+    pipeline = getattr(models, f"{model_type}_pipeline", None) if models else None
+    if not pipeline:
+        raise ValueError(f"{model_type.capitalize()} model not available")
+    engine = getattr(models, f"{model_type}_engine")
+    scaled = _takes_scaled_features(pipeline, engine)
+    try:
+        X = getattr(models, f"{model_type}_featurizer").transform_grid(validated_base, axes, scaled)
+    except KeyError as e:
+        raise ValueError(f"Missing data or incorrect mapping for {e}")
+    return _score_feature_matrix(pipeline, engine, X, scaled)
+
+def process_chatbot_sweep(
+    request: schemas.ChatbotSweepRequest
+) -> schemas.ChatbotSweepResponse:
+    """
+    Scores every combination of the swept values on top of the base profile, e.g. salary x risk,
+    and returns the allocation at each point. Nothing is persisted.
+    Raises ValueError for an invalid model type, base profile or sweep specification.
+    """
+    model_type = request.model_type.lower()
+    if model_type not in _INPUT_SCHEMAS:
+        raise ValueError("Invalid model type specified")
+    if not request.sweep:
+        raise ValueError("Specify at least one field to sweep")
+    validated_base, axes = _validated_sweep_axes(_INPUT_SCHEMAS[model_type], request.inputs, request.sweep)
+    fields = [field for field, _ in axes]
+    combinations = list(itertools.product(*(values for _, values in axes)))
+
+    if model_type == "rule_based":
+        base = validated_base.dict()
+        outputs = predict_rule_based_model_batch_dicts(
+            [dict(base, **dict(zip(fields, combination))) for combination in combinations])
+    else:
+        outputs = [(recommendation, None, None) for recommendation in _score_sweep_grid(model_type, validated_base, axes)]
+
+    points = []
+    for combination, (recommendation, justification, tips) in zip(combinations, outputs):
+        point = schemas.ChatbotSweepPoint(inputs=dict(zip(fields, combination)))
+        if "error" in recommendation:
+            point.error = recommendation["error"]
+        else:
+            point.recommendation = recommendation
+            point.justification = justification
+            point.tips = tips
+        points.append(point)
+
+    return schemas.ChatbotSweepResponse(
+        model_type=model_type,
+        axes={field: values for field, values in axes},
+        shape=[len(values) for _, values in axes],
+        error_count=sum(1 for point in points if point.error is not None),
+        points=points
+    )
+
+async def process_chatbot_sweep_async(
+    request: schemas.ChatbotSweepRequest
+) -> schemas.ChatbotSweepResponse:
+    return await _run_inference(process_chatbot_sweep, request)
+
+
+# --- Compare All Models ---
+_COMPARED_MODELS = ("base", "enhanced", "rule_based")
+
+def _derive_model_input(model_type: str, profile: schemas.CompareModelsInputSchema) -> Any:
+    # Every field was validated as part of the superset, so the per-model input is built without re-validating
+    schema = _INPUT_SCHEMAS[model_type]
+    values = {field: getattr(profile, field) for field in schema.model_fields}
+    missing = [field for field, value in values.items() if value is None]
+    if missing:
+        raise ValueError(f"{', '.join(missing)} required for the {model_type} model")
+    return schema.model_construct(**values)
+
+async def _compare_one(model_type: str, profile: schemas.CompareModelsInputSchema, started: float) -> schemas.ModelComparisonResult:
+    result = schemas.ModelComparisonResult(model_type=model_type, elapsed_ms=0.0)
+    try:
+        validated_inputs = _derive_model_input(model_type, profile)
+        if model_type == "rule_based":
+            recommendation, result.justification, result.tips = predict_rule_based_model(validated_inputs)
+        elif batch_dispatcher.running:
+            recommendation = await _predict_batched(model_type, validated_inputs)
+        else:
+            predict = predict_base_model if model_type == "base" else predict_enhanced_model
+            recommendation = await _run_inference(predict, validated_inputs)
+        if "error" in recommendation:
+            result.error = recommendation["error"]
+            result.justification = result.tips = None
+        else:
+            result.recommendation = recommendation
+    except (InferenceQueueFull, InferenceTimeout):
+        raise
+    except Exception as e:
+        logger.error(f"Error comparing the {model_type} model: {e}")
+        result.error = str(e)
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+async def process_chatbot_comparison_async(
+    request: schemas.ChatbotCompareRequest
+) -> schemas.ChatbotCompareResponse:
+    """
+    Validates one superset profile and scores it with the base, enhanced and rule-based models
+    concurrently. A model whose inputs are incomplete (e.g. no Profession/City) reports an error
+    instead of failing the comparison. Raises ValueError if the profile itself is invalid.
+    """
+    started = time.perf_counter()
+    try:
+        profile = schemas.CompareModelsInputSchema(**request.inputs)
+    except ValidationError as e:
+        raise ValueError(_format_validation_error(e))
+
+    results = await asyncio.gather(*(_compare_one(model_type, profile, started) for model_type in _COMPARED_MODELS))
+    return schemas.ChatbotCompareResponse(
+        user_inputs=profile.dict(exclude_none=True),
+        results=list(results),
+        total_ms=round((time.perf_counter() - started) * 1000, 3)
+    )
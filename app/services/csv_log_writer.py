@@ -0,0 +1,172 @@
+import asyncio
+import csv
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class CsvLogQueueFull(Exception):
+    """The writer could not accept a row within the enqueue timeout."""
+
+
+class BufferedCsvWriter:
+    """
+    Appends rows to a CSV file from one background thread over a long-lived file handle.
+
+    Producers only enqueue; the writer thread writes rows as they come and flushes the handle
+    once `flush_rows` rows are pending or `flush_interval_seconds` passed since the last flush.
+    The queue is bounded: when it is full, producers wait (up to `enqueue_timeout_seconds`)
+    instead of letting memory grow. stop() drains the queue, flushes and fsyncs the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        initialize: Optional[Callable[[], None]] = None,
+        max_queue_size: int = 10000,
+        flush_rows: int = 256,
+        flush_interval_seconds: float = 1.0,
+        enqueue_timeout_seconds: float = 2.0
+    ):
+        self.path = path
+        self.initialize = initialize # creates the file with its header if needed
+        self.max_queue_size = max_queue_size
+        self.flush_rows = flush_rows
+        self.flush_interval_seconds = flush_interval_seconds
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._csv = None
+
+        self.rows_written = 0
+        self.flushes = 0
+        self.backpressure_waits = 0 # enqueues that found the queue full
+        self.dropped = 0 # rows given up on after enqueue_timeout_seconds
+        self.write_errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        if self.initialize:
+            self.initialize()
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="csv-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Writes everything queued so far, fsyncs and closes the file."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def put(self, row: Sequence[Any]):
+        """Blocking enqueue (for threads); raises CsvLogQueueFull after enqueue_timeout_seconds."""
+        try:
+            self._queue.put_nowait(row)
+            return
+        except queue.Full:
+            self.backpressure_waits += 1
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout_seconds)
+        except queue.Full:
+            self.dropped += 1
+            raise CsvLogQueueFull(f"CSV log queue full ({self.max_queue_size} rows)")
+
+    async def submit(self, row: Sequence[Any]):
+        """Enqueue from the event loop; only waits (off the loop) when the queue is full."""
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            await asyncio.to_thread(self.put, row)
+
+    # File handling; subclasses change how rows reach the disk
+    def _open(self):
+        self._file = open(self.path, mode='a', newline='', encoding='utf-8')
+        self._csv = csv.writer(self._file)
+
+    def _write_rows(self, rows: List[Sequence[Any]]):
+        self._csv.writerows(rows)
+
+    def _flush(self):
+        self._file.flush()
+
+    def _close(self):
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        pending = 0
+        last_flush = time.monotonic()
+        stopping = False
+        while not stopping:
+            timeout = max(0.0, self.flush_interval_seconds - (time.monotonic() - last_flush)) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            batch: List[Sequence[Any]] = []
+            # Take whatever else is already queued, so a burst is written in one go
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.flush_rows:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if batch:
+                try:
+                    self._write_rows(batch)
+                    self.rows_written += len(batch)
+                    pending += len(batch)
+                except Exception as e:
+                    self.write_errors += 1
+                    logger.error(f"Error appending {len(batch)} rows to {self.path}: {e}")
+            if pending and (stopping or pending >= self.flush_rows or time.monotonic() - last_flush >= self.flush_interval_seconds):
+                try:
+                    self._flush()
+                    self.flushes += 1
+                except Exception as e:
+                    self.write_errors += 1
+                    logger.error(f"Error flushing {self.path}: {e}")
+                pending = 0
+                last_flush = time.monotonic()
+        self._close()
+        logger.info(f"CSV log writer stopped, {self.rows_written} rows written to {self.path}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+            "flush_rows": self.flush_rows,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "backpressure_waits": self.backpressure_waits,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+if os.name == "nt": # no flock/kill(pid, 0): byte-range locks and process handles instead
+    import ctypes
+    import msvcrt
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.OpenProcess.restype = ctypes.c_void_p # HANDLEs are pointer-sized
+    _kernel32.GetExitCodeProcess.argtypes = (ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong))
+    _kernel32.CloseHandle.argtypes = (ctypes.c_void_p,)
+else:
+    import fcntl
+
+from app.services.csv_log_writer import BufferedCsvWriter
+
+logger = logging.getLogger(__name__)
+
+MERGE_MANIFEST = "_merged.json"
+MERGE_LOCK = ".merge.lock"
+
+
+def segment_dir_for(csv_path: str) -> str:
+    """Where the per-worker segments of a CSV log live (next to it)."""
+    return os.path.splitext(csv_path)[0] + ".segments"
+
+def _pid_of(segment_name: str) -> Optional[int]:
+    try:
+        return int(segment_name.split("-")[1])
+    except (IndexError, ValueError):
+        return None
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return True
+    if os.name == "nt":
+        # os.kill() would terminate the process on Windows; ask for its exit code instead
+        handle = _kernel32.OpenProcess(0x1000, False, pid) # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5 # ERROR_ACCESS_DENIED: exists, owned by someone else
+        try:
+            code = ctypes.c_ulong()
+            return not _kernel32.GetExitCodeProcess(handle, ctypes.byref(code)) or code.value == 259 # STILL_ACTIVE
+        finally:
+            _kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+@contextmanager
+def _exclusive_lock(path: str):
+    """Holds an exclusive lock on `path` (created if needed) across processes."""
+    with open(path, "a+b") as lock:
+        if os.name != "nt":
+            fcntl.flock(lock, fcntl.LOCK_EX) # released when the file is closed
+            yield
+            return
+        lock.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1) # gives up after ~10 s of retries
+                break
+            except OSError:
+                continue
+        try:
+            yield
+        finally:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SegmentedCsvWriter(BufferedCsvWriter):
+    """
+    BufferedCsvWriter for one worker process: rows go to that process's own segment file
+    (worker-<pid>-<start ns>.csv) and every flush is a single write() on an O_APPEND descriptor,
+    so a batch reaches the file whole or, after a crash, as a trailing partial line that
+    merge_segments ignores. Each line is prefixed with a nanosecond stamp taken when the writer
+    thread takes the row; merge_segments orders by it and strips it.
+    """
+
+    def __init__(self, segment_dir: str, **kwargs):
+        self.segment_dir = segment_dir
+        path = os.path.join(segment_dir, f"worker-{os.getpid()}-{time.time_ns()}.csv")
+        super().__init__(path, **kwargs)
+        self._fd: Optional[int] = None
+        self._buffer = io.StringIO()
+        self._buffer_csv = csv.writer(self._buffer)
+
+    def _open(self):
+        os.makedirs(self.segment_dir, exist_ok=True)
+        # O_BINARY (Windows only) keeps the CRT from turning the csv module's \r\n into \r\r\n
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+
+    def _write_rows(self, rows: List[Sequence[Any]]):
+        stamp = time.time_ns()
+        for offset, row in enumerate(rows):
+            self._buffer_csv.writerow([stamp + offset, *row]) # keeps stamps unique within a batch
+
+    def _flush(self):
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        view = memoryview(data)
+        while view: # a regular-file write is only short on errors like a full disk
+            written = os.write(self._fd, view)
+            view = view[written:]
+
+    def _close(self):
+        try:
+            if self._buffer.tell():
+                self._flush()
+            os.fsync(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _read_new_lines(path: str, offset: int) -> Iterator[Tuple[List[str], int]]:
+    # Complete records after offset (parsed lazily), each with the byte offset just past it
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    lines = data[:data.rfind(b"\n") + 1].splitlines(keepends=True)
+    position = [offset]
+
+    def feed():
+        # UTF-8 continuation bytes never look like line breaks, so splitting the bytes is safe
+        for line in lines:
+            position[0] += len(line)
+            yield line.decode("utf-8")
+
+    for row in csv.reader(feed()):
+        if row:
+            yield row, position[0]
+
+def _write_manifest(path: str, manifest: Dict[str, Any]):
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+def merge_segments(
+    csv_path: str,
+    headers: Sequence[str],
+    segment_dir: Optional[str] = None,
+    settle_seconds: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Appends the segment rows not merged yet to the canonical CSV in stamp order, in one write,
+    then fsyncs it and records per-segment offsets. Safe to run from several processes (file
+    lock). Rows stamped within the last settle_seconds are left for the next run, so with
+    settle_seconds above the writers' flush interval rows still buffered in a worker cannot end
+    up before rows merged earlier (segments of workers that have exited are taken whole). The CSV
+    size is recorded before appending, so if a merge dies after appending but before recording
+    its offsets, the next one cuts the CSV back and no row is merged twice. Fully merged segments
+    of workers that have exited are deleted.
+    """
+    segment_dir = segment_dir or segment_dir_for(csv_path)
+    os.makedirs(segment_dir, exist_ok=True)
+    with _exclusive_lock(os.path.join(segment_dir, MERGE_LOCK)):
+        manifest_path = os.path.join(segment_dir, MERGE_MANIFEST)
+        manifest = {"offsets": {}, "merging_from": None}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        if manifest.get("merging_from") is not None and os.path.exists(csv_path):
+            logger.warning(f"Discarding the unfinished merge at the end of {csv_path}")
+            os.truncate(csv_path, min(manifest["merging_from"], os.path.getsize(csv_path)))
+            manifest["merging_from"] = None
+        if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
+            with open(csv_path, "w", newline='', encoding="utf-8") as f:
+                csv.writer(f).writerow(headers)
+
+        cutoff = time.time_ns() - int(settle_seconds * 1e9)
+        pending: List[Tuple[int, str, int, List[str]]] = []
+        new_offsets: Dict[str, int] = {}
+        segments = sorted(name for name in os.listdir(segment_dir) if name.startswith("worker-") and name.endswith(".csv"))
+        for name in segments:
+            path = os.path.join(segment_dir, name)
+            offset = manifest["offsets"].get(name, 0)
+            end = offset
+            finished = not _process_alive(_pid_of(name)) # an exited worker has nothing left in its buffer
+            for index, (row, row_end) in enumerate(_read_new_lines(path, offset)):
+                stamp = int(row[0])
+                if stamp > cutoff and not finished:
+                    break # stamps only grow within a segment
+                pending.append((stamp, name, index, row[1:]))
+                end = row_end
+            new_offsets[name] = end
+
+        pending.sort(key=lambda item: item[:3])
+        if pending:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(row for *_, row in pending)
+            manifest["merging_from"] = os.path.getsize(csv_path)
+            _write_manifest(manifest_path, manifest)
+            with open(csv_path, "ab") as f:
+                f.write(buffer.getvalue().encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            manifest["merging_from"] = None
+
+        manifest["offsets"].update(new_offsets)
+        removed = 0
+        for name in segments:
+            path = os.path.join(segment_dir, name)
+            if not _process_alive(_pid_of(name)) and manifest["offsets"].get(name, 0) >= os.path.getsize(path):
+                os.remove(path)
+                manifest["offsets"].pop(name, None)
+                removed += 1
+        _write_manifest(manifest_path, manifest)
+    if pending:
+        logger.info(f"Merged {len(pending)} rows from {len(segments)} segments into {csv_path}")
+    return {"rows_merged": len(pending), "segments": len(segments), "segments_removed": removed, "csv_path": csv_path}
+
@@ -1,129 +1,316 @@
-import csv
-import os
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-import logging
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Define the path for the CSV file
-# Ensure this path is correct relative to where the application runs
-# For example, if main.py is in app/, and this service is called from there.
-CSV_FILE_PATH = "user_financial_data.csv" 
-# This will create the file in the same directory as main.py if it's in the root,
-# or in the 'app' directory if main.py is in 'app' and this path is used as is.
-# For consistency with the sqlite DB being in the root, let's adjust:
-CSV_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "user_financial_data.csv")
-# This places it in the project root directory (financial_advisor/)
-
-# Define the headers for the CSV file based on 'aboutdata.txt' and additional fields
-# Ensure all possible fields from all models are covered.
-CSV_HEADERS = [
-    'UserID', 'UserEmail', 'ModelType', 'Timestamp',
-    'Name', 'Age', 'City', 'Profession', 'Salary', 'Expenses', 'Savings',
-    'Lifecycle Stage', 'Risk Appetite', 'Investment Horizon',
-    'Annual Salary Package', 'Monthly In-hand Salary', 'Total Monthly Expenses', # For Rule-based
-    # Output fields from models (optional, but good for record keeping)
-    'Equity (%)', 'Debt (%)', 'Gold (%)', 'FD/Cash (%)'
-]
-
-
-def initialize_csv():
-    """Initializes the CSV file with headers if it doesn't exist."""
-    # Ensure the directory for the CSV file exists
-    os.makedirs(os.path.dirname(CSV_FILE_PATH), exist_ok=True)
-    
-    if not os.path.exists(CSV_FILE_PATH):
-        try:
-            with open(CSV_FILE_PATH, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(CSV_HEADERS)
-            logger.info(f"CSV file initialized at {CSV_FILE_PATH}")
-        except IOError as e:
-            logger.error(f"Error initializing CSV file: {e}")
-
-def append_data_to_csv(user_id: int, user_email: str, model_type: str, input_data: Dict[str, Any], output_data: Optional[Dict[str, Any]] = None):
-    """
-    Appends a new row of data to the CSV file.
-    input_data should be a flat dictionary.
-    output_data is the portfolio allocation.
-    """
-    if not os.path.exists(CSV_FILE_PATH):
-        initialize_csv()
-
-    row_data = {header: '' for header in CSV_HEADERS} # Initialize with empty strings
-
-    # Populate common fields
-    row_data['UserID'] = user_id
-    row_data['UserEmail'] = user_email
-    row_data['ModelType'] = model_type
-    row_data['Timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # Populate fields from input_data
-    # Normalize keys from input_data (e.g., 'Lifecycle_Stage' to 'Lifecycle Stage')
-    normalized_input_data = {key.replace('_', ' '): value for key, value in input_data.items()}
-
-    for key, value in normalized_input_data.items():
-        if key in row_data:
-            row_data[key] = value
-        # Handle specific keys that might have different names in input_data
-        elif key == "Annual Salary Package" and "Annual_Salary_Package" in normalized_input_data: # from RuleBasedModelInputSchema
-             row_data["Annual Salary Package"] = normalized_input_data["Annual_Salary_Package"]
-        # Add more specific mappings if needed
-
-    # Populate fields from output_data (portfolio allocation)
-    if output_data:
-        for key, value in output_data.items():
-            # Ensure the key from output_data matches a header like "Equity (%)"
-            header_key = f"{key} (%)" 
-            if header_key in row_data:
-                row_data[header_key] = value
-            elif key in row_data: # For keys like 'Equity', 'Debt' if not with '(%)'
-                 row_data[key] = value
-
-
-    # Ensure the order of data matches CSV_HEADERS
-    ordered_row_values = [row_data.get(header, '') for header in CSV_HEADERS]
-
-    try:
-        with open(CSV_FILE_PATH, mode='a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(ordered_row_values)
-        logger.info(f"Data appended to CSV for user {user_email}, model {model_type}")
-    except IOError as e:
-        logger.error(f"Error appending data to CSV: {e}")
-    except Exception as e:
-        logger.error(f"An unexpected error occurred while writing to CSV: {e}")
-
-# Example usage (for testing this module independently):
-if __name__ == "__main__":
-    initialize_csv()
-    
-    # Test data
-    sample_input_base = {
-        'Salary': 60000, 'Expenses': 40000, 'Savings': 20000,
-        'Lifecycle_Stage': 'Early Career', 'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term'
-    }
-    sample_output = {'Equity': 50, 'Debt': 30, 'Gold': 10, 'FD/Cash': 10}
-    append_data_to_csv(1, "test@example.com", "base", sample_input_base, sample_output)
-
-    sample_input_enhanced = {
-        'Profession': 'Engineer', 'City': 'Metropolis',
-        'Salary': 120000, 'Expenses': 70000, 'Savings': 50000,
-        'Lifecycle_Stage': 'Mid-Career', 'Risk_Appetite': 'High', 'Investment_Horizon': 'Long-term'
-    }
-    append_data_to_csv(2, "another@example.com", "enhanced", sample_input_enhanced, sample_output)
-
-    sample_input_rule = {
-        'Lifecycle_Stage': 'Late Career', 
-        'Risk_Appetite': 'Low', 
-        'Investment_Horizon': 'Short-term',
-        'Annual_Salary_Package': 1000000, 
-        'Monthly_In_hand_Salary': 60000, 
-        'Total_Monthly_Expenses': 40000
-    }
-    append_data_to_csv(3, "ruleuser@example.com", "rule_based", sample_input_rule, sample_output)
-    
-    logger.info(f"Test data written to {CSV_FILE_PATH}")
+import csv
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import async_crud, schemas
+from app.services.csv_log_writer import BufferedCsvWriter, CsvLogQueueFull
+from app.services.input_writer import BatchedInputWriter, InputWriterQueueFull
+from app.services import csv_segments
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Define the path for the CSV file
+# Ensure this path is correct relative to where the application runs
+# For example, if main.py is in app/, and this service is called from there.
+CSV_FILE_PATH = "user_financial_data.csv" 
+# This will create the file in the same directory as main.py if it's in the root,
+# or in the 'app' directory if main.py is in 'app' and this path is used as is.
+# For consistency with the sqlite DB being in the root, let's adjust:
+CSV_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "user_financial_data.csv")
+# This places it in the project root directory (financial_advisor/)
+
+# Define the headers for the CSV file based on 'aboutdata.txt' and additional fields
+# Ensure all possible fields from all models are covered.
+CSV_HEADERS = [
+    'UserID', 'UserEmail', 'ModelType', 'Timestamp',
+    'Name', 'Age', 'City', 'Profession', 'Salary', 'Expenses', 'Savings',
+    'Lifecycle Stage', 'Risk Appetite', 'Investment Horizon',
+    'Annual Salary Package', 'Monthly In-hand Salary', 'Total Monthly Expenses', # For Rule-based
+    # Output fields from models (optional, but good for record keeping)
+    'Equity (%)', 'Debt (%)', 'Gold (%)', 'FD/Cash (%)'
+]
+
+# "buffered": rows are queued and written by one background thread over a long-lived handle
+# (flushed every CSV_LOG_FLUSH_ROWS rows or CSV_LOG_FLUSH_INTERVAL_SECONDS, fsynced on shutdown);
+# "segmented": same, but each worker process writes its own segment file (see csv_segments) and
+# merge_csv_segments() appends them to the CSV in timestamp order, for multi-worker deployments;
+# "sync": every row opens, appends to and closes the file inside the request
+CSV_WRITE_MODE = "buffered"
+CSV_LOG_QUEUE_SIZE = 10000 # rows waiting to be written before producers are held back
+CSV_LOG_FLUSH_ROWS = 256
+CSV_LOG_FLUSH_INTERVAL_SECONDS = 1.0
+CSV_LOG_ENQUEUE_TIMEOUT_SECONDS = 2.0 # how long a request waits on a full queue before the row is dropped
+CSV_SEGMENT_MERGE_INTERVAL_SECONDS = 30.0 # how often each worker tries to merge segments ("segmented" mode)
+# Rows younger than this stay in their segment until the next merge; must exceed the flush
+# interval so a row still buffered in another worker cannot land behind newer merged rows
+CSV_SEGMENT_MERGE_SETTLE_SECONDS = 2 * CSV_LOG_FLUSH_INTERVAL_SECONDS
+
+# How the UserDataInput record of each answered request reaches the database.
+# "batched": records are queued and inserted by one background thread, many per transaction
+# (every INPUT_WRITE_BATCH_ROWS records or INPUT_WRITE_INTERVAL_SECONDS), drained on shutdown.
+# The request is answered before its record is committed, so a crash loses at most the last
+# interval's records. "sync": each request inserts and commits its own record (used by tests
+# and scripts that read the table right after a request).
+DB_WRITE_MODE = "batched"
+INPUT_WRITE_QUEUE_SIZE = 10000
+INPUT_WRITE_BATCH_ROWS = 500
+INPUT_WRITE_INTERVAL_SECONDS = 0.5
+INPUT_WRITE_ENQUEUE_TIMEOUT_SECONDS = 2.0 # then the request inserts its record itself
+
+
+def initialize_csv():
+    """Initializes the CSV file with headers if it doesn't exist."""
+    # Ensure the directory for the CSV file exists
+    os.makedirs(os.path.dirname(CSV_FILE_PATH), exist_ok=True)
+    
+    if not os.path.exists(CSV_FILE_PATH):
+        # Several workers may get here at once: write the header to a private file and link it
+        # into place, which fails if another worker created the CSV first (no empty or headerless file)
+        tmp_path = f"{CSV_FILE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, mode='w', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                writer.writerow(CSV_HEADERS)
+            os.link(tmp_path, CSV_FILE_PATH)
+            logger.info(f"CSV file initialized at {CSV_FILE_PATH}")
+        except FileExistsError:
+            pass
+        except IOError as e:
+            logger.error(f"Error initializing CSV file: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+def build_csv_row(user_id: int, user_email: str, model_type: str, input_data: Dict[str, Any], output_data: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """
+    Builds one CSV row, in CSV_HEADERS order.
+    input_data should be a flat dictionary.
+    output_data is the portfolio allocation.
+    """
+    row_data = {header: '' for header in CSV_HEADERS} # Initialize with empty strings
+
+    # Populate common fields
+    row_data['UserID'] = user_id
+    row_data['UserEmail'] = user_email
+    row_data['ModelType'] = model_type
+    row_data['Timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Populate fields from input_data
+    # Normalize keys from input_data (e.g., 'Lifecycle_Stage' to 'Lifecycle Stage')
+    normalized_input_data = {key.replace('_', ' '): value for key, value in input_data.items()}
+
+    for key, value in normalized_input_data.items():
+        if key in row_data:
+            row_data[key] = value
+        # Handle specific keys that might have different names in input_data
+        elif key == "Annual Salary Package" and "Annual_Salary_Package" in normalized_input_data: # from RuleBasedModelInputSchema
+             row_data["Annual Salary Package"] = normalized_input_data["Annual_Salary_Package"]
+        # Add more specific mappings if needed
+
+    # Populate fields from output_data (portfolio allocation)
+    if output_data:
+        for key, value in output_data.items():
+            # Ensure the key from output_data matches a header like "Equity (%)"
+            header_key = f"{key} (%)" 
+            if header_key in row_data:
+                row_data[header_key] = value
+            elif key in row_data: # For keys like 'Equity', 'Debt' if not with '(%)'
+                 row_data[key] = value
+
+
+    # Ensure the order of data matches CSV_HEADERS
+    return [row_data.get(header, '') for header in CSV_HEADERS]
+
+def append_data_to_csv(user_id: int, user_email: str, model_type: str, input_data: Dict[str, Any], output_data: Optional[Dict[str, Any]] = None):
+    """
+    Appends a new row of data to the CSV file (synchronously, one open/write/close per row).
+    input_data should be a flat dictionary.
+    output_data is the portfolio allocation.
+    """
+    if not os.path.exists(CSV_FILE_PATH):
+        initialize_csv()
+
+    ordered_row_values = build_csv_row(user_id, user_email, model_type, input_data, output_data)
+
+    try:
+        with open(CSV_FILE_PATH, mode='a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(ordered_row_values)
+        logger.info(f"Data appended to CSV for user {user_email}, model {model_type}")
+    except IOError as e:
+        logger.error(f"Error appending data to CSV: {e}")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while writing to CSV: {e}")
+
+
+# --- Buffered Background Writer ---
+def _new_csv_writer() -> BufferedCsvWriter:
+    options = dict(
+        max_queue_size=CSV_LOG_QUEUE_SIZE,
+        flush_rows=CSV_LOG_FLUSH_ROWS,
+        flush_interval_seconds=CSV_LOG_FLUSH_INTERVAL_SECONDS,
+        enqueue_timeout_seconds=CSV_LOG_ENQUEUE_TIMEOUT_SECONDS
+    )
+    if CSV_WRITE_MODE == "segmented":
+        return csv_segments.SegmentedCsvWriter(csv_segments.segment_dir_for(CSV_FILE_PATH), **options)
+    return BufferedCsvWriter(CSV_FILE_PATH, initialize=initialize_csv, **options)
+
+csv_writer: Optional[BufferedCsvWriter] = None
+_merge_stop: Optional[threading.Event] = None
+last_segment_merge: Optional[Dict[str, Any]] = None
+
+def merge_csv_segments(settle_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Appends the rows the workers wrote to their segment files to the CSV ("segmented" mode)."""
+    global last_segment_merge
+    try:
+        last_segment_merge = csv_segments.merge_segments(
+            CSV_FILE_PATH, CSV_HEADERS,
+            settle_seconds=CSV_SEGMENT_MERGE_SETTLE_SECONDS if settle_seconds is None else settle_seconds)
+        return last_segment_merge
+    except (OSError, ValueError) as e:
+        logger.error(f"Error merging CSV segments into {CSV_FILE_PATH}: {e}")
+        return {"error": f"Could not merge CSV segments: {e}"}
+
+def _merge_loop(stop: threading.Event):
+    while not stop.wait(CSV_SEGMENT_MERGE_INTERVAL_SECONDS):
+        merge_csv_segments()
+
+def start_csv_writer():
+    """Starts the background writer in "buffered" or "segmented" mode (called on app startup)."""
+    global csv_writer, _merge_stop
+    if CSV_WRITE_MODE not in ("buffered", "segmented") or (csv_writer is not None and csv_writer.running):
+        return
+    csv_writer = _new_csv_writer()
+    csv_writer.start()
+    logger.info(f"{CSV_WRITE_MODE.capitalize()} CSV writer started for {csv_writer.path}")
+    if CSV_WRITE_MODE == "segmented":
+        merge_csv_segments() # picks up what workers of a previous run left behind
+        _merge_stop = threading.Event()
+        threading.Thread(target=_merge_loop, args=(_merge_stop,), name="csv-segment-merge", daemon=True).start()
+
+def stop_csv_writer():
+    """Writes out every queued row and fsyncs the file (called on app shutdown)."""
+    global _merge_stop
+    if _merge_stop is not None:
+        _merge_stop.set()
+        _merge_stop = None
+    if csv_writer is not None:
+        csv_writer.stop()
+        if isinstance(csv_writer, csv_segments.SegmentedCsvWriter):
+            # This worker's last rows stay in its segment if still inside the settle window;
+            # the next merge (any worker, or the next startup) takes them once this process exits
+            merge_csv_segments()
+
+# --- Batched UserDataInput Writer ---
+input_writer: Optional[BatchedInputWriter] = None
+
+def start_input_writer():
+    """Starts the background UserDataInput writer in "batched" mode (called on app startup)."""
+    global input_writer
+    if DB_WRITE_MODE != "batched" or (input_writer is not None and input_writer.running):
+        return
+    input_writer = BatchedInputWriter(
+        max_queue_size=INPUT_WRITE_QUEUE_SIZE,
+        batch_rows=INPUT_WRITE_BATCH_ROWS,
+        flush_interval_seconds=INPUT_WRITE_INTERVAL_SECONDS,
+        enqueue_timeout_seconds=INPUT_WRITE_ENQUEUE_TIMEOUT_SECONDS
+    )
+    input_writer.start()
+    logger.info("Batched UserDataInput writer started")
+
+def stop_input_writer():
+    """Commits every queued record (called on app shutdown)."""
+    if input_writer is not None:
+        input_writer.stop()
+
+def interaction_record(
+    request: schemas.ChatbotInteractionRequest, response: schemas.ChatbotInteractionResponse
+) -> Optional[schemas.UserDataInputCreate]:
+    """
+    The UserDataInput to store (and log to the CSV) for one chatbot answer, or None. Errors are not
+    stored, nor is degraded advice: it is the rule engine's allocation for a base/enhanced request,
+    and stored under that model type it would pass for model output in the history, the typed
+    allocation columns and the CSV training data.
+    """
+    if "error" in response.recommendation or response.degraded:
+        return None
+    return schemas.UserDataInputCreate(
+        model_type=request.model_type,
+        input_data=request.inputs,
+        output_data=response.recommendation
+    )
+
+async def save_user_data_input(db: AsyncSession, item: schemas.UserDataInputCreate, user_id: int):
+    """
+    Stores the inputs of one answered request from a request handler. With the batched writer
+    running this only enqueues the record; otherwise (or when the queue stays full) the record
+    is inserted and committed on the request's own session.
+    """
+    if input_writer is not None and input_writer.running:
+        try:
+            await input_writer.submit(BatchedInputWriter.build_record(item, user_id))
+            return
+        except InputWriterQueueFull as e:
+            logger.warning(f"{e}; inserting the record for user {user_id} directly")
+    await async_crud.create_user_data_input(db=db, item=item, user_id=user_id)
+
+def get_input_writer_stats() -> Dict[str, Any]:
+    return {"mode": DB_WRITE_MODE, "writer": input_writer.stats() if input_writer is not None else None}
+
+async def log_recommendation(user_id: int, user_email: str, model_type: str, input_data: Dict[str, Any], output_data: Optional[Dict[str, Any]] = None):
+    """
+    Records one chatbot answer in the CSV from a request handler. With the background writer
+    running this only enqueues the row (waiting when the queue is full); otherwise it falls back
+    to the synchronous append.
+    """
+    if csv_writer is None or not csv_writer.running:
+        append_data_to_csv(user_id, user_email, model_type, input_data, output_data)
+        return
+    try:
+        await csv_writer.submit(build_csv_row(user_id, user_email, model_type, input_data, output_data))
+    except CsvLogQueueFull as e:
+        logger.error(f"Row for user {user_email}, model {model_type} not written to CSV: {e}")
+
+def get_csv_writer_stats() -> Dict[str, Any]:
+    stats = {"mode": CSV_WRITE_MODE, "writer": csv_writer.stats() if csv_writer is not None else None}
+    if CSV_WRITE_MODE == "segmented":
+        stats["last_segment_merge"] = last_segment_merge
+    return stats
+
+# Example usage (for testing this module independently):
+if __name__ == "__main__":
+    initialize_csv()
+    
+    # Test data
+    sample_input_base = {
+        'Salary': 60000, 'Expenses': 40000, 'Savings': 20000,
+        'Lifecycle_Stage': 'Early Career', 'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term'
+    }
+    sample_output = {'Equity': 50, 'Debt': 30, 'Gold': 10, 'FD/Cash': 10}
+    append_data_to_csv(1, "test@example.com", "base", sample_input_base, sample_output)
+
+    sample_input_enhanced = {
+        'Profession': 'Engineer', 'City': 'Metropolis',
+        'Salary': 120000, 'Expenses': 70000, 'Savings': 50000,
+        'Lifecycle_Stage': 'Mid-Career', 'Risk_Appetite': 'High', 'Investment_Horizon': 'Long-term'
+    }
+    append_data_to_csv(2, "another@example.com", "enhanced", sample_input_enhanced, sample_output)
+
+    sample_input_rule = {
+        'Lifecycle_Stage': 'Late Career', 
+        'Risk_Appetite': 'Low', 
+        'Investment_Horizon': 'Short-term',
+        'Annual_Salary_Package': 1000000, 
+        'Monthly_In_hand_Salary': 60000, 
+        'Total_Monthly_Expenses': 40000
+    }
+    append_data_to_csv(3, "ruleuser@example.com", "rule_based", sample_input_rule, sample_output)
+    
+    logger.info(f"Test data written to {CSV_FILE_PATH}")
@@ -0,0 +1,154 @@
+import numpy as np
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+
+class FeatureColumn(NamedTuple):
+    field: str # attribute of the validated input schema
+    raw: Optional[Dict[str, float]] # category -> encoded value; None for numeric columns
+    scaled: Optional[Dict[str, float]] # category -> encoded value after the pipeline's scaler
+    encoder: bool # True when the codes come from a LabelEncoder (unknown labels raise ValueError)
+
+
+class Featurizer:
+    """
+    Turns validated model inputs into the pipeline's feature matrix.
+
+    Every category is resolved at load time to its encoded value, both raw (for the compiled
+    engine, which has the scaler folded in) and already scaled (for the sklearn path, which then
+    skips scaler.transform). Featurizing is one float write per feature into a preallocated array.
+    Values are computed exactly as LabelEncoder/mappings + StandardScaler.transform would.
+    """
+
+    def __init__(self, columns: Sequence[FeatureColumn], mean: np.ndarray, scale: np.ndarray):
+        self.columns = tuple(columns)
+        self.n_features = len(self.columns)
+        self.column_index = {column.field: j for j, column in enumerate(self.columns)}
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def from_columns(cls, pipeline: Dict[str, Any], columns: Sequence[Tuple[str, Optional[Dict[str, int]], bool]]) -> "Featurizer":
+        scaler = pipeline['scaler']
+        # Subtracting 0 / dividing by 1 is exact, so disabled centering/scaling needs no special case
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(len(columns))
+        scale = scaler.scale_ if scaler.with_std else np.ones(len(columns))
+        compiled = []
+        for j, (field, codes, encoder) in enumerate(columns):
+            if codes is None:
+                compiled.append(FeatureColumn(field, None, None, encoder))
+                continue
+            raw = {label: float(code) for label, code in codes.items()}
+            scaled = {label: float((np.float64(code) - mean[j]) / scale[j]) for label, code in codes.items()}
+            compiled.append(FeatureColumn(field, raw, scaled, encoder))
+        return cls(compiled, mean, scale)
+
+    @staticmethod
+    def _unknown(column: FeatureColumn, value: Any) -> Exception:
+        # Same exceptions (and messages) the LabelEncoder / mapping lookups raised
+        if column.encoder:
+            return ValueError(f"y contains previously unseen labels: '{value}'")
+        return KeyError(value)
+
+    def transform_one(self, item: Any, scaled: bool = False) -> np.ndarray:
+        """Feature row of shape (1, n_features); raises KeyError/ValueError for unknown categories."""
+        row = np.empty((1, self.n_features), dtype=np.float64)
+        out = row[0]
+        for j, column in enumerate(self.columns):
+            value = getattr(item, column.field)
+            if column.raw is None:
+                out[j] = (value - self.mean[j]) / self.scale[j] if scaled else value
+                continue
+            table = column.scaled if scaled else column.raw
+            if value not in table:
+                raise self._unknown(column, value)
+            out[j] = table[value]
+        return row
+
+    def transform(self, items: Sequence[Any], scaled: bool = False) -> Tuple[np.ndarray, Dict[int, Exception]]:
+        """
+        Feature matrix of shape (len(items), n_features) plus {row index: error} for rows with an
+        unknown category (reported for the first failing column, in column order). Failed rows
+        hold NaN and must be dropped before scoring.
+        """
+        X = np.empty((len(items), self.n_features), dtype=np.float64)
+        errors: Dict[int, Exception] = {}
+        for j, column in enumerate(self.columns):
+            values = [getattr(item, column.field) for item in items]
+            if column.raw is None:
+                X[:, j] = values
+                if scaled:
+                    X[:, j] -= self.mean[j]
+                    X[:, j] /= self.scale[j]
+                continue
+            table = column.scaled if scaled else column.raw
+            try:
+                X[:, j] = [table[value] for value in values]
+            except KeyError:
+                for i, value in enumerate(values):
+                    if value in table:
+                        X[i, j] = table[value]
+                    else:
+                        X[i, j] = np.nan
+                        errors.setdefault(i, self._unknown(column, value))
+        return X, errors
+
+    def transform_grid(self, item: Any, axes: Sequence[Tuple[str, Sequence[Any]]], scaled: bool = False) -> np.ndarray:
+        """
+        One row per combination of the axis values (row-major, last axis fastest), every other
+        feature taken from `item`. Each axis value is encoded once; raises like transform_one.
+        """
+        base_row = self.transform_one(item, scaled)
+        shape = [len(values) for _, values in axes]
+        X = np.repeat(base_row, int(np.prod(shape)), axis=0)
+        positions = np.indices(shape).reshape(len(axes), -1)
+        for (field, values), position in zip(axes, positions):
+            j = self.column_index[field]
+            column = self.columns[j]
+            if column.raw is None:
+                encoded = np.asarray(values, dtype=np.float64)
+                if scaled:
+                    encoded = (encoded - self.mean[j]) / self.scale[j]
+            else:
+                table = column.scaled if scaled else column.raw
+                unknown = [value for value in values if value not in table]
+                if unknown:
+                    raise self._unknown(column, unknown[0])
+                encoded = np.asarray([table[value] for value in values], dtype=np.float64)
+            X[:, j] = encoded[position]
+        return X
+
+
+def build_base_featurizer(pipeline: Optional[Dict[str, Any]]) -> Optional[Featurizer]:
+    if not pipeline:
+        return None
+    mappings = pipeline['mappings']
+    # Order from Reference/basemodel.py: Salary, Expenses, Savings, Lifecycle Stage, Risk Appetite, Investment Horizon
+    return Featurizer.from_columns(pipeline, [
+        ('Salary', None, False),
+        ('Expenses', None, False),
+        ('Savings', None, False),
+        ('Lifecycle_Stage', mappings['lifecycle'], False),
+        ('Risk_Appetite', mappings['risk'], False),
+        ('Investment_Horizon', mappings['horizon'], False),
+    ])
+
+def build_enhanced_featurizer(pipeline: Optional[Dict[str, Any]]) -> Optional[Featurizer]:
+    if not pipeline:
+        return None
+    mappings = pipeline['mappings']
+    # LabelEncoder codes are the positions in the sorted classes_
+    professions = {label: code for code, label in enumerate(pipeline['profession_encoder'].classes_)}
+    cities = {label: code for code, label in enumerate(pipeline['city_encoder'].classes_)}
+    # Order from Reference/enhancedmodel.py:
+    # ['Profession', 'City', 'Salary', 'Expenses', 'Savings', 'Lifecycle Stage', 'Risk Appetite', 'Investment Horizon']
+    return Featurizer.from_columns(pipeline, [
+        ('Profession', professions, True),
+        ('City', cities, True),
+        ('Salary', None, False),
+        ('Expenses', None, False),
+        ('Savings', None, False),
+        ('Lifecycle_Stage', mappings['lifecycle'], False),
+        ('Risk_Appetite', mappings['risk'], False),
+        ('Investment_Horizon', mappings['horizon'], False),
+    ])
+
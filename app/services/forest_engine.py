@@ -0,0 +1,217 @@
+import numpy as np
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows traversed per chunk; bounds the (rows x trees) node-index matrix for large batches
+PREDICT_CHUNK_ROWS = 4096
+
+_INT64_MIN = np.int64(np.iinfo(np.int64).min)
+
+
+# --- Scaler Folding ---
+# sklearn scores a tree on float32(scaler.transform(x)), so "x_scaled <= threshold" is only
+# equivalent to "x <= raw_threshold" if raw_threshold is chosen with the same rounding.
+# We search, per split, for the largest float64 x whose scaled float32 value still goes left.
+
+def _float_to_key(x: np.ndarray) -> np.ndarray:
+    # Maps float64 values to int64 keys with the same ordering (-0.0 and 0.0 share a key)
+    bits = x.view(np.int64)
+    return np.where(bits >= 0, bits, _INT64_MIN - bits)
+
+def _key_to_float(key: np.ndarray) -> np.ndarray:
+    bits = np.where(key >= 0, key, _INT64_MIN - key)
+    return bits.astype(np.int64).view(np.float64)
+
+def _fold_scaler_into_thresholds(thresholds: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Returns raw-space thresholds t such that, for every float64 x,
+    x <= t  <=>  float32((x - mean) / scale) <= threshold.
+    """
+    def goes_left(key):
+        x = _key_to_float(key)
+        with np.errstate(over='ignore', invalid='ignore'):
+            return ((x - mean) / scale).astype(np.float32) <= thresholds
+
+    lo = np.full(thresholds.shape, _float_to_key(np.array([-np.inf]))[0]) # always goes left
+    hi = np.full(thresholds.shape, _float_to_key(np.array([np.inf]))[0]) # never goes left
+    # 64 halvings of the int64 key range pin down the boundary exactly
+    for _ in range(64):
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        left = goes_left(mid)
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+    return _key_to_float(lo)
+
+
+# --- Compiled Forest ---
+class CompiledForest:
+    """
+    Flat NumPy form of a {'model': MultiOutputRegressor(RandomForestRegressor), 'scaler': StandardScaler}
+    pipeline. All trees of all outputs share one set of node arrays. By default the scaler is folded
+    into the thresholds, so predict() takes the raw (unscaled) feature matrix; with scaled_input the
+    thresholds stay in the scaler's space and predict() takes scaler.transform(X), compared in float32
+    exactly like sklearn does (this is the form stored by forest_format).
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        n_outputs: int,
+        n_features: int,
+        max_depth: int,
+        scaled_input: bool = False
+    ):
+        self.feature = feature # split feature per node (0 for leaves)
+        self.threshold = threshold # split threshold per node (raw space unless scaled_input)
+        self.left = left # global index of the left child (leaves point to themselves)
+        self.right = right # global index of the right child (leaves point to themselves)
+        self.value = value # mean target of the training samples in each node
+        self.roots = roots # root node of every tree, ordered output-major
+        self.n_outputs = n_outputs
+        self.n_trees = len(roots) // n_outputs
+        self.n_features = n_features
+        self.max_depth = max_depth
+        self.scaled_input = scaled_input
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Dict[str, Any], fold_scaler: bool = True) -> "CompiledForest":
+        model = pipeline['model']
+        scaler = pipeline.get('scaler')
+        n_features = int(model.estimators_[0].n_features_in_)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for forest in model.estimators_: # one RandomForestRegressor per output
+            for tree in forest.estimators_:
+                t = tree.tree_
+                is_leaf = t.children_left < 0
+                own_index = np.arange(t.node_count) + offset
+                features.append(np.where(is_leaf, 0, t.feature))
+                thresholds.append(np.where(is_leaf, np.inf, t.threshold))
+                lefts.append(np.where(is_leaf, own_index, t.children_left + offset))
+                rights.append(np.where(is_leaf, own_index, t.children_right + offset))
+                values.append(t.value[:, 0, 0])
+                roots.append(offset)
+                offset += t.node_count
+                max_depth = max(max_depth, int(t.max_depth))
+
+        feature = np.concatenate(features).astype(np.intp)
+        threshold = np.concatenate(thresholds).astype(np.float64)
+        if scaler is not None:
+            mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+        else:
+            mean, scale = np.zeros(n_features), np.ones(n_features)
+        if fold_scaler:
+            split = np.isfinite(threshold)
+            threshold[split] = _fold_scaler_into_thresholds(threshold[split], mean[feature[split]], scale[feature[split]])
+
+        return cls(
+            feature=feature,
+            threshold=threshold,
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            n_outputs=len(model.estimators_),
+            n_features=n_features,
+            max_depth=max_depth,
+            scaled_input=not fold_scaler
+        )
+
+    def _paths(self, X: np.ndarray):
+        """
+        Walks every row down every tree, yielding (split features, current nodes, next nodes),
+        each of shape (n_rows, n_outputs * n_trees), once per level; the last next nodes are the leaves.
+        """
+        # sklearn compares float32 features against the thresholds; raw-space thresholds already account for that
+        X = np.ascontiguousarray(X, dtype=np.float32 if self.scaled_input else np.float64)
+        n_rows = X.shape[0]
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows) * self.n_features)[:, None]
+        nodes = np.repeat(self.roots[None, :], n_rows, axis=0)
+        # Leaves loop back to themselves, so every tree can take max_depth steps
+        for _ in range(self.max_depth):
+            features = self.feature[nodes]
+            go_left = flat_X[row_offsets + features] <= self.threshold[nodes]
+            next_nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            yield features, nodes, next_nodes
+            nodes = next_nodes
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Returns the leaf reached in every tree, shape (n_rows, n_outputs * n_trees)."""
+        nodes = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _, _, nodes in self._paths(X):
+            pass
+        return nodes
+
+    @property
+    def bias(self) -> np.ndarray:
+        """Forest mean of the root values per output: the prediction before any split, shape (n_outputs,)."""
+        return self.value[self.roots].reshape(self.n_outputs, self.n_trees).sum(axis=1) / self.n_trees
+
+    def explain(self, X: np.ndarray):
+        """
+        Tree-path (Saabas) attribution in the same traversal as the prediction. Every split a row
+        passes credits the change in node mean, value[child] - value[parent], to the split feature.
+        Returns (per-tree predictions as in predict_trees, contributions of shape
+        (n_rows, n_features, n_outputs)); bias + contributions.sum(axis=1) equals predict(X) up to rounding.
+        """
+        X = np.asarray(X)
+        per_tree = np.empty((self.n_trees, X.shape[0], self.n_outputs), dtype=np.float64)
+        contributions = np.empty((X.shape[0], self.n_features, self.n_outputs), dtype=np.float64)
+        # Column c of the node matrix belongs to output c // n_trees
+        output_of_column = np.repeat(np.arange(self.n_outputs), self.n_trees)
+        for start in range(0, X.shape[0], PREDICT_CHUNK_ROWS):
+            chunk = X[start:start + PREDICT_CHUNK_ROWS]
+            n_rows = chunk.shape[0]
+            row_base = (np.arange(n_rows) * self.n_features)[:, None]
+            totals = np.zeros(n_rows * self.n_features * self.n_outputs)
+            leaves = np.repeat(self.roots[None, :], n_rows, axis=0)
+            for features, nodes, leaves in self._paths(chunk):
+                # Leaves step onto themselves, adding zero to feature 0
+                slots = (row_base + features) * self.n_outputs + output_of_column
+                totals += np.bincount(slots.ravel(), weights=(self.value[leaves] - self.value[nodes]).ravel(),
+                                      minlength=totals.size)
+            per_tree[:, start:start + n_rows] = self.value[leaves].reshape(n_rows, self.n_outputs, self.n_trees).transpose(2, 0, 1)
+            contributions[start:start + n_rows] = totals.reshape(n_rows, self.n_features, self.n_outputs) / self.n_trees
+        return per_tree, contributions
+
+    def predict_trees(self, X: np.ndarray) -> np.ndarray:
+        """Per-tree predictions, shape (n_trees, n_rows, n_outputs)."""
+        leaves = self.apply(X)
+        per_tree = self.value[leaves].reshape(len(leaves), self.n_outputs, self.n_trees)
+        return np.ascontiguousarray(per_tree.transpose(2, 0, 1))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Forest mean per output, shape (n_rows, n_outputs); same values as model.predict(scaler.transform(X))
+        (or model.predict(X) when scaled_input).
+        """
+        X = np.asarray(X)
+        out = np.empty((X.shape[0], self.n_outputs), dtype=np.float64)
+        for start in range(0, X.shape[0], PREDICT_CHUNK_ROWS):
+            stop = start + PREDICT_CHUNK_ROWS
+            # Summing over the leading axis adds tree by tree, in the same order as sklearn
+            out[start:stop] = self.predict_trees(X[start:stop]).sum(axis=0) / self.n_trees
+        return out
+
+
+def compile_pipeline(pipeline: Optional[Dict[str, Any]]) -> Optional[CompiledForest]:
+    """Compiles a loaded pipeline, or returns None so callers fall back to the sklearn path."""
+    if not pipeline:
+        return None
+    try:
+        return CompiledForest.from_pipeline(pipeline)
+    except Exception as e:
+        logger.error(f"Could not compile model pipeline, using sklearn inference: {e}")
+        return None
+
@@ -0,0 +1,213 @@
+import json
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from app.services.forest_engine import CompiledForest
+
+logger = logging.getLogger(__name__)
+
+# --- Compact Forest Format ---
+# One file per model: magic, header length, JSON header (shapes, dtypes, offsets, scaler parameters,
+# category mappings), then the raw node arrays, each 64-byte aligned so they can be memory-mapped.
+#   feature    uint8/uint16  split feature per node
+#   threshold  float32       split threshold in the scaler's space, rounded down (see _round_down_to_float32)
+#   left/right int32         child node indices (leaves point to themselves)
+#   value      float64       node means (kept at full precision so unpruned predictions stay identical)
+#   roots      int32         root node of every tree, output-major
+
+FORMAT_MAGIC = b"FAFOREST"
+FORMAT_VERSION = 1
+_ALIGNMENT = 64
+
+
+class ScalerParams:
+    """The parts of a fitted StandardScaler the featurizer and warm-up need, without sklearn."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray, with_mean: bool = True, with_std: bool = True):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.with_mean = with_mean
+        self.with_std = with_std
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        if self.with_mean:
+            X -= self.mean_
+        if self.with_std:
+            X /= self.scale_
+        return X
+
+
+class LabelClasses:
+    """Stands in for a fitted LabelEncoder: only classes_ (sorted labels) is used once a featurizer exists."""
+
+    def __init__(self, classes: List[str]):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+
+def _round_down_to_float32(threshold: np.ndarray) -> np.ndarray:
+    # sklearn tests float32(x) <= float64 threshold; for a float32 x that is the same as testing
+    # x <= the largest float32 not above the threshold, so this rounding loses nothing
+    t32 = threshold.astype(np.float32)
+    too_high = t32.astype(np.float64) > threshold
+    t32[too_high] = np.nextafter(t32[too_high], np.float32(-np.inf))
+    return t32
+
+def _node_depths(forest: CompiledForest) -> np.ndarray:
+    depths = np.full(len(forest.feature), -1, dtype=np.int64)
+    depths[forest.roots] = 0
+    frontier = np.asarray(forest.roots)
+    depth = 0
+    while len(frontier):
+        is_split = forest.left[frontier] != frontier
+        children = np.concatenate([forest.left[frontier][is_split], forest.right[frontier][is_split]])
+        depth += 1
+        depths[children] = depth
+        frontier = children
+    return depths
+
+def prune(forest: CompiledForest, max_depth: Optional[int] = None, n_trees: Optional[int] = None) -> CompiledForest:
+    """
+    Keeps the first `n_trees` trees per output and turns nodes at `max_depth` into leaves (predicting
+    their node mean), then drops the unreachable nodes and renumbers the rest.
+    """
+    n_trees = min(n_trees or forest.n_trees, forest.n_trees)
+    roots = np.asarray(forest.roots).reshape(forest.n_outputs, forest.n_trees)[:, :n_trees].ravel()
+    left, right = np.array(forest.left), np.array(forest.right)
+    feature, threshold = np.array(forest.feature), np.array(forest.threshold)
+
+    kept_forest = CompiledForest(feature, threshold, left, right, np.asarray(forest.value), roots,
+                                 forest.n_outputs, forest.n_features, forest.max_depth, forest.scaled_input)
+    depths = _node_depths(kept_forest)
+    if max_depth is not None:
+        cut = depths == max_depth
+        own_index = np.flatnonzero(cut)
+        left[cut] = own_index
+        right[cut] = own_index
+        feature[cut] = 0
+        threshold[cut] = np.inf
+        depths = _node_depths(kept_forest)
+
+    reachable = np.flatnonzero(depths >= 0)
+    new_index = np.full(len(feature), -1, dtype=np.int64)
+    new_index[reachable] = np.arange(len(reachable))
+    return CompiledForest(
+        feature=feature[reachable],
+        threshold=threshold[reachable],
+        left=new_index[left[reachable]],
+        right=new_index[right[reachable]],
+        value=np.asarray(forest.value)[reachable],
+        roots=new_index[roots],
+        n_outputs=forest.n_outputs,
+        n_features=forest.n_features,
+        max_depth=int(depths.max()),
+        scaled_input=forest.scaled_input
+    )
+
+def export_pipeline(
+    pipeline: Dict[str, Any],
+    path: str,
+    max_depth: Optional[int] = None,
+    n_trees: Optional[int] = None
+) -> CompiledForest:
+    """Writes `pipeline` (model, scaler, mappings and any label encoders) in the compact format."""
+    forest = CompiledForest.from_pipeline(pipeline, fold_scaler=False)
+    if max_depth is not None or n_trees is not None:
+        forest = prune(forest, max_depth=max_depth, n_trees=n_trees)
+
+    feature_dtype = np.uint8 if forest.n_features <= np.iinfo(np.uint8).max else np.uint16
+    arrays = {
+        "feature": np.asarray(forest.feature, dtype=feature_dtype),
+        "threshold": _round_down_to_float32(np.asarray(forest.threshold, dtype=np.float64)),
+        "left": np.asarray(forest.left, dtype=np.int32),
+        "right": np.asarray(forest.right, dtype=np.int32),
+        "value": np.asarray(forest.value, dtype=np.float64),
+        "roots": np.asarray(forest.roots, dtype=np.int32),
+    }
+    scaler = pipeline['scaler']
+    header = {
+        "format_version": FORMAT_VERSION,
+        "n_outputs": forest.n_outputs,
+        "n_trees": forest.n_trees,
+        "n_features": forest.n_features,
+        "max_depth": forest.max_depth,
+        "pruning": {"max_depth": max_depth, "n_trees": n_trees},
+        "scaler": {"mean": np.asarray(scaler.mean_).tolist(), "scale": np.asarray(scaler.scale_).tolist(),
+                   "with_mean": bool(scaler.with_mean), "with_std": bool(scaler.with_std)},
+        "mappings": pipeline['mappings'],
+        "encoders": {key: [str(label) for label in pipeline[key].classes_]
+                     for key in ('profession_encoder', 'city_encoder') if key in pipeline},
+        "arrays": {},
+    }
+
+    # Offsets depend on the header size, so lay the arrays out relative to an aligned data start
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(FORMAT_MAGIC) + 8 + len(header_bytes)) // _ALIGNMENT) * _ALIGNMENT
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(FORMAT_MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path) # readers never see a half-written file
+    return forest
+
+def read_header(path: str) -> Tuple[Dict[str, Any], int]:
+    with open(path, "rb") as f:
+        if f.read(len(FORMAT_MAGIC)) != FORMAT_MAGIC:
+            raise ValueError(f"{path} is not a compact forest file")
+        header_length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_length))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact forest format version {header.get('format_version')}")
+    data_start = -(-(len(FORMAT_MAGIC) + 8 + header_length) // _ALIGNMENT) * _ALIGNMENT
+    return header, data_start
+
+def load_compact(path: str) -> Tuple[CompiledForest, Dict[str, Any]]:
+    """
+    Memory-maps a compact forest file. Returns the engine (scaled_input) and a pipeline dict with
+    'model': None plus the scaler parameters, mappings and encoder classes the featurizer needs.
+    Pages are shared between workers mapping the same file.
+    """
+    header, data_start = read_header(path)
+    arrays = {
+        name: np.memmap(path, dtype=np.dtype(spec["dtype"]), mode="r",
+                        offset=data_start + spec["offset"], shape=tuple(spec["shape"]))
+        for name, spec in header["arrays"].items()
+    }
+    engine = CompiledForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        right=arrays["right"],
+        value=arrays["value"],
+        roots=np.asarray(arrays["roots"], dtype=np.intp),
+        n_outputs=header["n_outputs"],
+        n_features=header["n_features"],
+        max_depth=header["max_depth"],
+        scaled_input=True
+    )
+    scaler = header["scaler"]
+    pipeline: Dict[str, Any] = {
+        'model': None, # no sklearn objects: scoring always goes through the engine
+        'scaler': ScalerParams(np.asarray(scaler["mean"]), np.asarray(scaler["scale"]),
+                               scaler["with_mean"], scaler["with_std"]),
+        'mappings': header["mappings"],
+    }
+    for key, classes in header["encoders"].items():
+        pipeline[key] = LabelClasses(classes)
+    return engine, pipeline
+
+def compact_path_for(pickle_path: str) -> str:
+    return os.path.splitext(pickle_path)[0] + ".forest"
+
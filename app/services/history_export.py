@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+
+from app import crud, schemas
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_BATCH_SIZE = 2000 # rows fetched from the cursor, and written to the response, at a time
+
+# CSV columns: the record fields, then every input field any model takes (in the comparison
+# schema's order); inputs outside that set go to "other_inputs" as a JSON object
+EXPORT_RECORD_FIELDS = ["id", "user_id", "model_type", "timestamp"]
+EXPORT_INPUT_FIELDS = list(schemas.CompareModelsInputSchema.model_fields)
+EXPORT_OUTPUT_FIELDS = list(crud.ALLOCATION_CLASSES) # the allocation per asset class, from the typed columns
+EXPORT_CSV_HEADERS = EXPORT_RECORD_FIELDS + EXPORT_INPUT_FIELDS + EXPORT_OUTPUT_FIELDS + ["other_inputs"]
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, like the stored timestamps (SQLite keeps no offset); naive input is taken as UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _ndjson_lines(rows: List[Any]) -> str:
+    return "".join(
+        json.dumps({
+            "id": row.id,
+            "user_id": row.user_id,
+            "model_type": row.model_type,
+            "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+            "input_data": row.input_data,
+            "output_data": row.output_data,
+        }, default=str) + "\n"
+        for row in rows
+    )
+
+def _csv_lines(rows: List[Any]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        inputs = row.input_data if isinstance(row.input_data, dict) else {}
+        other = {key: value for key, value in inputs.items() if key not in EXPORT_INPUT_FIELDS}
+        writer.writerow(
+            [row.id, row.user_id, row.model_type, row.timestamp.isoformat() if row.timestamp else ""]
+            + [inputs.get(field, "") for field in EXPORT_INPUT_FIELDS]
+            + ["" if getattr(row, field) is None else getattr(row, field) for field in EXPORT_OUTPUT_FIELDS]
+            + [json.dumps(other, default=str) if other else ""]
+        )
+    return buffer.getvalue()
+
+def export_user_data_inputs(
+    export_format: str = "ndjson",
+    user_id: Optional[int] = None,
+    filters: Optional[schemas.UserDataInputFilters] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    session_factory: Callable = SessionLocal,
+    archived: bool = False
+) -> Iterator[str]:
+    """
+    Generates the matching UserDataInput rows as NDJSON or CSV text, one chunk per batch of rows,
+    for a StreamingResponse. Opens its own session, since the response body is produced after the
+    endpoint has returned, and only ever holds one batch in memory.
+    """
+    encode = _ndjson_lines if export_format == "ndjson" else _csv_lines
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_CSV_HEADERS)
+        yield buffer.getvalue()
+
+    db = session_factory()
+    exported = 0
+    try:
+        rows = crud.stream_user_data_inputs(db, user_id, filters, start, end, batch_size=batch_size, archived=archived)
+        batch: List[Any] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield encode(batch)
+                exported += len(batch)
+                batch = []
+        if batch:
+            yield encode(batch)
+            exported += len(batch)
+    finally:
+        db.close()
+        logger.info(f"Exported {exported} user data inputs as {export_format}")
+
+def export_filename(export_format: str, filters: Dict[str, Any]) -> str:
+    parts = ["user_data_inputs"] + [f"{key}-{value}" for key, value in filters.items() if value is not None]
+    return "_".join(parts).replace(":", "").replace(" ", "T") + f".{export_format}"
+
@@ -0,0 +1,145 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFull(Exception):
+    """Raised when more inference calls are outstanding than the executor accepts."""
+
+
+class InferenceTimeout(Exception):
+    """Raised when an inference call does not finish within its timeout."""
+
+
+def _ready() -> bool:
+    return True
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound inference off the event loop.
+
+    backend is "thread" (shared models, lowest overhead), "process" (models preloaded in every
+    worker by `initializer`, no GIL contention with the event loop) or "inline" (run on the
+    event loop, the original behaviour).
+    """
+
+    def __init__(
+        self,
+        backend: str = "thread",
+        max_workers: int = 4,
+        max_queue_depth: int = 256,
+        timeout_seconds: float = 5.0,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = ()
+    ):
+        if backend not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown inference backend: {backend}")
+        self.backend = backend
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.timeout_seconds = timeout_seconds
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._outstanding = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _create_pool(self) -> Optional[Executor]:
+        if self.backend == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        if self.backend == "process":
+            # spawn: workers must not inherit the server's threads and event loop
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+                initargs=self.initargs
+            )
+        return None
+
+    def _warm_up(self, pool: Optional[Executor]):
+        # Process workers start lazily and load the models in `initializer`; do that now rather
+        # than inside the first requests' timeouts
+        if isinstance(pool, ProcessPoolExecutor):
+            for future in [pool.submit(_ready) for _ in range(self.max_workers)]:
+                future.result()
+
+    def start(self):
+        if self._pool is None:
+            self._pool = self._create_pool()
+            self._warm_up(self._pool)
+            logger.info(f"Inference executor started ({self.backend}, {self.max_workers} workers).")
+
+    def recycle(self):
+        """Swaps in a fresh pool (e.g. so process workers load new models); running calls finish on the old one."""
+        if self._pool is None:
+            return
+        new_pool = self._create_pool()
+        self._warm_up(new_pool)
+        old_pool, self._pool = self._pool, new_pool
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._outstanding -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pool is None:
+            # Inline backend, or the executor was never started
+            return fn(*args)
+
+        with self._lock:
+            if self._outstanding >= self.max_queue_depth:
+                self.rejected += 1
+                raise InferenceQueueFull(f"Inference queue is full ({self.max_queue_depth} calls outstanding)")
+            self._outstanding += 1
+        try:
+            future = self._pool.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # The slot is freed when the work really finishes, not when the caller stops waiting
+        future.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.timeouts += 1
+            raise InferenceTimeout(f"Inference did not finish within {self.timeout_seconds} s")
+        except Exception:
+            self.failures += 1
+            raise
+        self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "timeout_seconds": self.timeout_seconds,
+            "outstanding": self._outstanding,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
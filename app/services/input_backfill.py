@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from app import crud
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Rows whose typed columns are missing (written before the columns existed) or computed by an
+# older crud.TYPED_COLUMNS_VERSION are updated in chunks, one short transaction each, so request
+# writes get the SQLite write lock between chunks. The archive table is done after the live one.
+BACKFILL_CHUNK_ROWS = 2000
+BACKFILL_PAUSE_SECONDS = 0.05
+
+# Held by whichever job is rewriting stored inputs, this backfill or the retention job
+# (services/retention.py), so neither works on rows the other is updating or moving
+maintenance_lock = threading.Lock()
+last_backfill: Optional[Dict[str, Any]] = None
+_progress: Optional[Dict[str, Any]] = None
+
+
+def backfill_typed_columns(
+    chunk_rows: int = BACKFILL_CHUNK_ROWS,
+    pause_seconds: float = BACKFILL_PAUSE_SECONDS,
+    max_chunks: Optional[int] = None,
+    session_factory: Callable = SessionLocal,
+    wait: bool = False
+) -> Dict[str, Any]:
+    """
+    Fills the typed columns of live and archived inputs from input_data/output_data for every row
+    that needs it, in id order. Safe to interrupt: done rows are marked with crud.TYPED_COLUMNS_VERSION,
+    so the next run carries on where this one stopped. Returns an error while an archival run or
+    another backfill holds maintenance_lock, unless `wait` is set.
+    """
+    global last_backfill, _progress
+    if not maintenance_lock.acquire(blocking=wait):
+        return {"error": "A backfill or archival run is already in progress"}
+    start = time.perf_counter()
+    _progress = {"running": True, "rows_updated": 0, "chunks": 0, "table": None, "last_id": 0}
+    db = session_factory()
+    try:
+        for archived in (False, True):
+            _progress.update(table=crud.input_model(archived).__tablename__, last_id=0)
+            while max_chunks is None or _progress["chunks"] < max_chunks:
+                updated, last_id = crud.backfill_typed_columns_chunk(db, after_id=_progress["last_id"], limit=chunk_rows, archived=archived)
+                if last_id is None:
+                    break
+                _progress.update(rows_updated=_progress["rows_updated"] + updated, chunks=_progress["chunks"] + 1, last_id=last_id)
+                if pause_seconds:
+                    time.sleep(pause_seconds)
+        last_backfill = dict(_progress, running=False, complete=max_chunks is None or _progress["chunks"] < max_chunks,
+                             seconds=round(time.perf_counter() - start, 3))
+        if last_backfill["rows_updated"]:
+            logger.info(f"Backfilled the typed columns of {last_backfill['rows_updated']} user data inputs in {last_backfill['seconds']} s")
+        return last_backfill
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Backfill of the typed user data input columns failed after {_progress['table']} id {_progress['last_id']}: {e}")
+        last_backfill = dict(_progress, running=False, complete=False, error=str(e))
+        return {"error": f"Backfill failed after {_progress['table']} id {_progress['last_id']}: {e}"}
+    finally:
+        db.close()
+        _progress = None
+        maintenance_lock.release()
+
+def start_backfill():
+    """Runs the backfill in a background thread (called on app startup); rows already done are skipped quickly."""
+    threading.Thread(target=backfill_typed_columns, kwargs={"wait": True}, name="input-backfill", daemon=True).start()
+
+def get_backfill_status() -> Dict[str, Any]:
+    return {"version": crud.TYPED_COLUMNS_VERSION, "current": _progress, "last": last_backfill}
+
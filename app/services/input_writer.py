@@ -0,0 +1,178 @@
+import asyncio
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from app import crud, schemas
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class InputWriterQueueFull(Exception):
+    """The writer could not accept a record within the enqueue timeout."""
+
+
+class BatchedInputWriter:
+    """
+    Writes UserDataInput records to the database from one background thread, many per transaction.
+
+    Producers only enqueue; the writer thread inserts what has accumulated in one transaction
+    once `batch_rows` records are pending or `flush_interval_seconds` after the first of them
+    arrived. Each record is timestamped when it is enqueued, not when it is committed.
+    A failed transaction is retried (`max_attempts` in all) before its records are dropped.
+    The queue is bounded like the CSV writer's; flush() waits until everything enqueued before
+    it is committed, and stop() drains the queue.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        max_queue_size: int = 10000,
+        batch_rows: int = 500,
+        flush_interval_seconds: float = 0.5,
+        enqueue_timeout_seconds: float = 2.0,
+        max_attempts: int = 3,
+        retry_delay_seconds: float = 0.5
+    ):
+        self.session_factory = session_factory
+        self.max_queue_size = max_queue_size
+        self.batch_rows = batch_rows
+        self.flush_interval_seconds = flush_interval_seconds
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+        self.rows_written = 0
+        self.transactions = 0
+        self.largest_batch = 0
+        self.backpressure_waits = 0 # enqueues that found the queue full
+        self.write_errors = 0 # failed transactions, including ones retried successfully
+        self.dropped = 0 # records given up on after max_attempts
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="input-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Commits everything queued so far and stops the thread."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @staticmethod
+    def build_record(item: schemas.UserDataInputCreate, user_id: int) -> Dict[str, Any]:
+        return dict(crud.user_data_input_values(item, user_id), timestamp=datetime.now(timezone.utc))
+
+    def put(self, record: Dict[str, Any]):
+        """Blocking enqueue (for threads); raises InputWriterQueueFull after enqueue_timeout_seconds."""
+        try:
+            self._queue.put_nowait(record)
+            return
+        except queue.Full:
+            self.backpressure_waits += 1
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout_seconds)
+        except queue.Full:
+            raise InputWriterQueueFull(f"Input writer queue full ({self.max_queue_size} records)")
+
+    async def submit(self, record: Dict[str, Any]):
+        """Enqueue from the event loop; only waits (off the loop) when the queue is full."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            await asyncio.to_thread(self.put, record)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every record enqueued before this call is committed (or dropped)."""
+        if not self.running:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _commit(self, batch: List[Dict[str, Any]]):
+        for attempt in range(1, self.max_attempts + 1):
+            db = self.session_factory()
+            try:
+                crud.bulk_create_user_data_inputs(db, batch)
+                self.rows_written += len(batch)
+                self.transactions += 1
+                self.largest_batch = max(self.largest_batch, len(batch))
+                return
+            except Exception as e:
+                db.rollback()
+                self.write_errors += 1
+                logger.warning(f"Inserting {len(batch)} user data inputs failed (attempt {attempt}/{self.max_attempts}): {e}")
+            finally:
+                db.close()
+            if attempt < self.max_attempts:
+                time.sleep(self.retry_delay_seconds * attempt)
+        self.dropped += len(batch)
+        logger.error(f"Dropped {len(batch)} user data inputs after {self.max_attempts} failed attempts")
+
+    def _run(self):
+        batch: List[Dict[str, Any]] = []
+        deadline = 0.0
+        stopping = False
+        while not stopping:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            waiters: List[threading.Event] = []
+            # Take whatever else is already queued, so a burst goes into one transaction
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_interval_seconds
+                    batch.append(item)
+                    if len(batch) >= self.batch_rows:
+                        break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if batch and (stopping or waiters or len(batch) >= self.batch_rows or time.monotonic() >= deadline):
+                self._commit(batch)
+                batch = []
+            for waiter in waiters:
+                waiter.set()
+        logger.info(f"Input writer stopped, {self.rows_written} user data inputs written in {self.transactions} transactions")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+            "batch_rows": self.batch_rows,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "rows_written": self.rows_written,
+            "transactions": self.transactions,
+            "largest_batch": self.largest_batch,
+            "backpressure_waits": self.backpressure_waits,
+            "write_errors": self.write_errors,
+            "dropped": self.dropped,
+        }
+
@@ -0,0 +1,234 @@
+import csv
+import io
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+import logging
+
+from app.services import data_service
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Optional: without pyarrow partitions are stored as NumPy .npz
+    pa = pq = None
+
+# Columnar copy of the recommendation CSV: one file per day and model type,
+# <LOG_ARCHIVE_DIR>/date=YYYY-MM-DD/<model_type>.parquet (or .npz)
+LOG_ARCHIVE_DIR = os.path.join(os.path.dirname(data_service.CSV_FILE_PATH), "log_archive")
+LOG_ARCHIVE_FORMAT = "auto" # "parquet", "npz" or "auto" (parquet when pyarrow is installed)
+
+MANIFEST_FILE = "_manifest.json"
+
+# Typed columns; names are the CSV headers
+INTEGER_COLUMNS = ('UserID',)
+TIMESTAMP_COLUMNS = ('Timestamp',)
+FLOAT_COLUMNS = (
+    'Age', 'Salary', 'Expenses', 'Savings',
+    'Annual Salary Package', 'Monthly In-hand Salary', 'Total Monthly Expenses',
+    'Equity (%)', 'Debt (%)', 'Gold (%)', 'FD/Cash (%)',
+)
+STRING_COLUMNS = tuple(h for h in data_service.CSV_HEADERS if h not in INTEGER_COLUMNS + TIMESTAMP_COLUMNS + FLOAT_COLUMNS)
+
+_compaction_lock = threading.Lock()
+
+
+def archive_format() -> str:
+    if LOG_ARCHIVE_FORMAT == "auto":
+        return "parquet" if pq is not None else "npz"
+    if LOG_ARCHIVE_FORMAT == "parquet" and pq is None:
+        raise RuntimeError("LOG_ARCHIVE_FORMAT is 'parquet' but pyarrow is not installed")
+    return LOG_ARCHIVE_FORMAT
+
+def _empty_column(name: str, n: int) -> np.ndarray:
+    if name in INTEGER_COLUMNS:
+        return np.full(n, -1, dtype=np.int64)
+    if name in TIMESTAMP_COLUMNS:
+        return np.full(n, np.datetime64('NaT'), dtype='datetime64[s]')
+    if name in FLOAT_COLUMNS:
+        return np.full(n, np.nan)
+    return np.full(n, '', dtype=str)
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value) if value != '' else np.nan
+    except ValueError:
+        return np.nan
+
+def _typed_columns(rows: List[List[str]]) -> Dict[str, np.ndarray]:
+    """CSV rows -> typed column arrays; columns blank in every row are left out."""
+    columns: Dict[str, np.ndarray] = {}
+    for j, name in enumerate(data_service.CSV_HEADERS):
+        values = [row[j] if j < len(row) else '' for row in rows]
+        if name in INTEGER_COLUMNS:
+            column = np.asarray([int(v) if v.lstrip('-').isdigit() else -1 for v in values], dtype=np.int64)
+        elif name in TIMESTAMP_COLUMNS:
+            column = np.asarray([v.replace(' ', 'T') if v else 'NaT' for v in values], dtype='datetime64[s]')
+        elif name in FLOAT_COLUMNS:
+            column = np.asarray([_to_float(v) for v in values], dtype=np.float64)
+            if np.isnan(column).all():
+                continue
+        else:
+            if not any(values):
+                continue
+            column = np.asarray(values, dtype=str)
+        columns[name] = column
+    return columns
+
+def _partition_file(archive_dir: str, day: str, model_type: str) -> str:
+    safe_model = "".join(c if c.isalnum() or c in "-_" else "_" for c in model_type) or "unknown"
+    return os.path.join(archive_dir, f"date={day}", f"{safe_model}.{archive_format()}")
+
+def _write_partition(path: str, columns: Dict[str, np.ndarray]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    if path.endswith(".parquet"):
+        pq.write_table(pa.table({name: pa.array(values) for name, values in columns.items()}), tmp)
+    else:
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **columns)
+    os.replace(tmp, path)
+
+def _read_partition(path: str, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """Loads only the requested columns (all when None) that the partition has."""
+    if path.endswith(".parquet"):
+        available = pq.read_schema(path).names
+        wanted = [c for c in (columns or available) if c in available]
+        table = pq.read_table(path, columns=wanted)
+        return {name: table.column(name).to_numpy(zero_copy_only=False) for name in wanted}
+    with np.load(path, allow_pickle=False) as npz: # members are decompressed only when accessed
+        return {name: npz[name] for name in (columns or npz.files) if name in npz.files}
+
+def _merge(parts: Iterable[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    parts = [p for p in parts if p]
+    names = [h for h in data_service.CSV_HEADERS if any(h in p for p in parts)]
+    sizes = [len(next(iter(p.values()))) for p in parts]
+    return {name: np.concatenate([p[name] if name in p else _empty_column(name, n) for p, n in zip(parts, sizes)])
+            for name in names}
+
+
+# --- Compaction ---
+def _load_manifest(archive_dir: str) -> Dict[str, Any]:
+    path = os.path.join(archive_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def _save_manifest(archive_dir: str, manifest: Dict[str, Any]):
+    path = os.path.join(archive_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def compact_csv(csv_path: Optional[str] = None, archive_dir: Optional[str] = None, rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Moves the CSV rows appended since the last run into the day/model partitions (partitions that
+    get new rows are rewritten with old + new rows). Only complete lines are taken, so a row still
+    being written is picked up next time. The CSV itself is left untouched; the manifest records how
+    far it has been compacted. rebuild=True (or a CSV that shrank, e.g. rotated) starts from scratch.
+    """
+    csv_path = csv_path or data_service.CSV_FILE_PATH
+    archive_dir = archive_dir or LOG_ARCHIVE_DIR
+    with _compaction_lock:
+        os.makedirs(archive_dir, exist_ok=True)
+        manifest = _load_manifest(archive_dir)
+        size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        if (rebuild or manifest.get("source") != os.path.abspath(csv_path) or manifest.get("offset", 0) > size
+                or manifest.get("format", archive_format()) != archive_format()):
+            for entry in os.listdir(archive_dir):
+                if entry.startswith("date="):
+                    for name in os.listdir(os.path.join(archive_dir, entry)):
+                        os.remove(os.path.join(archive_dir, entry, name))
+                    os.rmdir(os.path.join(archive_dir, entry))
+            manifest = {"source": os.path.abspath(csv_path), "offset": 0, "rows": 0, "format": archive_format()}
+
+        with open(csv_path, "rb") as f:
+            f.seek(manifest["offset"])
+            chunk = f.read(size - manifest["offset"])
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        rows = [row for row in csv.reader(io.StringIO(complete.decode("utf-8"), newline=''))
+                if row and row != data_service.CSV_HEADERS]
+
+        groups: Dict[tuple, List[List[str]]] = {}
+        model_index = data_service.CSV_HEADERS.index('ModelType')
+        time_index = data_service.CSV_HEADERS.index('Timestamp')
+        for row in rows:
+            day = row[time_index][:10] if len(row) > time_index and row[time_index] else "unknown"
+            groups.setdefault((day, row[model_index] if len(row) > model_index else ""), []).append(row)
+
+        for (day, model_type), group in groups.items():
+            path = _partition_file(archive_dir, day, model_type)
+            existing = _read_partition(path) if os.path.exists(path) else {}
+            _write_partition(path, _merge([existing, _typed_columns(group)]))
+
+        manifest["offset"] += len(complete)
+        manifest["rows"] += len(rows)
+        manifest["compacted_at"] = datetime.now().isoformat(timespec="seconds")
+        _save_manifest(archive_dir, manifest)
+    logger.info(f"Compacted {len(rows)} CSV rows into {len(groups)} partitions under {archive_dir}")
+    return {"rows": len(rows), "partitions_written": len(groups), "total_rows": manifest["rows"],
+            "format": manifest["format"], "archive_dir": archive_dir}
+
+
+# --- Reader API ---
+def list_partitions(archive_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """(day, model_type, path, size) of every partition, oldest day first."""
+    archive_dir = archive_dir or LOG_ARCHIVE_DIR
+    if not os.path.isdir(archive_dir):
+        return []
+    partitions = []
+    for entry in sorted(os.listdir(archive_dir)):
+        if not entry.startswith("date="):
+            continue
+        for name in sorted(os.listdir(os.path.join(archive_dir, entry))):
+            if name.endswith((".parquet", ".npz")):
+                path = os.path.join(archive_dir, entry, name)
+                partitions.append({"day": entry[len("date="):], "model_type": name.rsplit(".", 1)[0],
+                                   "path": path, "size_bytes": os.path.getsize(path)})
+    return partitions
+
+def read_archive(
+    columns: Optional[Sequence[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    model_types: Optional[Sequence[str]] = None,
+    archive_dir: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Rows of the archived log between start and end (inclusive days), optionally for some model
+    types only. Only the matching partitions are opened and only `columns` are read from them;
+    columns a partition does not have (blank for its model type) come back as NaN / "".
+    Rows are in time order when Timestamp is among the columns.
+    """
+    columns = list(columns) if columns else list(data_service.CSV_HEADERS)
+    unknown = [c for c in columns if c not in data_service.CSV_HEADERS]
+    if unknown:
+        raise ValueError(f"Unknown log columns: {unknown}")
+    parts = []
+    for partition in list_partitions(archive_dir):
+        if partition["day"] != "unknown":
+            day = date.fromisoformat(partition["day"])
+            if (start and day < start) or (end and day > end):
+                continue
+        elif start or end:
+            continue
+        if model_types and partition["model_type"] not in model_types:
+            continue
+        part = _read_partition(partition["path"], columns)
+        n = len(next(iter(part.values()))) if part else len(_read_partition(partition["path"], ['UserID'])['UserID'])
+        parts.append({name: part[name] if name in part else _empty_column(name, n) for name in columns})
+    if not parts:
+        return pd.DataFrame({name: _empty_column(name, 0) for name in columns})
+    frame = pd.DataFrame({name: np.concatenate([p[name] for p in parts]) for name in columns})
+    if 'Timestamp' in frame:
+        # Partitions are read day by day, model by model; restore the log's time order
+        frame = frame.sort_values('Timestamp', kind='stable', ignore_index=True)
+    return frame
+
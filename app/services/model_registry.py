@@ -0,0 +1,173 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ModelVersion:
+    """
+    One loaded generation of the portfolio models. Never mutated after it is published, so a
+    request that took a reference keeps scoring against it even if a newer version is swapped in.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        base_pipeline: Optional[Dict[str, Any]],
+        enhanced_pipeline: Optional[Dict[str, Any]],
+        base_engine: Any = None,
+        enhanced_engine: Any = None,
+        base_featurizer: Any = None,
+        enhanced_featurizer: Any = None,
+        base_surface: Any = None,
+        sources: Optional[Dict[str, Dict[str, Any]]] = None,
+        load_ms: float = 0.0
+    ):
+        self.version = version
+        self.base_pipeline = base_pipeline
+        self.enhanced_pipeline = enhanced_pipeline
+        self.base_engine = base_engine # array-backed forest, None means sklearn is used
+        self.enhanced_engine = enhanced_engine
+        self.base_featurizer = base_featurizer # validated input -> feature row/matrix
+        self.enhanced_featurizer = enhanced_featurizer
+        self.base_surface = base_surface # precomputed allocation grid (approximate lookups), optional
+        self.sources = sources or {} # model name -> {path, sha256, size_bytes, modified_at}
+        self.load_ms = load_ms
+        self.warmup_ms = 0.0
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_ms": round(self.load_ms, 2),
+            "warmup_ms": round(self.warmup_ms, 2),
+            "models": {
+                name: dict(source, available=pipeline is not None, compiled=engine is not None)
+                for name, pipeline, engine, source in (
+                    ("base", self.base_pipeline, self.base_engine, self.sources.get("base", {})),
+                    ("enhanced", self.enhanced_pipeline, self.enhanced_engine, self.sources.get("enhanced", {})),
+                )
+            },
+            "base_surface": self.base_surface.info() if self.base_surface is not None else None,
+        }
+
+
+def describe_model_file(path: str) -> Dict[str, Any]:
+    """Path, size, modification time and content hash of a model file (the hash identifies a build)."""
+    if not os.path.exists(path):
+        return {"path": path, "sha256": None, "size_bytes": None, "modified_at": None}
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    stat = os.stat(path)
+    return {
+        "path": path,
+        "sha256": digest.hexdigest()[:16],
+        "size_bytes": stat.st_size,
+        "modified_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+    }
+
+
+class ModelRegistry:
+    """
+    Holds the ModelVersion currently served and replaces it without downtime:
+    `build(version)` loads a candidate, `warm_up(candidate, current)` validates it (raising on
+    problems) and primes it with synthetic predictions, and only then is it published with a
+    single reference swap. `on_swap` callbacks run afterwards (cache invalidation, worker recycling).
+    """
+
+    def __init__(
+        self,
+        build: Callable[[int], ModelVersion],
+        warm_up: Callable[[ModelVersion, Optional[ModelVersion]], None],
+        on_swap: Optional[List[Callable[[ModelVersion], None]]] = None
+    ):
+        self._build = build
+        self._warm_up = warm_up
+        self._on_swap = list(on_swap or [])
+        self._current: Optional[ModelVersion] = None
+        self._next_version = 1
+        self._reload_lock = threading.Lock() # one load at a time
+        self._reload_thread: Optional[threading.Thread] = None
+        self.last_reload: Optional[Dict[str, Any]] = None
+
+    @property
+    def current(self) -> Optional[ModelVersion]:
+        return self._current
+
+    def add_swap_listener(self, callback: Callable[[ModelVersion], None]):
+        self._on_swap.append(callback)
+
+    def load(self) -> ModelVersion:
+        """Builds, validates and warms up a new version, then publishes it. Raises if any step fails."""
+        with self._reload_lock:
+            started_at = datetime.now(timezone.utc)
+            version = self._next_version
+            try:
+                start = time.perf_counter()
+                candidate = self._build(version)
+                candidate.load_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                self._warm_up(candidate, self._current)
+                candidate.warmup_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                logger.error(f"Model version {version} rejected, still serving "
+                             f"{self._current.version if self._current else 'nothing'}: {e}")
+                self.last_reload = {"status": "failed", "version": version, "error": str(e),
+                                    "started_at": started_at.isoformat(),
+                                    "finished_at": datetime.now(timezone.utc).isoformat()}
+                raise
+
+            self._next_version += 1
+            previous, self._current = self._current, candidate
+            logger.info(f"Model version {candidate.version} is live (load {candidate.load_ms:.0f} ms, "
+                        f"warm-up {candidate.warmup_ms:.0f} ms, replaced {previous.version if previous else 'nothing'}).")
+            for callback in self._on_swap:
+                try:
+                    callback(candidate)
+                except Exception as e:
+                    logger.error(f"Model swap listener failed for version {candidate.version}: {e}")
+            self.last_reload = {"status": "succeeded", "version": candidate.version, "error": None,
+                                "started_at": started_at.isoformat(),
+                                "finished_at": datetime.now(timezone.utc).isoformat()}
+            return candidate
+
+    def _reload_worker(self):
+        try:
+            self.load()
+        except Exception:
+            pass # recorded in last_reload
+
+    def reload_in_background(self) -> bool:
+        """Starts load() on a background thread; returns False if a reload is already running."""
+        if self.reloading:
+            return False
+        self._reload_thread = threading.Thread(target=self._reload_worker, name="model-reload", daemon=True)
+        self.last_reload = {"status": "running", "version": self._next_version, "error": None,
+                            "started_at": datetime.now(timezone.utc).isoformat(), "finished_at": None}
+        self._reload_thread.start()
+        return True
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_thread is not None and self._reload_thread.is_alive()
+
+    def wait_for_reload(self, timeout: Optional[float] = None):
+        if self._reload_thread is not None:
+            self._reload_thread.join(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "current": self._current.info() if self._current else None,
+            "reloading": self.reloading,
+            "last_reload": self.last_reload,
+        }
+
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache with a per-entry TTL for model predictions.
+
+    Concurrent callers asking for a key that is already being computed wait for that
+    computation instead of starting their own, so each distinct input is predicted once.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Future] = {}
+        # Computations started by get_or_compute_async, awaited by every concurrent caller of the key
+        self._in_flight_async: Dict[Hashable, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._lock = threading.Lock()
+        # Bumped by clear(); results computed against an older generation are not stored
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Dict[str, Any]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda value: "error" not in value
+    ) -> Dict[str, Any]:
+        with self._lock:
+            value = self._fresh_value(key)
+            if value is not None:
+                return value
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                is_owner = False
+            else:
+                self.misses += 1
+                future = Future()
+                self._in_flight[key] = future
+                is_owner = True
+            generation = self._generation
+
+        if not is_owner:
+            return dict(future.result())
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if generation == self._generation and cacheable(value):
+                self._store(key, value)
+        future.set_result(value)
+        return dict(value)
+
+    async def get_or_compute_async(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda value: "error" not in value
+    ) -> Dict[str, Any]:
+        """
+        get_or_compute for callers on the event loop. The computation runs as its own task, so
+        callers already waiting for it are not affected when the one that started it is cancelled
+        (e.g. by a latency budget).
+        """
+        with self._lock:
+            value = self._fresh_value(key)
+            if value is not None:
+                return value
+
+            task = self._in_flight_async.get(key)
+            if task is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                generation = self._generation
+                task = asyncio.ensure_future(compute())
+                self._in_flight_async[key] = task
+                task.add_done_callback(lambda done: self._finish_async(key, done, generation, cacheable))
+
+        return dict(await asyncio.shield(task))
+
+    def _finish_async(self, key: Hashable, task: "asyncio.Future", generation: int, cacheable: Callable):
+        with self._lock:
+            self._in_flight_async.pop(key, None)
+            # Always retrieve the exception, so one nobody waited for is not logged as unhandled
+            if task.cancelled() or task.exception() is not None:
+                return
+            value = task.result()
+            if generation == self._generation and cacheable(value):
+                self._store(key, value)
+
+    def _fresh_value(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+        del self._entries[key]
+        self.expirations += 1
+        return None
+
+    def _store(self, key: Hashable, value: Dict[str, Any]):
+        # Caller holds the lock
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, dict(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Non-blocking lookup; returns None on a miss (no coalescing)."""
+        with self._lock:
+            value = self._fresh_value(key)
+            if value is None:
+                self.misses += 1
+            return value
+
+    def put(self, key: Hashable, value: Dict[str, Any]):
+        if "error" in value:
+            return
+        with self._lock:
+            self._store(key, value)
+
+    def clear(self):
+        """Drops every entry, e.g. after the models were reloaded."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,168 @@
+import json
+import math
+import os
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SURFACE_SUFFIX = ".surface.npy"
+
+
+class ResponseSurface:
+    """
+    Raw model outputs precomputed on a grid: every combination of the categorical fields times a
+    log-spaced grid of each monetary amount. Lookups interpolate multilinearly in log space between
+    the 2^k surrounding grid points, so a prediction costs a few array reads instead of a forest
+    traversal. Rows outside the grid (or with an unknown category) are not covered and must be
+    scored exactly.
+
+    `values` has shape (*category sizes, *amount sizes, n_outputs) and is usually memory-mapped.
+    """
+
+    def __init__(
+        self,
+        categories: Sequence[Tuple[str, Sequence[str]]],
+        amounts: Sequence[Tuple[str, float, float, int]],
+        values: np.ndarray
+    ):
+        self.categories = [(field, list(labels)) for field, labels in categories] # field -> labels, axis order
+        self.amounts = [(field, float(low), float(high), int(n)) for field, low, high, n in amounts] # log grid per field
+        self.values = values
+        self._category_index = [{label: i for i, label in enumerate(labels)} for _, labels in self.categories]
+        self.hits = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def grid(low: float, high: float, n: int) -> np.ndarray:
+        return np.geomspace(low, high, n)
+
+    def lookup_one(self, item: Any) -> Optional[np.ndarray]:
+        """Interpolated raw outputs of one item, shape (n_outputs,), or None if the grid does not cover it."""
+        index: List[Any] = []
+        for (field, _), table in zip(self.categories, self._category_index):
+            code = table.get(getattr(item, field))
+            if code is None:
+                self.fallbacks += 1
+                return None
+            index.append(code)
+        weights = np.ones(1)
+        for field, low, high, size in self.amounts:
+            x = getattr(item, field)
+            if not low <= x <= high:
+                self.fallbacks += 1
+                return None
+            position = math.log(x / low) / math.log(high / low) * (size - 1)
+            i = min(int(position), size - 2)
+            fraction = position - i
+            index.append(slice(i, i + 2))
+            weights = np.multiply.outer(weights, (1 - fraction, fraction))
+        self.hits += 1
+        # (2, ..., 2, n_outputs) cell around the item, weighted by the (log-space) distances
+        cell = self.values[tuple(index)]
+        return weights.reshape(-1) @ cell.reshape(-1, cell.shape[-1])
+
+    def lookup(self, items: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolated raw outputs for every item, shape (len(items), n_outputs), and a boolean mask of
+        the items the grid covers; rows outside the mask hold garbage.
+        """
+        n = len(items)
+        covered = np.ones(n, dtype=bool)
+        index: List[Any] = []
+        for (field, _), table in zip(self.categories, self._category_index):
+            codes = np.fromiter((table.get(getattr(item, field), -1) for item in items), dtype=np.intp, count=n)
+            covered &= codes >= 0
+            index.append(np.maximum(codes, 0))
+
+        lower, fractions = [], []
+        for field, low, high, size in self.amounts:
+            x = np.fromiter((getattr(item, field) for item in items), dtype=np.float64, count=n)
+            covered &= (x >= low) & (x <= high)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                position = np.log(np.clip(x, low, high) / low) / math.log(high / low) * (size - 1)
+            i = np.minimum(position.astype(np.intp), size - 2)
+            lower.append(i)
+            fractions.append(position - i)
+
+        out = np.zeros((n, self.values.shape[-1]), dtype=np.float64)
+        # Sum over the 2^k corners of the enclosing cell, weighted by the (log-space) distances
+        for corner in range(1 << len(self.amounts)):
+            weight = np.ones(n)
+            corner_index = list(index)
+            for axis, (i, fraction) in enumerate(zip(lower, fractions)):
+                upper = (corner >> axis) & 1
+                corner_index.append(i + upper)
+                weight *= fraction if upper else 1 - fraction
+            out += weight[:, None] * self.values[tuple(corner_index)]
+
+        hits = int(covered.sum())
+        self.hits += hits
+        self.fallbacks += n - hits
+        return out, covered
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "shape": list(self.values.shape),
+            "amounts": {field: {"low": low, "high": high, "points": n} for field, low, high, n in self.amounts},
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def surface_path_for(model_path: str) -> str:
+    """Where the surface of a .pkl model is stored (next to it, same base name)."""
+    return os.path.splitext(model_path)[0] + SURFACE_SUFFIX
+
+def _metadata_path(path: str) -> str:
+    return path[:-len(".npy")] + ".json"
+
+def build_surface(
+    featurizer: Any,
+    score: Callable[[np.ndarray], np.ndarray],
+    template: Any,
+    categories: Sequence[Tuple[str, Sequence[str]]],
+    amount_ranges: Dict[str, Tuple[float, float]],
+    points_per_decade: int
+) -> ResponseSurface:
+    """
+    Scores the whole grid in bulk. `template` is any valid input (its values are all overwritten),
+    `score` maps the featurizer's raw feature matrix to raw model outputs.
+    """
+    amounts = []
+    for field, (low, high) in amount_ranges.items():
+        amounts.append((field, low, high, max(2, int(math.ceil(math.log10(high / low) * points_per_decade)) + 1)))
+    axes = [(field, list(labels)) for field, labels in categories]
+    axes += [(field, ResponseSurface.grid(low, high, n).tolist()) for field, low, high, n in amounts]
+    X = featurizer.transform_grid(template, axes)
+    shape = [len(values) for _, values in axes]
+    values = np.asarray(score(X), dtype=np.float64).reshape(*shape, -1)
+    return ResponseSurface(categories, amounts, values)
+
+def save_surface(surface: ResponseSurface, path: str, source: Optional[Dict[str, Any]] = None):
+    """Writes the array (.npy) and its grid description (.json) atomically, array last."""
+    metadata = {
+        "categories": surface.categories,
+        "amounts": surface.amounts,
+        "source": source or {}, # describe_model_file() of the model the grid was scored with
+    }
+    tmp_json, tmp_npy = _metadata_path(path) + ".tmp", path + ".tmp"
+    with open(tmp_json, "w") as f:
+        json.dump(metadata, f)
+    with open(tmp_npy, "wb") as f:
+        np.save(f, np.ascontiguousarray(surface.values))
+    os.replace(tmp_json, _metadata_path(path))
+    os.replace(tmp_npy, path)
+
+def load_surface(path: str) -> Tuple[ResponseSurface, Dict[str, Any]]:
+    """Memory-maps a saved surface; returns it with the source description it was built from."""
+    with open(_metadata_path(path)) as f:
+        metadata = json.load(f)
+    values = np.load(path, mmap_mode="r")
+    surface = ResponseSurface(metadata["categories"], metadata["amounts"], values)
+    expected = tuple(len(labels) for _, labels in surface.categories) + tuple(n for *_, n in surface.amounts)
+    if values.shape[:-1] != expected:
+        raise ValueError(f"surface {path} has shape {values.shape}, its grid needs {expected}")
+    return surface, metadata.get("source", {})
+
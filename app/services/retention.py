@@ -0,0 +1,107 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from app import crud
+from app.database import SessionLocal
+from app.services.input_backfill import maintenance_lock
+
+logger = logging.getLogger(__name__)
+
+# UserDataInput rows older than RETENTION_DAYS are moved to user_data_inputs_archive, where only
+# views that ask for archived inputs (?archived=true) see them. None (the default) keeps everything
+# in the live table; set a number of days to opt in. The job then runs at startup and every
+# RETENTION_INTERVAL_SECONDS, moving RETENTION_CHUNK_ROWS rows per transaction with a pause in
+# between, so the SQLite write lock is only ever held for one small chunk and request writes get
+# it between chunks.
+RETENTION_DAYS: Optional[int] = None
+RETENTION_INTERVAL_SECONDS = 6 * 3600
+RETENTION_CHUNK_ROWS = 1000
+RETENTION_PAUSE_SECONDS = 0.05
+
+_retention_stop: Optional[threading.Event] = None
+last_archive: Optional[Dict[str, Any]] = None
+_progress: Optional[Dict[str, Any]] = None
+
+
+def archive_old_inputs(
+    retention_days: Optional[int] = None,
+    chunk_rows: int = RETENTION_CHUNK_ROWS,
+    pause_seconds: float = RETENTION_PAUSE_SECONDS,
+    max_chunks: Optional[int] = None,
+    session_factory: Callable = SessionLocal,
+    wait: bool = False
+) -> Dict[str, Any]:
+    """
+    Moves the inputs stored more than `retention_days` (default RETENTION_DAYS) ago to the archive
+    table, oldest first, one chunk per transaction. Each chunk is copied and deleted atomically,
+    so an interrupted run leaves every row in exactly one of the two tables. Returns an error while
+    the typed-column backfill or another archival run holds the maintenance lock, unless `wait` is set.
+    """
+    global last_archive, _progress
+    retention_days = RETENTION_DAYS if retention_days is None else retention_days
+    if retention_days is None:
+        return {"error": "No retention period configured (RETENTION_DAYS is None)"}
+    if not maintenance_lock.acquire(blocking=wait):
+        return {"error": "A backfill or archival run is already in progress"}
+    before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    start = time.perf_counter()
+    _progress = {"running": True, "before": before.isoformat(), "rows_archived": 0, "chunks": 0, "longest_chunk_ms": 0.0}
+    db = session_factory()
+    try:
+        while max_chunks is None or _progress["chunks"] < max_chunks:
+            if _retention_stop is not None and _retention_stop.is_set():
+                break # shutting down; the next run carries on
+            chunk_start = time.perf_counter()
+            moved = crud.archive_user_data_inputs_chunk(db, before, limit=chunk_rows)
+            if not moved:
+                break
+            _progress.update(
+                rows_archived=_progress["rows_archived"] + moved, chunks=_progress["chunks"] + 1,
+                longest_chunk_ms=max(_progress["longest_chunk_ms"], round((time.perf_counter() - chunk_start) * 1000, 1)))
+            if pause_seconds:
+                time.sleep(pause_seconds)
+        last_archive = dict(_progress, running=False, seconds=round(time.perf_counter() - start, 3))
+        if last_archive["rows_archived"]:
+            logger.info(f"Archived {last_archive['rows_archived']} user data inputs older than {retention_days} days in {last_archive['seconds']} s")
+        return last_archive
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Archiving user data inputs failed after {_progress['rows_archived']} rows: {e}")
+        last_archive = dict(_progress, running=False, error=str(e))
+        return {"error": f"Archiving failed after {_progress['rows_archived']} rows: {e}"}
+    finally:
+        db.close()
+        _progress = None
+        maintenance_lock.release()
+
+def _retention_loop(stop: threading.Event):
+    while True:
+        archive_old_inputs(wait=True) # after the startup backfill, if it is still running
+        if stop.wait(RETENTION_INTERVAL_SECONDS):
+            return
+
+def start_retention_job():
+    """Runs the archival job now and then periodically in a background thread (called on app startup; a no-op unless RETENTION_DAYS is set)."""
+    global _retention_stop
+    if RETENTION_DAYS is None or (_retention_stop is not None and not _retention_stop.is_set()):
+        return
+    _retention_stop = threading.Event()
+    threading.Thread(target=_retention_loop, args=(_retention_stop,), name="input-retention", daemon=True).start()
+
+def stop_retention_job():
+    """Stops the job after its current chunk (called on app shutdown)."""
+    if _retention_stop is not None:
+        _retention_stop.set()
+
+def get_retention_status() -> Dict[str, Any]:
+    return {
+        "retention_days": RETENTION_DAYS,
+        "interval_seconds": RETENTION_INTERVAL_SECONDS,
+        "chunk_rows": RETENTION_CHUNK_ROWS,
+        "current": _progress,
+        "last": last_archive,
+    }
+
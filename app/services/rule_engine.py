@@ -0,0 +1,170 @@
+import numpy as np
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+# --- Declarative Rule Table ---
+# (Adapted from Reference/rulebasedmodel.py; allocations are fractions of monthly savings)
+
+RISK_LEVELS = ("Low", "Medium", "High")
+INVESTMENT_HORIZONS = ("Short-term", "Medium-term", "Long-term")
+LIFECYCLE_STAGES = ("Student", "Early Career", "Mid-Career", "Late Career", "Retired")
+
+ALLOCATION_RULES: Dict[str, Dict[str, float]] = {
+    "low": {
+        "Fixed Deposits / Recurring Deposits": 0.35,
+        "Debt Mutual Funds (Liquid/Short Duration)": 0.30,
+        "Gold (SGBs/ETFs)": 0.10,
+        "Equity MFs (Large Cap/Index Funds)": 0.15,
+        "Cash / Savings Account": 0.10
+    },
+    "medium": {
+        "Equity MFs (Diversified - Large & Mid Cap/Flexi Cap)": 0.45,
+        "Debt Mutual Funds": 0.25,
+        "Fixed Deposits / PPF": 0.10,
+        "Gold (SGBs/ETFs)": 0.10,
+        "Equity MFs (International)": 0.05,
+        "Cash / Savings Account": 0.05
+    },
+    "high": {
+        "Equity MFs (Aggressive Growth - Mid/Small Cap, Thematic)": 0.60,
+        "Equity MFs (International)": 0.15,
+        "Direct Stocks (If experienced)": 0.10,
+        "Debt Mutual Funds (Strategic)": 0.05,
+        "Gold (SGBs/ETFs - Tactical)": 0.05,
+        "Alternative Inv. (REITs/InvITs)": 0.05
+    },
+}
+
+# Each rule: (risk, horizon condition, lifecycle condition, justification point).
+# A condition is None (always) or ("in" | "not in", lowercase horizons / lifecycle stages).
+JUSTIFICATION_RULES = (
+    ("low", None, None, "- Focus on capital preservation and stable returns."),
+    ("low", None, None, "- Suitable for short-term goals or very conservative investors."),
+    ("low", ("not in", {"short-term"}), None,
+     "- Even with a longer horizon, a 'low' risk choice emphasizes safety above all."),
+    ("medium", None, None, "- Aims for a balance between growth and stability."),
+    ("medium", None, None, "- Suitable for medium to long-term goals."),
+    ("medium", ("in", {"long-term"}), ("in", {"Student", "Early Career"}),
+     "- Your stage and horizon allow for good equity exposure for wealth creation."),
+    ("high", None, None, "- Focuses on maximizing long-term growth potential."),
+    ("high", None, None, "- Best suited for long-term goals and investors comfortable with significant market swings."),
+    ("high", ("in", {"long-term"}), ("not in", {"Early Career", "Mid-Career"}),
+     "- CAUTION: High risk at {lifecycle} stage needs careful consideration of your overall financial stability and nearness to needing funds."),
+    ("high", ("not in", {"long-term"}), None,
+     "- CAUTION: High risk for a {horizon} horizon is generally not advisable. Ensure goals truly allow for this risk."),
+)
+
+GENERAL_TIPS = (
+    "- Build & Maintain an Emergency Fund: Aim for 3-6 months of essential living expenses.",
+    "- Get Adequately Insured: Health and Term Life Insurance are crucial.",
+    "- Invest Regularly & Be Disciplined (e.g. SIPs).",
+    "- Review Periodically: Revisit your financial plan annually or on major life events.",
+    "- Understand Your Investments: Know the risks and costs."
+)
+
+LIFECYCLE_TIPS = (
+    ({"Student", "Early Career"}, "- Focus on upskilling and career growth."),
+    ({"Late Career", "Late Career/Pre-Retirement", "Retired"}, "- Plan for healthcare expenses in retirement."),
+)
+
+BUDGET_TIP = "- Your expenses currently meet or exceed your income. Focus on creating a budget."
+NO_SAVINGS_ALLOCATION = MappingProxyType({"message": "Savings are zero or negative. Focus on budgeting first."})
+NO_SAVINGS_JUSTIFICATION = ("Investment allocation is not applicable without positive savings.",)
+NO_SAVINGS_PRIORITY_TIP = "Priority: Increase savings or reduce expenses."
+
+
+# --- Compilation ---
+class RuleOutcome(NamedTuple):
+    allocation: Mapping[str, float] # percentages (0-100)
+    justification: Tuple[str, ...]
+    tips: Tuple[str, ...] # every tip except the savings-rate one, which depends on the amounts
+
+
+def _matches(condition: Optional[Tuple[str, set]], value: str) -> bool:
+    if condition is None:
+        return True
+    operator, values = condition
+    return (value in values) if operator == "in" else (value not in values)
+
+def _normalized_percentages(allocations: Dict[str, float]) -> Dict[str, float]:
+    current_total_percentage = sum(allocations.values())
+    if abs(current_total_percentage - 1.0) > 0.001 and current_total_percentage != 0:
+        factor = 1.0 / current_total_percentage
+        allocations = {k: round(v * factor, 3) for k, v in allocations.items()}
+        # Adjust last item to make sum exactly 1.0 if needed due to rounding
+        sum_val = sum(allocations.values())
+        if sum_val != 1.0 and allocations:
+            key_to_adjust = list(allocations.keys())[-1]
+            allocations[key_to_adjust] = round(allocations[key_to_adjust] + (1.0 - sum_val), 3)
+    return {k: round(v * 100, 1) for k, v in allocations.items()}
+
+def _build_outcome(risk_profile: str, horizon: str, lifecycle: str) -> RuleOutcome:
+    risk = risk_profile.lower()
+    horizon_key = horizon.lower()
+    justification = [
+        f"This allocation considers your {risk_profile} risk profile, {horizon} horizon, and {lifecycle} stage."
+    ]
+    justification.extend(
+        text.format(horizon=horizon, lifecycle=lifecycle)
+        for rule_risk, horizon_condition, lifecycle_condition, text in JUSTIFICATION_RULES
+        if rule_risk == risk and _matches(horizon_condition, horizon_key) and _matches(lifecycle_condition, lifecycle)
+    )
+    tips = GENERAL_TIPS + tuple(tip for stages, tip in LIFECYCLE_TIPS if lifecycle in stages)
+    return RuleOutcome(
+        allocation=MappingProxyType(_normalized_percentages(dict(ALLOCATION_RULES.get(risk, {})))),
+        justification=tuple(justification),
+        tips=tips
+    )
+
+def _compile_rule_table() -> Mapping[Tuple[str, str, str], RuleOutcome]:
+    return MappingProxyType({
+        (risk, horizon, lifecycle): _build_outcome(risk, horizon, lifecycle)
+        for risk in RISK_LEVELS
+        for horizon in INVESTMENT_HORIZONS
+        for lifecycle in LIFECYCLE_STAGES
+    })
+
+# Compiled once at import (i.e. app startup): risk x horizon x lifecycle -> immutable outcome
+RULE_TABLE = _compile_rule_table()
+
+
+# --- Evaluation ---
+def lookup(risk_profile: str, horizon: str, lifecycle: str) -> RuleOutcome:
+    outcome = RULE_TABLE.get((risk_profile, horizon, lifecycle))
+    if outcome is None:
+        # Values outside the form's dropdowns (e.g. other casing) are evaluated on the fly
+        outcome = _build_outcome(risk_profile, horizon, lifecycle)
+    return outcome
+
+def _savings_tip(monthly_savings: float, savings_rate: float) -> str:
+    if monthly_savings <= 0:
+        return BUDGET_TIP
+    return f"- Your current savings rate is approximately {savings_rate:.1f}%. Aim for at least 20-30%."
+
+def _result(outcome: RuleOutcome, monthly_savings: float, savings_rate: float) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    tips = [_savings_tip(monthly_savings, savings_rate), *outcome.tips]
+    if monthly_savings <= 0:
+        tips.insert(0, NO_SAVINGS_PRIORITY_TIP)
+        return dict(NO_SAVINGS_ALLOCATION), list(NO_SAVINGS_JUSTIFICATION), tips
+    return dict(outcome.allocation), list(outcome.justification), tips
+
+def evaluate(data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """Returns (allocation percentages, justification, tips) for one validated rule-based input dict."""
+    salary = data['Monthly_In_hand_Salary']
+    monthly_savings = salary - data['Total_Monthly_Expenses']
+    savings_rate = (monthly_savings / salary) * 100 if salary > 0 else 0.0
+    outcome = lookup(data['Risk_Appetite'], data['Investment_Horizon'], data['Lifecycle_Stage'])
+    return _result(outcome, monthly_savings, savings_rate)
+
+def evaluate_batch(profiles: Sequence[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], List[str], List[str]]]:
+    """evaluate() over many profiles, with savings and savings rates computed as arrays."""
+    if not profiles:
+        return []
+    salaries = np.array([p['Monthly_In_hand_Salary'] for p in profiles], dtype=float)
+    savings = salaries - np.array([p['Total_Monthly_Expenses'] for p in profiles], dtype=float)
+    rates = np.where(salaries > 0, savings / np.where(salaries > 0, salaries, 1.0) * 100, 0.0)
+    return [
+        _result(lookup(p['Risk_Appetite'], p['Investment_Horizon'], p['Lifecycle_Stage']), s, r)
+        for p, s, r in zip(profiles, savings.tolist(), rates.tolist())
+    ]
+
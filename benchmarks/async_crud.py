@@ -0,0 +1,164 @@
+# Requests/sec on /auth/users/me and /api/chatbot served by uvicorn with the async session vs the same
+# handlers on a blocking session (the previous behaviour): on an idle database, while another
+# connection keeps taking the SQLite write lock, and with more requests in flight than the
+# connection pool holds.
+# Run from the repository root with: python -m benchmarks.async_crud [requests per run] [concurrency]
+import asyncio
+import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+import httpx
+
+PORT = 8765
+ME = ("GET", "/auth/users/me", None)
+CHAT = ("POST", "/api/chatbot", {"model_type": "base", "inputs": {
+    "Salary": 60000, "Expenses": 20000, "Savings": 40000, "Lifecycle_Stage": "Early Career",
+    "Risk_Appetite": "Medium", "Investment_Horizon": "Medium-term"}})
+
+
+def serve(mode: str, db_path: str):
+    import uvicorn
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from app import database
+    from app.main import app
+    from app.services import data_service
+    logging.disable(logging.CRITICAL) # failures are counted on the client side
+
+    # Both session factories on the scratch database
+    database.engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    database.SessionLocal.configure(bind=database.engine)
+    database.AsyncSessionLocal.configure(bind=create_async_engine(f"sqlite+aiosqlite:///{db_path}"))
+    data_service.CSV_FILE_PATH = os.path.join(os.path.dirname(db_path), "log.csv")
+    # Same pool size as the app's engine; a short timeout so an exhausted pool fails fast
+    BlockingSessionLocal = sessionmaker(bind=create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False}, pool_timeout=3))
+
+    class BlockingSession:
+        """The AsyncSession calls the handlers make, run synchronously on the event loop thread."""
+
+        def __init__(self):
+            self.session = BlockingSessionLocal()
+
+        def add(self, instance):
+            self.session.add(instance)
+
+        async def scalar(self, statement):
+            return self.session.scalar(statement)
+
+        async def scalars(self, statement):
+            return self.session.scalars(statement)
+
+        async def commit(self):
+            self.session.commit()
+
+        async def refresh(self, instance):
+            self.session.refresh(instance)
+
+    async def get_blocking_db():
+        db = BlockingSession()
+        try:
+            yield db
+        finally:
+            db.session.close()
+
+    if mode == "blocking":
+        app.dependency_overrides[database.get_async_db] = get_blocking_db
+    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="error")
+
+
+def lock_holder(db_path: str, stop: threading.Event, hold_seconds: float = 0.2):
+    # Another writer (a batch job, a second worker) holding the write lock half of the time
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    while not stop.is_set():
+        connection.execute("BEGIN IMMEDIATE")
+        time.sleep(hold_seconds)
+        connection.execute("COMMIT")
+        time.sleep(hold_seconds)
+    connection.close()
+
+
+async def run(client, headers, requests, clients, n_requests):
+    # `clients` concurrent loops, each sending one (method, url, body) of the mix, until
+    # n_requests are done; returns requests/sec, the p99 latency of each url and the failures
+    latencies = {url: [] for _, url, _ in requests}
+    remaining = [n_requests]
+    failures = []
+
+    async def worker(c):
+        method, url, body = requests[c % len(requests)]
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, json=body)
+                response.raise_for_status()
+                latencies[url].append(time.perf_counter() - start)
+            except httpx.HTTPError as e:
+                failures.append(e)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(c) for c in range(clients)))
+    rate = (n_requests - len(failures)) / (time.perf_counter() - start)
+    p99 = {url: sorted(values)[int(len(values) * 0.99)] * 1000 for url, values in latencies.items() if values}
+    return rate, p99, failures
+
+
+async def bench(mode: str, db_path: str, n_requests: int, concurrency: int):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=60,
+                                 limits=httpx.Limits(max_connections=100)) as client:
+        for _ in range(300): # wait for startup (models load)
+            try:
+                await client.get("/docs")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        credentials = {"email": "bench@example.com", "password": "benchpassword", "confirm_password": "benchpassword"}
+        await client.post("/auth/signup", json=credentials)
+        token = (await client.post("/auth/token", data={"username": "bench@example.com", "password": "benchpassword"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await run(client, headers, [CHAT], 1, n_requests) # warm-up
+
+        for contended in (False, True):
+            stop = threading.Event()
+            if contended:
+                threading.Thread(target=lock_holder, args=(db_path, stop), daemon=True).start()
+            for label, requests in (("/auth/users/me", [ME]), ("/api/chatbot", [CHAT]), ("mixed", [ME, CHAT])):
+                rate, p99, failures = await run(client, headers, requests, concurrency, n_requests)
+                print(f"  {'write lock contended' if contended else 'idle database':>20} {label:>15} {mode:>8}: {rate:7,.0f} req/s, "
+                      + ", ".join(f"p99 {url} {ms:6.1f} ms" for url, ms in p99.items())
+                      + (f", {len(failures)} failed" if failures else ""))
+            stop.set()
+
+        # More requests in flight than the pool's 5 + 10 connections
+        rate, _, failures = await run(client, headers, [CHAT], 32, n_requests)
+        print(f"  {'32 clients, pool of 15':>20} {'/api/chatbot':>15} {mode:>8}: {rate:7,.0f} req/s"
+              + (f", {len(failures)}/{n_requests} failed ({type(failures[0]).__name__})" if failures else ""))
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    print(f"{n_requests} requests per run, {concurrency} concurrent clients")
+    for mode in ("blocking", "async"):
+        db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        server = multiprocessing.Process(target=serve, args=(mode, db_path), daemon=True)
+        server.start()
+        try:
+            asyncio.run(bench(mode, db_path, n_requests, concurrency))
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
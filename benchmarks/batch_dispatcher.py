@@ -0,0 +1,49 @@
+# Load test: concurrent /api/chatbot-style requests through the per-request path vs. the
+# micro-batch dispatcher. Run from the repository root with: python -m benchmarks.batch_dispatcher
+import asyncio
+import random
+import time
+
+from app import schemas
+from app.services import chatbot_service
+
+
+async def load_test(n_requests: int, concurrency: int, engine: str):
+    chatbot_service.INFERENCE_ENGINE = engine
+    chatbot_service.PREDICTION_CACHE_ENABLED = False
+    random.seed(0)
+    requests = [
+        schemas.ChatbotInteractionRequest(model_type="base", inputs={
+            "Salary": random.randint(20, 300) * 1000, "Expenses": random.randint(10, 150) * 1000,
+            "Savings": random.randint(1, 100) * 1000, "Lifecycle_Stage": random.choice(["Student", "Early Career", "Mid-Career"]),
+            "Risk_Appetite": random.choice(["Low", "Medium", "High"]), "Investment_Horizon": "Long-term"})
+        for _ in range(n_requests)
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(request, handler):
+        async with semaphore:
+            return await handler(request)
+
+    async def current_path(request):
+        return chatbot_service.process_chatbot_interaction(request)
+
+    for label, handler, batched in (("per-request", current_path, False),
+                                    ("micro-batched", chatbot_service.process_chatbot_interaction_async, True)):
+        if batched:
+            chatbot_service.batch_dispatcher.start()
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(one(r, handler) for r in requests))
+        elapsed = time.perf_counter() - start
+        assert all("error" not in r.recommendation for r in responses)
+        print(f"  {engine:>8} {label:>13}: {n_requests / elapsed:8.0f} req/s")
+        if batched:
+            stats = chatbot_service.batch_dispatcher.stats()
+            await chatbot_service.batch_dispatcher.stop()
+            print(f"{'':>25} mean batch {stats['mean_batch_size']}, queue wait p50 {stats['queue_wait_ms']['p50']} ms, p99 {stats['queue_wait_ms']['p99']} ms")
+
+
+if __name__ == "__main__":
+    chatbot_service.load_models()
+    asyncio.run(load_test(2000, 64, "compiled"))
+    asyncio.run(load_test(200, 64, "sklearn"))
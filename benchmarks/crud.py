@@ -0,0 +1,205 @@
+# Page and count latency on a scratch SQLite database of 1M inputs: deep OFFSET pages vs keyset
+# pages, one user's history with and without the (user_id, timestamp, id) index, and COUNT(*) vs
+# the trigger-maintained counts; with "search", user search latency with the users_fts trigram
+# index vs a LIKE scan (row counts and ordering are covered by tests/test_crud.py).
+# Run from the repository root with: python -m benchmarks.crud [rows] [users]
+#                                or: python -m benchmarks.crud search [users]
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.database import Base, install_row_counters, install_user_search
+
+
+def median_ms(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def search_benchmark(n_users: int):
+    random.seed(0)
+    first_names = ["aarav", "priya", "rahul", "ananya", "vikram", "sneha", "arjun", "kavya", "rohan", "isha",
+                   "john", "maria", "wei", "fatima", "lucas", "emma", "omar", "sofia", "david", "chen"]
+    last_names = ["sharma", "patel", "singh", "gupta", "iyer", "reddy", "khan", "smith", "garcia", "wang",
+                  "mehta", "nair", "das", "joshi", "kumar", "brown", "lee", "rossi", "müller", "silva"]
+    domains = ["gmail.com"] * 8 + ["yahoo.com"] * 3 + ["outlook.com"] * 3 + ["icloud.com", "finco.in", "example.org", "mail.ru"]
+
+    def email(i):
+        return f"{random.choice(first_names)}.{random.choice(last_names)}{i}@{random.choice(domains)}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "search.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+        install_row_counters(bind=engine)
+        assert install_user_search(bind=engine), "SQLite without FTS5 trigram support"
+
+        connection = sqlite3.connect(db_path)
+        start = time.perf_counter()
+        connection.executemany("INSERT INTO users (email, hashed_password, is_admin) VALUES (?, 'x', 0)",
+                               ((email(i),) for i in range(n_users)))
+        connection.commit()
+        print(f"{n_users:,} users seeded in {time.perf_counter() - start:.1f} s")
+        # What the index costs a signup: inserts with and without its triggers
+        batch = [(email(n_users + i),) for i in range(10000)]
+        start = time.perf_counter()
+        for row in batch[:5000]:
+            connection.execute("INSERT INTO users (email, hashed_password, is_admin) VALUES (?, 'x', 0)", row)
+        with_index = (time.perf_counter() - start) / 5000
+        connection.executescript("DROP TRIGGER trg_users_fts_insert;")
+        start = time.perf_counter()
+        for row in batch[5000:]:
+            connection.execute("INSERT INTO users (email, hashed_password, is_admin) VALUES (?, 'x', 0)", row)
+        without_index = (time.perf_counter() - start) / 5000
+        connection.rollback()
+        connection.close()
+        install_user_search(bind=engine) # puts the trigger back
+        print(f"insert of one user: {with_index * 1e6:.1f} us with the search index triggers, {without_index * 1e6:.1f} us without\n")
+
+        db = sessionmaker(bind=engine)()
+        exact = db.scalar(select(models.User.email).where(models.User.id == n_users // 2))
+        terms = [("exact email", exact), ("rare substring", exact.split("@")[0][-7:]), ("name", "priya.sha"),
+                 ("domain", "gmail"), ("two characters (prefix)", "ro")]
+        print(f"{'':>42} {'matches':>8} {'first page':>12} {'page 20':>10} {'count':>10}")
+        for label, term in terms:
+            for indexed in (True, False):
+                statement = lambda cursor=None: crud.user_search_statement(term, cursor, 50, indexed)
+                rows = db.execute(statement()).all()
+                cursor = None
+                for _ in range(19): # walk to page 20
+                    page = db.execute(statement(cursor)).all()
+                    cursor = crud.next_user_search_cursor(page, 50)
+                    if cursor is None:
+                        break
+                if indexed:
+                    indexed_ids = [user.id for user, _ in rows]
+                else:
+                    assert [user.id for user, _ in rows] == indexed_ids
+                count = db.scalar(crud.user_search_count_statement(term, indexed))
+                first = median_ms(lambda: db.execute(statement()).all())
+                deep = median_ms(lambda: db.execute(statement(cursor)).all()) if cursor else float("nan")
+                counting = median_ms(lambda: db.scalar(crud.user_search_count_statement(term, indexed)))
+                print(f"  {label + (', trigram index' if indexed else ', LIKE scan'):>40}: {count:8,} {first:9.2f} ms {deep:7.2f} ms {counting:7.2f} ms")
+                db.expunge_all()
+        db.close()
+
+
+def pages_benchmark(n: int, n_users: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "pages.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+        install_row_counters(bind=engine)
+
+        # Seeded through sqlite3 directly (the triggers still fire); timestamps spread over a year
+        start = time.perf_counter()
+        random.seed(0)
+        sample = json.dumps({'Salary': 60000, 'Expenses': 40000, 'Savings': 20000, 'Lifecycle_Stage': 'Early Career',
+                             'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term'})
+        first = datetime(2025, 1, 1).timestamp()
+        connection = sqlite3.connect(db_path)
+        connection.executemany("INSERT INTO users (id, email, hashed_password, is_admin) VALUES (?, ?, 'x', 0)",
+                               ((i, f"user{i}@example.com") for i in range(1, n_users + 1)))
+        connection.executemany(
+            "INSERT INTO user_data_inputs (user_id, model_type, input_data, timestamp) VALUES (?, ?, ?, ?)",
+            ((random.randint(1, n_users), ("base", "enhanced", "rule_based")[i % 3], sample,
+              datetime.fromtimestamp(first + random.random() * 365 * 86400).strftime("%Y-%m-%d %H:%M:%S"))
+             for i in range(n)))
+        connection.commit()
+        connection.close()
+        print(f"{n:,} inputs across {n_users:,} users, seeded in {time.perf_counter() - start:.1f} s\n")
+
+        db = sessionmaker(bind=engine)()
+
+        def measure(label, fn, repeat=5):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+                db.expunge_all()
+            print(f"  {label:>52}: {sorted(timings)[len(timings) // 2] * 1000:9.2f} ms")
+
+        def plan(statement):
+            # On a new connection (a cached statement keeps its plan after an index is dropped);
+            # the plan does not depend on the values, so they go to the driver unprocessed
+            compiled = statement.compile(engine)
+            params = tuple(str(compiled.params[name]) for name in compiled.positiontup)
+            connection = sqlite3.connect(db_path)
+            rows = connection.execute("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+            connection.close()
+            return "; ".join(row[-1] for row in rows)
+
+        # Everyone's inputs, newest first, 100 per page, at increasing depth
+        print("All inputs, newest first, 100 per page:")
+        for depth in (0, n // 10, n // 2, n - 100):
+            cursor = None
+            if depth:
+                row = db.execute(text("SELECT timestamp, id FROM user_data_inputs ORDER BY timestamp DESC, id DESC "
+                                      "LIMIT 1 OFFSET :offset"), {"offset": depth - 1}).one()
+                cursor = crud.encode_cursor([row.timestamp.replace(" ", "T"), row.id])
+            offset_page = crud.get_all_user_data_inputs(db, skip=depth, limit=100)
+            keyset_page, _ = crud.get_user_data_inputs_page(db, cursor=cursor, limit=100)
+            assert [item.id for item in offset_page] == [item.id for item in keyset_page]
+            measure(f"OFFSET {depth:,}", lambda: crud.get_all_user_data_inputs(db, skip=depth, limit=100))
+            measure(f"keyset at row {depth:,}", lambda: crud.get_user_data_inputs_page(db, cursor=cursor, limit=100))
+        print("  plan:", plan(crud.user_data_inputs_page_statement(None, crud.encode_cursor(["2025-06-01T00:00:00", 1]), 100)))
+
+        # One user's history, the first page and the last one
+        user_id = 1
+        items, cursor = crud.get_user_data_inputs_page(db, user_id=user_id, limit=crud.MAX_PAGE_SIZE)
+        total = crud.count_user_data_inputs(db, user_id)
+        last_cursor = crud.encode_cursor([items[-2].timestamp.isoformat(), items[-2].id]) if len(items) > 1 else None
+        print(f"\nOne user's history ({total} inputs), newest first:")
+        for label in ("with (user_id, timestamp, id) index", "without it"):
+            if label == "without it":
+                db.execute(text("DROP INDEX ix_user_data_inputs_user_id_timestamp"))
+                db.commit()
+            measure(f"first 100, {label}", lambda: crud.get_user_data_inputs_page(db, user_id=user_id, limit=100))
+            measure(f"page after a cursor, {label}", lambda: crud.get_user_data_inputs_page(db, user_id=user_id, cursor=last_cursor, limit=100))
+            print("  plan:", plan(crud.user_data_inputs_page_statement(user_id, last_cursor, 100)))
+
+        print("\nCounts:")
+        assert crud.count_user_data_inputs(db) == db.scalar(crud.full_count_statement(models.UserDataInput)) == n
+        assert crud.count_user_data_inputs(db, user_id) == db.scalar(crud.full_count_statement(models.UserDataInput, user_id))
+        assert crud.count_users(db) == n_users
+        measure("COUNT(*) of user_data_inputs", lambda: db.scalar(crud.full_count_statement(models.UserDataInput)))
+        measure("row_counts lookup", lambda: crud.count_user_data_inputs(db))
+        measure("COUNT(*) of one user's inputs (no user_id index)", lambda: db.scalar(crud.full_count_statement(models.UserDataInput, user_id)))
+        measure("row_counts lookup for one user", lambda: crud.count_user_data_inputs(db, user_id))
+
+        # What the triggers cost on the write path
+        db.execute(text("DELETE FROM user_data_inputs WHERE id > :n"), {"n": n})
+        def insert_batch():
+            for _ in range(1000):
+                db.add(models.UserDataInput(user_id=user_id, model_type="base", input_data={}))
+            db.commit()
+        measure("insert 1,000 inputs, with count triggers", insert_batch)
+        for name in ("trg_user_data_inputs_count_insert",):
+            db.execute(text(f"DROP TRIGGER {name}"))
+        measure("insert 1,000 inputs, without", insert_batch)
+        db.close()
+
+
+def main():
+    if sys.argv[1:2] == ["search"]:
+        search_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 200000)
+        return
+    pages_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000, int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
+
+
+if __name__ == "__main__":
+    main()
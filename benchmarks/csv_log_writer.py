@@ -0,0 +1,75 @@
+# Appends/sec and per-request latency: synchronous append_data_to_csv vs the buffered writer
+# (flush-on-stop and lost rows are covered by tests/test_csv_log_writer.py).
+# Run from the repository root with: python -m benchmarks.csv_log_writer
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from typing import List
+
+from app.services import data_service
+
+SAMPLE = {'Salary': 60000, 'Expenses': 40000, 'Savings': 20000,
+          'Lifecycle_Stage': 'Early Career', 'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term'}
+ALLOCATION = {'Equity': 50.0, 'Debt': 30.0, 'Gold': 10.0, 'FD/Cash': 10.0}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+async def handler_latencies(buffered: bool, concurrency: int = 50, per_client: int = 200) -> List[float]:
+    # The logging part of a chatbot request, as seen by concurrent requests on one event loop
+    latencies: List[float] = []
+
+    async def client(c):
+        for i in range(per_client):
+            start = time.perf_counter()
+            await data_service.log_recommendation(c, "bench@example.com", "base", SAMPLE, ALLOCATION)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    if buffered:
+        data_service.start_csv_writer()
+    await asyncio.gather(*(client(c) for c in range(concurrency)))
+    data_service.stop_csv_writer()
+    return latencies
+
+
+def main():
+    logging.getLogger("app.services.data_service").setLevel(logging.WARNING)
+    n = 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_service.CSV_FILE_PATH = os.path.join(tmp, "sync.csv")
+        start = time.perf_counter()
+        for i in range(n):
+            data_service.append_data_to_csv(i, "bench@example.com", "base", SAMPLE, ALLOCATION)
+        sync_rate = n / (time.perf_counter() - start)
+
+        data_service.CSV_FILE_PATH = os.path.join(tmp, "buffered.csv")
+        writer = data_service.csv_writer = data_service._new_csv_writer()
+        writer.start()
+        start = time.perf_counter()
+        for i in range(n):
+            writer.put(data_service.build_csv_row(i, "bench@example.com", "base", SAMPLE, ALLOCATION))
+        enqueue_rate = n / (time.perf_counter() - start)
+        writer.stop()
+        buffered_rate = n / (time.perf_counter() - start)
+        with open(data_service.CSV_FILE_PATH) as f:
+            rows = sum(1 for _ in f) - 1
+        print(f"appends/sec: sync {sync_rate:,.0f}, buffered {buffered_rate:,.0f} end-to-end "
+              f"({enqueue_rate:,.0f} enqueued/sec), {rows}/{n} rows on disk after stop()")
+
+        for mode in ("sync", "buffered"):
+            data_service.CSV_WRITE_MODE = mode
+            data_service.CSV_FILE_PATH = os.path.join(tmp, f"requests_{mode}.csv")
+            latencies = asyncio.run(handler_latencies(mode == "buffered"))
+            print(f"  request logging latency ({mode:>8}): p50 {percentile(latencies, 0.5):.3f} ms, "
+                  f"p99 {percentile(latencies, 0.99):.3f} ms, max {max(latencies) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Stress test: N processes append through their own segment writers while merges run
+# concurrently; every row must reach the canonical CSV exactly once, whole and in per-worker order
+# (the merge rules themselves are covered by tests/test_csv_segments.py).
+# Run from the repository root with: python -m benchmarks.csv_segments [processes] [rows per process]
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import zlib
+from typing import Dict, Tuple
+
+from app.services.csv_segments import MERGE_MANIFEST, SegmentedCsvWriter, _write_manifest, merge_segments, segment_dir_for
+
+HEADERS = ["UserID", "UserEmail", "ModelType", "Timestamp", "Name", "Checksum"]
+
+
+def worker(segment_dir: str, worker_id: int, rows: int):
+    writer = SegmentedCsvWriter(segment_dir, flush_rows=64, flush_interval_seconds=0.05, max_queue_size=1000)
+    writer.start()
+    for seq in range(rows):
+        # Long, quoted, multi-field rows make torn or interleaved writes easy to spot
+        payload = f"{worker_id}-{seq}-" + "x" * (seq % 500) + ',"quoted"'
+        writer.put([worker_id, f"worker{worker_id}@example.com", "base", time.strftime("%Y-%m-%d %H:%M:%S"),
+                    payload, zlib.crc32(payload.encode())])
+        if seq % 100 == 0:
+            time.sleep(0.01) # spread the writes out so merges run while workers are still writing
+    writer.stop()
+
+
+def merger(segment_dir: str, csv_path: str, done, merges):
+    # Competing mergers in other processes, serialized only by the merge lock
+    while not done.is_set():
+        merge_segments(csv_path, HEADERS, segment_dir, settle_seconds=0.2)
+        with merges.get_lock():
+            merges.value += 1
+
+
+def main():
+    n_processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rows_per_process = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "log.csv")
+        segment_dir = segment_dir_for(csv_path)
+        start = time.perf_counter()
+        processes = [multiprocessing.Process(target=worker, args=(segment_dir, w, rows_per_process)) for w in range(n_processes)]
+        done, merges = multiprocessing.Event(), multiprocessing.Value("i", 0)
+        mergers = [multiprocessing.Process(target=merger, args=(segment_dir, csv_path, done, merges)) for _ in range(2)]
+        for process in processes + mergers:
+            process.start()
+        for process in processes:
+            process.join()
+        done.set()
+        for process in mergers:
+            process.join()
+        merge_segments(csv_path, HEADERS)
+        elapsed = time.perf_counter() - start
+
+        # A merge that died after appending but before recording its offsets must be undone
+        manifest_path = os.path.join(segment_dir, MERGE_MANIFEST)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest["merging_from"] = os.path.getsize(csv_path)
+        _write_manifest(manifest_path, manifest)
+        with open(csv_path, "a", newline='', encoding="utf-8") as f:
+            f.write('0,half-merged,row\n1,"torn')
+        merge_segments(csv_path, HEADERS)
+
+        with open(csv_path, newline='', encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        header, rows = rows[0], rows[1:]
+        seen: Dict[Tuple[int, int], int] = {}
+        torn = out_of_order = 0
+        last_seq: Dict[int, int] = {}
+        for row in rows:
+            if len(row) != len(HEADERS) or zlib.crc32(row[4].encode()) != int(row[5]):
+                torn += 1
+                continue
+            worker_id, seq = int(row[0]), int(row[4].split("-")[1])
+            seen[(worker_id, seq)] = seen.get((worker_id, seq), 0) + 1
+            if seq <= last_seq.get(worker_id, -1):
+                out_of_order += 1
+            last_seq[worker_id] = seq
+        expected = n_processes * rows_per_process
+        lost = sum(1 for w in range(n_processes) for s in range(rows_per_process) if (w, s) not in seen)
+        duplicated = sum(count - 1 for count in seen.values() if count > 1)
+        print(f"{n_processes} processes x {rows_per_process} rows, {merges.value} concurrent merges, {elapsed:.1f} s "
+              f"({expected / elapsed:,.0f} rows/s); segments left: {len(os.listdir(segment_dir)) - 2}")
+        print(f"rows in canonical CSV: {len(rows)}/{expected}, header ok: {header == HEADERS}, lost: {lost}, "
+              f"duplicated: {duplicated}, torn: {torn}, out of per-worker order: {out_of_order}")
+        if lost or duplicated or torn or out_of_order or len(rows) != expected:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
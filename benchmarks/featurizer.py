@@ -0,0 +1,52 @@
+# Featurization cost per row and per batch: the per-request encoders + mappings + scaler path
+# against the fused featurizer (parity is covered by tests/test_featurizer.py).
+# Run from the repository root with: python -m benchmarks.featurizer
+import time
+
+import joblib
+import numpy as np
+
+from app import schemas
+from app.services import chatbot_service
+from app.services.featurizer import build_enhanced_featurizer
+
+
+def main():
+    pipeline = joblib.load(chatbot_service.ENHANCED_MODEL_PATH)
+    featurizer = build_enhanced_featurizer(pipeline)
+    mappings = pipeline['mappings']
+    rng = np.random.default_rng(0)
+    items = [
+        schemas.EnhancedModelInputSchema(
+            Salary=float(rng.integers(20, 300) * 1000), Expenses=float(rng.uniform(5000, 90000)), Savings=float(rng.integers(1, 100) * 1000),
+            Lifecycle_Stage=str(rng.choice(list(mappings['lifecycle']))), Risk_Appetite=str(rng.choice(list(mappings['risk']))),
+            Investment_Horizon=str(rng.choice(list(mappings['horizon']))),
+            Profession=str(rng.choice(pipeline['profession_encoder'].classes_)), City=str(rng.choice(pipeline['city_encoder'].classes_)))
+        for _ in range(2000)
+    ]
+
+    def previous_row(item):
+        data = item.dict()
+        return [pipeline['profession_encoder'].transform([data['Profession']])[0],
+                pipeline['city_encoder'].transform([data['City']])[0],
+                data['Salary'], data['Expenses'], data['Savings'],
+                mappings['lifecycle'][data['Lifecycle_Stage']], mappings['risk'][data['Risk_Appetite']],
+                mappings['horizon'][data['Investment_Horizon']]]
+
+    for label, fn in (("previous (encoders + dicts + scaler)", lambda: pipeline['scaler'].transform(np.asarray([previous_row(items[0])], dtype=float))),
+                      ("fused, scaled", lambda: featurizer.transform_one(items[0], scaled=True)),
+                      ("fused, raw (compiled engine)", lambda: featurizer.transform_one(items[0]))):
+        start = time.perf_counter()
+        for _ in range(2000):
+            fn()
+        print(f"  single row {label:>36}: {(time.perf_counter() - start) / 2000 * 1e6:8.1f} us")
+    for label, fn in (("previous, row by row", lambda: pipeline["scaler"].transform(np.asarray([previous_row(item) for item in items], dtype=float))),
+                      ("fused, scaled", lambda: featurizer.transform(items, scaled=True))):
+        start = time.perf_counter()
+        for _ in range(5):
+            fn()
+        print(f"  {len(items)} rows {label:>36}: {(time.perf_counter() - start) / 5 * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Compile time and per-prediction cost of the compiled forest against the sklearn path, and the
+# extra cost of the opt-in intervals and explanations (parity is covered by tests/test_forest_engine.py).
+# Run from the repository root with: python -m benchmarks.forest_engine
+import time
+
+import joblib
+import numpy as np
+
+from app.services import chatbot_service
+from app.services.forest_engine import CompiledForest
+
+
+def sample_inputs(pipeline, n_rows, rng):
+    money = np.column_stack([
+        np.round(rng.uniform(0, 400000, n_rows), -3),
+        rng.uniform(0, 300000, n_rows),
+        np.round(rng.uniform(0, 150000, n_rows), -2),
+    ])
+    categories = np.column_stack([rng.integers(0, 5, n_rows), rng.integers(0, 3, n_rows), rng.integers(0, 3, n_rows)])
+    if 'profession_encoder' not in pipeline:
+        return np.column_stack([money, categories]).astype(float)
+    codes = np.column_stack([rng.integers(0, len(pipeline['profession_encoder'].classes_), n_rows),
+                             rng.integers(0, len(pipeline['city_encoder'].classes_), n_rows)])
+    return np.column_stack([codes, money, categories]).astype(float)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for name, path in (("base", chatbot_service.BASE_MODEL_PATH), ("enhanced", chatbot_service.ENHANCED_MODEL_PATH)):
+        pipeline = joblib.load(path)
+        start = time.perf_counter()
+        engine = CompiledForest.from_pipeline(pipeline)
+        compile_ms = (time.perf_counter() - start) * 1000
+        X = sample_inputs(pipeline, 20000, rng)
+        print(f"{name}: compiled in {compile_ms:.0f} ms, {len(engine.value)} nodes")
+
+        row = X[:1]
+        for label, fn in (("sklearn", lambda: pipeline['model'].predict(pipeline['scaler'].transform(row))),
+                          ("compiled", lambda: engine.predict(row))):
+            start = time.perf_counter()
+            for _ in range(200):
+                fn()
+            print(f"  {label:>8}: {(time.perf_counter() - start) / 200 * 1000:.3f} ms per single-row prediction")
+
+        for label, fn in (("sklearn", lambda: pipeline['model'].predict(pipeline['scaler'].transform(X))),
+                          ("compiled", lambda: engine.predict(X))):
+            start = time.perf_counter()
+            fn()
+            print(f"  {label:>8}: {(time.perf_counter() - start) * 1000:.0f} ms for {len(X)} rows")
+
+        # Extra cost of the opt-in prediction intervals (per-tree outputs + quantile bands) and explanations
+        for rows in (X[:1], X[:1000]):
+            timings = {}
+            for label, fn in (("plain", lambda: chatbot_service._normalize_allocations(engine.predict(rows))),
+                              ("intervals", lambda: chatbot_service._allocation_intervals(engine.predict_trees(rows))),
+                              ("explanation", lambda: engine.explain(rows))):
+                repeat = 200 if len(rows) == 1 else 10
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    fn()
+                timings[label] = (time.perf_counter() - start) / repeat * 1000
+            print(f"  {len(rows):>4} rows: plain {timings['plain']:.3f} ms" + "".join(
+                f", with {label} {timings[label]:.3f} ms (+{(timings[label] / timings['plain'] - 1) * 100:.0f}%)"
+                for label in ("intervals", "explanation")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Exports both models next to their .pkl files (the files MODEL_FORMAT = "compact" loads), then
+# compares pruning options, cold load time and resident memory against the pickled pipelines.
+# Run from the repository root with: python -m benchmarks.forest_format
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+
+from app.services import chatbot_service
+from app.services.featurizer import build_base_featurizer, build_enhanced_featurizer
+from app.services.forest_format import compact_path_for, export_pipeline, load_compact
+
+# Cold load in a fresh interpreter: wall time and resident memory added by loading both models
+PROBE = """
+import os, sys, time
+def rss_mb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS")) / 1024
+import numpy
+before = rss_mb()
+start = time.perf_counter()
+if sys.argv[1] == "pickle":
+    import joblib
+    models = [joblib.load(p) for p in sys.argv[2:]]
+else:
+    from app.services.forest_format import load_compact
+    models = [load_compact(p) for p in sys.argv[2:]]
+    for engine, _ in models:
+        engine.predict(numpy.zeros((1, engine.n_features))) # touch the mapped pages once
+print(f"{(time.perf_counter() - start) * 1000:.0f} ms, +{rss_mb() - before:.1f} MB RSS")
+"""
+
+
+class Profile:
+    pass
+
+
+def allocation_percentages(preds: np.ndarray) -> np.ndarray:
+    return preds / preds.sum(axis=1, keepdims=True) * 100
+
+
+def main():
+    rng = np.random.default_rng(0)
+    n_rows = 20000
+    for name, path, build_featurizer in (("base", chatbot_service.BASE_MODEL_PATH, build_base_featurizer),
+                                         ("enhanced", chatbot_service.ENHANCED_MODEL_PATH, build_enhanced_featurizer)):
+        pipeline = joblib.load(path)
+        mappings = pipeline['mappings']
+        # Random profiles over every category, featurized exactly as requests are
+        profiles = []
+        for _ in range(n_rows):
+            profile = Profile()
+            profile.Salary = float(rng.integers(10, 400) * 1000)
+            profile.Expenses = float(rng.uniform(0.2, 1.0) * profile.Salary)
+            profile.Savings = profile.Salary - profile.Expenses
+            profile.Lifecycle_Stage = str(rng.choice(list(mappings['lifecycle'])))
+            profile.Risk_Appetite = str(rng.choice(list(mappings['risk'])))
+            profile.Investment_Horizon = str(rng.choice(list(mappings['horizon'])))
+            if 'profession_encoder' in pipeline:
+                profile.Profession = str(rng.choice(pipeline['profession_encoder'].classes_))
+                profile.City = str(rng.choice(pipeline['city_encoder'].classes_))
+            profiles.append(profile)
+        X_scaled, _ = build_featurizer(pipeline).transform(profiles, scaled=True)
+        reference = allocation_percentages(pipeline['model'].predict(X_scaled))
+
+        print(f"{name}: {os.path.getsize(path) / 1e6:.2f} MB pickle")
+        for max_depth, n_trees in ((None, None), (8, None), (None, 50), (8, 50), (6, 25)):
+            target = compact_path_for(path) if (max_depth, n_trees) == (None, None) else compact_path_for(path) + ".pruned"
+            export_pipeline(pipeline, target, max_depth=max_depth, n_trees=n_trees)
+            engine, _ = load_compact(target)
+            delta = np.abs(allocation_percentages(engine.predict(X_scaled)) - reference)
+            print(f"  max_depth={str(max_depth):>4} n_trees={str(n_trees):>4}: {os.path.getsize(target) / 1e6:5.2f} MB, "
+                  f"{len(engine.value):6d} nodes, allocation delta mean {delta.mean():.3f} / max {delta.max():.3f} points")
+            if target.endswith(".pruned"):
+                os.remove(target)
+
+    paths = [chatbot_service.BASE_MODEL_PATH, chatbot_service.ENHANCED_MODEL_PATH]
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for label, files in (("pickle", paths), ("compact", [compact_path_for(p) for p in paths])):
+        result = subprocess.run([sys.executable, "-W", "ignore", "-c", PROBE, label, *files],
+                                capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=repo_root))
+        print(f"cold load {label:>7}: {result.stdout.strip() or result.stderr.strip()}")
+
+
+if __name__ == "__main__":
+    main()
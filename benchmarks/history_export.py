@@ -0,0 +1,61 @@
+# Peak Python memory of exporting every row with the streaming export vs loading them all as ORM
+# objects first, on a scratch SQLite database (the export format is covered by tests/test_history_export.py).
+# Run from the repository root with: python -m benchmarks.history_export [rows]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.services.history_export import EXPORT_FORMATS, _ndjson_lines, export_user_data_inputs
+
+SAMPLE = {'Salary': 60000, 'Expenses': 40000, 'Savings': 20000, 'Lifecycle_Stage': 'Early Career',
+          'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term', 'Name': 'Bench'}
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:>36}: {elapsed:.1f} s (traced), peak {peak / 1e6:,.1f} MB, {size / 1e6:,.1f} MB of output")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'export.db')}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            for offset in range(0, n, 50000):
+                connection.execute(insert(models.UserDataInput), [
+                    {"user_id": i % 1000, "model_type": ("base", "enhanced", "rule_based")[i % 3], "input_data": SAMPLE}
+                    for i in range(offset, min(n, offset + 50000))
+                ])
+        Session = sessionmaker(bind=engine)
+
+        print(f"{n} rows:")
+        for export_format in EXPORT_FORMATS:
+            measure(f"streaming {export_format}", lambda: sum(
+                len(chunk) for chunk in export_user_data_inputs(export_format, session_factory=Session)))
+
+        def load_all():
+            db = Session()
+            try:
+                items = db.query(models.UserDataInput).order_by(models.UserDataInput.id).all()
+                return len(_ndjson_lines(items))
+            finally:
+                db.close()
+        measure("ORM .all() then ndjson", load_all)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
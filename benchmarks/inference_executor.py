@@ -0,0 +1,53 @@
+# p99 latency of an unrelated route (/static/css/style.css) while inference requests run
+# concurrently, per executor backend. Run from the repository root with: python -m benchmarks.inference_executor
+import asyncio
+import random
+import time
+
+import httpx
+
+from app import schemas
+from app.main import app
+from app.services import chatbot_service
+from app.services.inference_executor import InferenceExecutor
+
+
+async def benchmark(backend: str, inference_tasks: int = 4, probes: int = 50) -> str:
+    chatbot_service.inference_executor = InferenceExecutor(
+        backend=backend, max_workers=4,
+        initializer=chatbot_service.init_inference_worker, initargs=chatbot_service._current_worker_initargs()
+    )
+    chatbot_service.inference_executor.start()
+    random.seed(0)
+    stop = asyncio.Event()
+
+    async def inference_load():
+        while not stop.is_set():
+            request = schemas.ChatbotInteractionRequest(model_type="base", inputs={
+                "Salary": random.randint(20, 300) * 1000, "Expenses": 20000, "Savings": 10000,
+                "Lifecycle_Stage": "Mid-Career", "Risk_Appetite": "Medium", "Investment_Horizon": "Long-term"})
+            await chatbot_service.process_chatbot_interaction_async(request)
+            await asyncio.sleep(0) # the inline backend never suspends on its own
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/static/css/style.css")
+        load = [asyncio.create_task(inference_load()) for _ in range(inference_tasks)]
+        latencies = []
+        for _ in range(probes):
+            start = time.perf_counter()
+            await client.get("/static/css/style.css")
+            latencies.append((time.perf_counter() - start) * 1000)
+        stop.set()
+        await asyncio.gather(*load)
+    chatbot_service.inference_executor.shutdown()
+    latencies.sort()
+    return f"{backend:>7}: /static/css/style.css p50 {latencies[len(latencies) // 2]:7.2f} ms, p99 {latencies[int(len(latencies) * 0.99)]:7.2f} ms"
+
+
+if __name__ == "__main__":
+    # sklearn inference and no cache/batching make each request a ~40 ms CPU-bound call
+    chatbot_service.INFERENCE_ENGINE = "sklearn"
+    chatbot_service.PREDICTION_CACHE_ENABLED = False
+    chatbot_service.load_models()
+    for backend in ("inline", "thread", "process"):
+        print(asyncio.run(benchmark(backend)))
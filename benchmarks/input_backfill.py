@@ -0,0 +1,91 @@
+# Backfill throughput on a scratch SQLite database of JSON-only rows, then the same analytics
+# query over the JSON (json_extract on every row) and over the typed, indexed columns
+# (resumability and idempotence are covered by tests/test_input_backfill.py).
+# Run from the repository root with: python -m benchmarks.input_backfill [rows]
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.database import Base, install_row_counters
+from app.services.input_backfill import BACKFILL_CHUNK_ROWS, backfill_typed_columns
+
+STAGES = ["Early Career", "Mid-Career", "Late Career", "Retirement"]
+RISKS = ["Low", "Medium", "High"]
+HORIZONS = ["Short-term", "Medium-term", "Long-term"]
+
+
+def sample_row(i):
+    salary = random.randint(20, 250) * 1000
+    equity = round(random.uniform(10, 70), 1)
+    inputs = {"Salary": salary, "Expenses": salary // 2, "Savings": salary // 3, "Lifecycle_Stage": random.choice(STAGES),
+              "Risk_Appetite": random.choice(RISKS), "Investment_Horizon": random.choice(HORIZONS)}
+    outputs = {"Equity": equity, "Debt": round((100 - equity) / 2, 1), "Gold": 10.0, "FD/Cash": round((100 - equity) / 2 - 10, 1)}
+    return (i % 1000 + 1, "base", json.dumps(inputs), json.dumps(outputs))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "backfill.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+        install_row_counters(bind=engine)
+
+        random.seed(0)
+        connection = sqlite3.connect(db_path)
+        connection.executemany("INSERT INTO user_data_inputs (user_id, model_type, input_data, output_data) VALUES (?, ?, ?, ?)",
+                               (sample_row(i) for i in range(n)))
+        connection.commit()
+        connection.close()
+
+        result = backfill_typed_columns(pause_seconds=0, session_factory=sessionmaker(bind=engine))
+        print(f"backfilled {result['rows_updated']:,} rows in {result['chunks']} chunks of {BACKFILL_CHUNK_ROWS}: "
+              f"{result['seconds']:.1f} s, {result['rows_updated'] / result['seconds']:,.0f} rows/s")
+
+        def measure(label, sql):
+            with engine.connect() as connection:
+                timings = []
+                for _ in range(5):
+                    start = time.perf_counter()
+                    rows = connection.execute(text(sql)).all()
+                    timings.append(time.perf_counter() - start)
+                print(f"  {label:>40}: {sorted(timings)[2] * 1000:8.1f} ms  {[tuple(round(v, 1) if isinstance(v, float) else v for v in row) for row in rows][:3]}")
+                return rows
+
+        print(f"\nHigh risk appetite, salary over 200,000, equity above 60%: count and average equity share")
+        measure("json_extract on every row", """
+            SELECT COUNT(*), AVG(json_extract(output_data, '$.Equity')) FROM user_data_inputs
+            WHERE json_extract(input_data, '$.Risk_Appetite') = 'High'
+              AND json_extract(input_data, '$.Salary') > 200000
+              AND json_extract(output_data, '$.Equity') > 60""")
+        measure("typed, indexed columns", """
+            SELECT COUNT(*), AVG(equity_pct) FROM user_data_inputs
+            WHERE risk_appetite = 'High' AND salary > 200000 AND equity_pct > 60""")
+
+        print("\nAverage equity share per risk appetite (the admin summary)")
+        measure("json_extract on every row", """
+            SELECT json_extract(input_data, '$.Risk_Appetite') AS risk, COUNT(*), AVG(json_extract(output_data, '$.Equity'))
+            FROM user_data_inputs GROUP BY risk ORDER BY risk""")
+        measure("typed, indexed columns", """
+            SELECT risk_appetite, COUNT(*), AVG(equity_pct) FROM user_data_inputs GROUP BY risk_appetite ORDER BY risk_appetite""")
+
+        db = sessionmaker(bind=engine)()
+        filters = schemas.UserDataInputFilters(risk_appetite="High", min_salary=200000, min_equity_pct=60)
+        start = time.perf_counter()
+        page, _ = crud.get_user_data_inputs_page(db, limit=100, filters=filters)
+        print(f"\nfirst admin page with those filters: {len(page)} rows in {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"total {crud.count_user_data_inputs(db, filters=filters)}")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# Inserts/sec of one commit per record (crud.create_user_data_input) vs the batched writer, and
+# /api/chatbot latency served by uvicorn in each DB_WRITE_MODE, on an idle database and while
+# another connection keeps taking the SQLite write lock (flushing and lost rows are covered by
+# tests/test_input_writer.py).
+# Run from the repository root with: python -m benchmarks.input_writer [records] [requests per run]
+import asyncio
+import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from typing import List
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.database import Base, install_row_counters
+from app.services.input_writer import BatchedInputWriter
+
+PORT = 8766
+CONCURRENCY = 16
+SAMPLE = {'Salary': 60000, 'Expenses': 20000, 'Savings': 40000, 'Lifecycle_Stage': 'Early Career',
+          'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Medium-term'}
+
+
+def scratch_db(tmp: str, name: str) -> str:
+    db_path = os.path.join(tmp, name)
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    install_row_counters(bind=engine)
+    engine.dispose()
+    return db_path
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def insert_rates(n: int):
+    item = schemas.UserDataInputCreate(model_type="base", input_data=SAMPLE)
+    with tempfile.TemporaryDirectory() as tmp:
+        Session = sessionmaker(bind=create_engine(f"sqlite:///{scratch_db(tmp, 'sync.db')}"))
+        db = Session()
+        start = time.perf_counter()
+        for _ in range(n):
+            crud.create_user_data_input(db, item, user_id=1)
+        sync_rate = n / (time.perf_counter() - start)
+        db.close()
+
+        writer = BatchedInputWriter(session_factory=sessionmaker(bind=create_engine(f"sqlite:///{scratch_db(tmp, 'batched.db')}")))
+        writer.start()
+        start = time.perf_counter()
+        for _ in range(n):
+            writer.put(BatchedInputWriter.build_record(item, user_id=1))
+        enqueue_rate = n / (time.perf_counter() - start)
+        writer.stop()
+        batched_rate = n / (time.perf_counter() - start)
+        print(f"inserts/sec: one commit per record {sync_rate:,.0f}, batched {batched_rate:,.0f} end-to-end "
+              f"({enqueue_rate:,.0f} enqueued/sec), {writer.rows_written}/{n} rows in {writer.transactions} transactions")
+
+
+def serve(mode: str, db_path: str):
+    import uvicorn
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app import database
+    from app.main import app
+    from app.services import data_service
+
+    database.engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    database.SessionLocal.configure(bind=database.engine)
+    database.AsyncSessionLocal.configure(bind=create_async_engine(f"sqlite+aiosqlite:///{db_path}"))
+    data_service.CSV_FILE_PATH = os.path.join(os.path.dirname(db_path), "log.csv")
+    data_service.DB_WRITE_MODE = mode
+    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="error")
+
+
+def lock_holder(db_path: str, stop: threading.Event, hold_seconds: float = 0.05):
+    # Another writer (a second worker, a batch job) taking the write lock half of the time
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    while not stop.is_set():
+        connection.execute("BEGIN IMMEDIATE")
+        time.sleep(hold_seconds)
+        connection.execute("COMMIT")
+        time.sleep(hold_seconds)
+    connection.close()
+
+
+async def bench(mode: str, db_path: str, n_requests: int):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=60) as client:
+        for _ in range(300): # wait for startup (models load)
+            try:
+                await client.get("/docs")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        credentials = {"email": "bench@example.com", "password": "benchpassword", "confirm_password": "benchpassword"}
+        await client.post("/auth/signup", json=credentials)
+        token = (await client.post("/auth/token", data={"username": "bench@example.com", "password": "benchpassword"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        body = {"model_type": "base", "inputs": SAMPLE}
+        await client.post("/api/chatbot", json=body, headers=headers) # warm-up
+
+        for contended in (False, True):
+            stop = threading.Event()
+            if contended:
+                threading.Thread(target=lock_holder, args=(db_path, stop), daemon=True).start()
+            latencies: List[float] = []
+            remaining = [n_requests]
+
+            async def client_loop():
+                while remaining[0] > 0:
+                    remaining[0] -= 1
+                    start = time.perf_counter()
+                    response = await client.post("/api/chatbot", json=body, headers=headers)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(client_loop() for _ in range(CONCURRENCY)))
+            rate = n_requests / (time.perf_counter() - start)
+            stop.set()
+            print(f"  {'write lock contended' if contended else 'idle database':>20} {mode:>8}: {rate:6,.0f} req/s, "
+                  f"p50 {percentile(latencies, 0.5):6.1f} ms, p99 {percentile(latencies, 0.99):6.1f} ms")
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.INFO)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    insert_rates(n)
+
+    print(f"/api/chatbot, {n_requests} requests per run, {CONCURRENCY} concurrent clients:")
+    for mode in ("sync", "batched"):
+        db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        server = multiprocessing.Process(target=serve, args=(mode, db_path), daemon=True)
+        server.start()
+        try:
+            asyncio.run(bench(mode, db_path, n_requests))
+        finally:
+            server.terminate()
+            server.join()
+        connection = sqlite3.connect(db_path)
+        stored = connection.execute("SELECT COUNT(*) FROM user_data_inputs").fetchone()[0]
+        connection.close()
+        # SIGTERM runs the app's shutdown handlers, so the batched writer has drained by now
+        print(f"  {stored}/{2 * n_requests + 1} inputs stored")
+
+
+if __name__ == "__main__":
+    main()
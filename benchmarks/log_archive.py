@@ -0,0 +1,93 @@
+# Scan times of the raw recommendation CSV and of the columnar archive on a synthetic log
+# (compaction and reads are covered by tests/test_log_archive.py). With --compact [--rebuild] it
+# compacts the configured CSV instead, like POST /admin/api/log-archive/compact.
+# Run from the repository root with: python -m benchmarks.log_archive [--compact [--rebuild]]
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.services import data_service
+from app.services.log_archive import compact_csv, list_partitions, read_archive
+
+
+def write_synthetic_log(csv_path, n, days, rng):
+    stamps = np.sort(np.datetime64('2026-08-01T00:00:00') + rng.integers(0, days * 86400, n).astype('timedelta64[s]'))
+    models = rng.choice(["base", "enhanced", "rule_based"], n, p=[0.5, 0.3, 0.2])
+    with open(csv_path, "w", newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(data_service.CSV_HEADERS)
+        for i in range(n):
+            row = {h: '' for h in data_service.CSV_HEADERS}
+            row.update({'UserID': int(rng.integers(1, 5000)), 'UserEmail': f"user{i % 5000}@example.com", 'ModelType': models[i],
+                        'Timestamp': str(stamps[i]).replace('T', ' '), 'Lifecycle Stage': 'Mid-Career', 'Risk Appetite': 'Medium',
+                        'Investment Horizon': 'Long-term'})
+            if models[i] == "rule_based":
+                row.update({'Annual Salary Package': 900000, 'Total Monthly Expenses': round(rng.uniform(5000, 90000), 2)})
+            else:
+                row.update({'Salary': int(rng.integers(20, 300)) * 1000, 'Expenses': round(rng.uniform(5000, 90000), 2), 'Savings': 10000,
+                            'Equity (%)': round(rng.uniform(10, 60), 1), 'Debt (%)': 30.0, 'Gold (%)': 5.0, 'FD/Cash (%)': 10.0})
+                if models[i] == "enhanced":
+                    row.update({'City': 'Indore', 'Profession': 'Teacher'})
+            writer.writerow([row[h] for h in data_service.CSV_HEADERS])
+
+
+def main():
+    if "--compact" in sys.argv:
+        print(compact_csv(rebuild="--rebuild" in sys.argv))
+        return
+
+    rng = np.random.default_rng(0)
+    n, days = 300000, 60
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, archive_dir = os.path.join(tmp, "log.csv"), os.path.join(tmp, "archive")
+        write_synthetic_log(csv_path, n, days, rng)
+
+        start = time.perf_counter()
+        result = compact_csv(csv_path, archive_dir)
+        compact_s = time.perf_counter() - start
+        archive_bytes = sum(p["size_bytes"] for p in list_partitions(archive_dir))
+        print(f"compacted {result['rows']} rows into {result['partitions_written']} {result['format']} partitions in {compact_s:.1f} s; "
+              f"{os.path.getsize(csv_path) / 1e6:.1f} MB CSV -> {archive_bytes / 1e6:.1f} MB")
+
+        # Query: mean equity share of base-model answers in the last 7 days
+        last_week = date(2026, 8, 1) + timedelta(days=days - 7)
+
+        def with_csv_module():
+            total = count = 0
+            with open(csv_path, newline='') as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    if row['ModelType'] == 'base' and row['Timestamp'][:10] >= last_week.isoformat() and row['Equity (%)']:
+                        total += float(row['Equity (%)'])
+                        count += 1
+            return total / count
+
+        def with_pandas():
+            frame = pd.read_csv(csv_path, usecols=['ModelType', 'Timestamp', 'Equity (%)'])
+            frame = frame[(frame['ModelType'] == 'base') & (frame['Timestamp'].str[:10] >= last_week.isoformat())]
+            return frame['Equity (%)'].mean()
+
+        def with_archive():
+            return read_archive(['Equity (%)'], start=last_week, model_types=['base'], archive_dir=archive_dir)['Equity (%)'].mean()
+
+        answers = {}
+        for label, fn in (("csv module, full scan", with_csv_module), ("pandas.read_csv(usecols)", with_pandas),
+                          ("archive, 7 days x 1 model x 1 column", with_archive)):
+            start = time.perf_counter()
+            answers[label] = fn()
+            print(f"  {label:>38}: {(time.perf_counter() - start) * 1000:8.1f} ms")
+        print(f"  same answer: {len({round(v, 9) for v in answers.values()}) == 1}")
+
+        start = time.perf_counter()
+        everything = read_archive(archive_dir=archive_dir)
+        print(f"  {'archive, every row and column':>38}: {(time.perf_counter() - start) * 1000:8.1f} ms ({len(everything)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Hot reload under load: requests keep succeeding while a new model version is loaded and swapped in.
+# Run from the repository root with: python -m benchmarks.model_registry
+import random
+import threading
+import time
+from typing import Dict, List
+
+from app import schemas
+from app.services import chatbot_service
+
+
+def main():
+    chatbot_service.PREDICTION_CACHE_ENABLED = False
+    chatbot_service.load_models()
+    stop = threading.Event()
+    served_versions: Dict[int, int] = {}
+    latencies_ms: List[float] = []
+    errors: List[str] = []
+
+    def client():
+        rng = random.Random(threading.get_ident())
+        while not stop.is_set():
+            request = schemas.BaseModeInputSchema(
+                Salary=rng.randint(20, 300) * 1000, Expenses=20000, Savings=10000,
+                Lifecycle_Stage="Mid-Career", Risk_Appetite="Medium", Investment_Horizon="Long-term")
+            version = chatbot_service.model_registry.current.version
+            start = time.perf_counter()
+            result = chatbot_service.predict_base_model(request)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            served_versions[version] = served_versions.get(version, 0) + 1
+            if "error" in result:
+                errors.append(result["error"])
+
+    clients = [threading.Thread(target=client) for _ in range(4)]
+    for thread in clients:
+        thread.start()
+    time.sleep(0.5)
+    chatbot_service.reload_models_in_background()
+    chatbot_service.model_registry.wait_for_reload()
+    time.sleep(0.5)
+    stop.set()
+    for thread in clients:
+        thread.join()
+
+    current = chatbot_service.model_registry.current
+    latencies_ms.sort()
+    print(f"version {current.version} live: load {current.load_ms:.0f} ms, warm-up {current.warmup_ms:.0f} ms")
+    print(f"{len(latencies_ms)} requests during the reload, {len(errors)} errors, served by versions {served_versions}")
+    print(f"request latency p50 {latencies_ms[len(latencies_ms) // 2]:.2f} ms, "
+          f"p99 {latencies_ms[int(len(latencies_ms) * 0.99)]:.2f} ms, max {latencies_ms[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
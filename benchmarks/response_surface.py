@@ -0,0 +1,73 @@
+# Builds the base model surface next to its .pkl, then reports the interpolation error against
+# predict_base_model and the latency of both (lookup correctness is covered by tests/test_response_surface.py).
+# Run from the repository root with: python -m benchmarks.response_surface [points per decade] [--reuse]
+import os
+import sys
+import time
+
+import numpy as np
+
+from app import schemas
+from app.services import chatbot_service
+from app.services.response_surface import load_surface, save_surface, surface_path_for
+
+
+def random_items(mappings, ranges, n, rng):
+    def log_uniform(field):
+        low, high = ranges[field]
+        return np.exp(rng.uniform(np.log(low), np.log(high), n))
+
+    salary, expenses, savings = log_uniform("Salary"), log_uniform("Expenses"), log_uniform("Savings")
+    return [
+        schemas.BaseModeInputSchema(
+            Salary=float(salary[i]), Expenses=float(expenses[i]), Savings=float(savings[i]),
+            Lifecycle_Stage=str(rng.choice(list(mappings['lifecycle']))), Risk_Appetite=str(rng.choice(list(mappings['risk']))),
+            Investment_Horizon=str(rng.choice(list(mappings['horizon']))))
+        for i in range(n)
+    ]
+
+
+def main():
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+    if arguments:
+        chatbot_service.RESPONSE_SURFACE_POINTS_PER_DECADE = int(arguments[0])
+    chatbot_service.PREDICTION_CACHE_ENABLED = False
+    chatbot_service.load_models()
+    models = chatbot_service.model_registry.current
+    start = time.perf_counter()
+    path = surface_path_for(chatbot_service.BASE_MODEL_PATH)
+    if "--reuse" in sys.argv and os.path.exists(path):
+        print(f"reusing {path}")
+    else:
+        surface = chatbot_service.build_base_surface(models)
+        build_s = time.perf_counter() - start
+        save_surface(surface, path, models.sources.get("base"))
+        print(f"built {surface.values.shape} surface ({surface.values.nbytes / 1e6:.1f} MB) in {build_s:.1f} s -> {path}")
+    surface, _ = load_surface(path)
+
+    n = 2000
+    items = random_items(models.base_pipeline['mappings'], chatbot_service.RESPONSE_SURFACE_AMOUNT_RANGES, n,
+                         np.random.default_rng(0))
+    exact = np.asarray([[chatbot_service.predict_base_model(item)[k] for k in chatbot_service.ALLOCATION_KEYS] for item in items])
+    raw, covered = surface.lookup(items)
+    approx = np.asarray([[a[k] for k in chatbot_service.ALLOCATION_KEYS] for a in chatbot_service._normalize_allocations(raw)])
+    error = np.abs(approx - exact)
+    print(f"{int(covered.sum())}/{n} in-grid profiles: max error {error.max():.1f} pts, mean {error.mean():.2f} pts, "
+          f"p99 {np.quantile(error.max(axis=1), 0.99):.1f} pts (allocation percentage points)")
+
+    for label, fn in (("exact (compiled forest)", lambda item: chatbot_service._predict_base_model_uncached(item, models)),
+                      ("surface lookup", lambda item: chatbot_service._normalize_allocations(surface.lookup_one(item)[None, :])[0])):
+        start = time.perf_counter()
+        for item in items[:500]:
+            fn(item)
+        print(f"  single row {label:>24}: {(time.perf_counter() - start) / 500 * 1000:.3f} ms")
+    for label, fn in (("exact (compiled forest)", lambda: chatbot_service._score_feature_matrix(
+                          models.base_pipeline, models.base_engine, models.base_featurizer.transform(items)[0])),
+                      ("surface lookup", lambda: chatbot_service._normalize_allocations(surface.lookup(items)[0]))):
+        start = time.perf_counter()
+        fn()
+        print(f"  {n} rows {label:>28}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
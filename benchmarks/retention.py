@@ -0,0 +1,139 @@
+# Archiving a scratch SQLite database of inputs spread over two years: throughput and the longest
+# write-lock hold per chunk vs one big transaction, the insert latency another writer sees meanwhile,
+# and the admin queries over the live table before and after (chunking, resumability and idempotence
+# are covered by tests/test_retention.py).
+# Run from the repository root with: python -m benchmarks.retention [rows]
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.database import Base, install_row_counters
+from app.services.retention import RETENTION_CHUNK_ROWS, archive_old_inputs
+
+SAMPLE = {'Salary': 60000, 'Expenses': 20000, 'Savings': 40000, 'Lifecycle_Stage': 'Early Career',
+          'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Medium-term'}
+ITEM = schemas.UserDataInputCreate(model_type="base", input_data=SAMPLE)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def sessions(db_path: str):
+    # A long busy timeout, so the concurrent writer waits out a big transaction instead of failing
+    return sessionmaker(bind=create_engine(f"sqlite:///{db_path}", connect_args={"timeout": 120}))
+
+
+def admin_queries(Session, label: str):
+    db = Session()
+    timings = {}
+    for name, query in (
+        ("deep page (offset 100,000)", lambda: crud.get_all_user_data_inputs(db, skip=100000, limit=100)),
+        ("summary by risk appetite", lambda: crud.summarize_user_data_inputs(db, "risk_appetite")),
+        ("filtered count", lambda: crud.count_user_data_inputs(db, filters=schemas.UserDataInputFilters(min_salary=100000))),
+    ):
+        runs = []
+        for _ in range(3):
+            start = time.perf_counter()
+            query()
+            runs.append(time.perf_counter() - start)
+        timings[name] = sorted(runs)[1] * 1000
+    print(f"  {label:>7}: {crud.count_user_data_inputs(db):,} live rows; "
+          + ", ".join(f"{name} {ms:.1f} ms" for name, ms in timings.items()))
+    db.close()
+
+
+def archive_with_writer(Session, **kwargs):
+    # Another connection inserting inputs one at a time (as the chatbot's sync write mode does)
+    stop = threading.Event()
+    latencies = []
+
+    def writer():
+        db = Session()
+        while not stop.is_set():
+            start = time.perf_counter()
+            crud.create_user_data_input(db, ITEM, user_id=1)
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+        db.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.5) # writer's baseline
+    baseline = len(latencies)
+    result = archive_old_inputs(retention_days=365, session_factory=Session, **kwargs)
+    stop.set()
+    thread.join()
+    during = latencies[baseline:]
+    return result, percentile(latencies[:baseline], 0.99), percentile(during, 0.99), max(during) * 1000
+
+
+def create_database(db_path: str, n: int):
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    install_row_counters(bind=engine)
+    engine.dispose()
+
+    random.seed(0)
+    now = datetime.now(timezone.utc)
+    values = {**crud.typed_columns(ITEM.input_data, None), "typed_columns_version": crud.TYPED_COLUMNS_VERSION}
+
+    def sample_row(i):
+        # Evenly over the last two years, in insertion (id) order like real traffic
+        timestamp = now - timedelta(days=730) + timedelta(days=730) * i / n
+        salary = random.randint(20, 250) * 1000
+        return (i % 1000 + 1, "base", '{}', timestamp.strftime("%Y-%m-%d %H:%M:%S"), values["lifecycle_stage"],
+                random.choice(["Low", "Medium", "High"]), values["investment_horizon"], salary, values["typed_columns_version"])
+
+    connection = sqlite3.connect(db_path)
+    connection.executemany(
+        "INSERT INTO user_data_inputs (user_id, model_type, input_data, timestamp, lifecycle_stage, risk_appetite, "
+        "investment_horizon, salary, typed_columns_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (sample_row(i) for i in range(n)))
+    connection.commit()
+    connection.close()
+
+
+def main():
+    logging.disable(logging.INFO)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "retention.db")
+        create_database(db_path, n)
+        shutil.copy(db_path, os.path.join(tmp, "one_transaction.db"))
+
+        Session = sessions(db_path)
+        print(f"{n:,} inputs over two years, archiving those older than 365 days:")
+        admin_queries(Session, "before")
+        result, idle_p99, p99, worst = archive_with_writer(Session)
+        print(f"  chunks of {RETENTION_CHUNK_ROWS}: {result['rows_archived']:,} rows in {result['seconds']:.1f} s "
+              f"({result['rows_archived'] / result['seconds']:,.0f} rows/s), longest chunk {result['longest_chunk_ms']:.0f} ms; "
+              f"concurrent insert p99 {idle_p99:.1f} ms idle, {p99:.1f} ms during, max {worst:.0f} ms")
+        result, idle_p99, p99, worst = archive_with_writer(sessions(os.path.join(tmp, "one_transaction.db")), chunk_rows=n)
+        print(f"  one transaction: {result['rows_archived']:,} rows in {result['seconds']:.1f} s; "
+              f"concurrent insert p99 {idle_p99:.1f} ms idle, {p99:.1f} ms during, max {worst:.0f} ms")
+        admin_queries(Session, "after")
+
+        db = Session()
+        page, _ = crud.get_user_data_inputs_page(db, user_id=1, limit=100, archived=True)
+        archived_total = crud.count_user_data_inputs(db, archived=True)
+        live_total = crud.count_user_data_inputs(db)
+        db.close()
+        print(f"  archive: {archived_total:,} rows, first page of user 1 has {len(page)}; live + archived = {live_total + archived_total:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, install_row_counters
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A scratch SQLite database with every table and the row-count triggers."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    install_row_counters(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def loaded_models():
+    """The ML models from app/ml_models, loaded once for the whole run."""
+    from app.services import chatbot_service
+    chatbot_service.load_models()
+    return chatbot_service.model_registry.current
@@ -0,0 +1,78 @@
+import asyncio
+
+from app import schemas
+from app.services import chatbot_service
+from app.services.batch_dispatcher import MicroBatchDispatcher
+from app.services.prediction_cache import PredictionCache
+
+PROFILE = {"Salary": 60000, "Expenses": 30000, "Savings": 20000, "Lifecycle_Stage": "Early Career",
+           "Risk_Appetite": "Medium", "Investment_Horizon": "Long-term"}
+
+
+class RecordingPredictor:
+    """predict_batch stand-in that records every batch and answers each input with itself."""
+
+    def __init__(self, release: asyncio.Event = None):
+        self.batches = []
+        self.release = release
+
+    async def runner(self, predict_batch, model_type, inputs):
+        if self.release is not None:
+            await self.release.wait()
+        return predict_batch(model_type, inputs)
+
+    def __call__(self, model_type, inputs):
+        self.batches.append(list(inputs))
+        return [{"input": value} for value in inputs]
+
+
+def test_concurrent_requests_are_scored_in_one_batch():
+    async def scenario():
+        predictor = RecordingPredictor()
+        dispatcher = MicroBatchDispatcher(predictor, window_ms=20, max_batch_size=64)
+        dispatcher.start()
+        results = await asyncio.gather(*(dispatcher.submit("base", i) for i in range(10)))
+        await dispatcher.stop()
+        return predictor, results, dispatcher.stats()
+
+    predictor, results, stats = asyncio.run(scenario())
+    assert predictor.batches == [list(range(10))]
+    assert results == [{"input": i} for i in range(10)]
+    assert (stats["batches"], stats["requests"], stats["largest_batch"]) == (1, 10, 10)
+
+
+def test_stop_fails_queued_and_in_flight_requests():
+    async def scenario():
+        predictor = RecordingPredictor(release=asyncio.Event())
+        dispatcher = MicroBatchDispatcher(predictor, window_ms=0, max_batch_size=2, runner=predictor.runner)
+        dispatcher.start()
+        submissions = [asyncio.ensure_future(dispatcher.submit("base", i)) for i in range(5)]
+        # Let the worker take the first batch and block in the runner, the rest stay queued
+        await asyncio.sleep(0.05)
+        await dispatcher.stop()
+        return await asyncio.gather(*submissions, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) and "stopped" in str(r) for r in results)
+
+
+def test_identical_concurrent_requests_share_one_row(monkeypatch):
+    predictor = RecordingPredictor()
+    monkeypatch.setattr(chatbot_service, "PREDICTION_CACHE_ENABLED", True)
+    monkeypatch.setattr(chatbot_service, "prediction_cache", PredictionCache())
+    other = dict(PROFILE, Risk_Appetite="High")
+    inputs = [schemas.BaseModeInputSchema(**PROFILE) for _ in range(5)] + [schemas.BaseModeInputSchema(**other)]
+
+    async def scenario():
+        dispatcher = MicroBatchDispatcher(predictor, window_ms=20)
+        monkeypatch.setattr(chatbot_service, "batch_dispatcher", dispatcher)
+        dispatcher.start()
+        results = await asyncio.gather(*(chatbot_service._predict_batched("base", i) for i in inputs))
+        await dispatcher.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    assert [len(batch) for batch in predictor.batches] == [2]
+    assert results[:5] == [{"input": inputs[0]}] * 5
+    stats = chatbot_service.prediction_cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["entries"]) == (2, 4, 2)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from app import schemas
+from app.services import chatbot_service
+
+BASE_PROFILES = [
+    {"Salary": salary, "Expenses": salary // 2, "Savings": salary // 3, "Lifecycle_Stage": stage,
+     "Risk_Appetite": risk, "Investment_Horizon": horizon}
+    for salary, stage, risk, horizon in [
+        (25000, "Student", "Low", "Short-term"),
+        (60000, "Early Career", "Medium", "Medium-term"),
+        (150000, "Mid-Career", "High", "Long-term"),
+        (90000, "Late Career", "Low", "Long-term"),
+    ]
+]
+
+
+def test_allocations_use_builtin_round():
+    # Same as rounding each share on its own with the built-in round, as the single-request path did
+    preds = np.random.default_rng(0).random((500, 4))
+    for row, allocation in zip(preds, chatbot_service._normalize_allocations(preds)):
+        total = row.sum()
+        assert allocation == {key: round(float(value / total * 100), 1) for key, value in zip(chatbot_service.ALLOCATION_KEYS, row)}
+        assert all(type(value) is float for value in allocation.values())
+    # A tie np.round breaks upwards (29.35 -> 29.4) where the built-in round gives 29.3
+    assert chatbot_service._normalize_allocations(np.array([[0.587, 0.134, 0.545, 0.734]]))[0]["Equity"] == 29.3
+
+
+def test_zero_total_rows_get_the_error_payload():
+    allocations = chatbot_service._normalize_allocations(np.array([[0.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, 1.0]]))
+    assert allocations[0]["error"] == "Prediction resulted in zero total"
+    assert allocations[1] == {"Equity": 50.0, "Debt": 0.0, "Gold": 0.0, "FD/Cash": 50.0}
+
+
+@pytest.mark.parametrize("engine_name", ["compiled", "sklearn"])
+def test_batch_matches_single_requests(loaded_models, monkeypatch, engine_name):
+    monkeypatch.setattr(chatbot_service, "INFERENCE_ENGINE", engine_name)
+    monkeypatch.setattr(chatbot_service, "PREDICTION_CACHE_ENABLED", False)
+    batch = chatbot_service.process_chatbot_batch(schemas.ChatbotBatchRequest(model_type="base", inputs=BASE_PROFILES))
+    assert batch.error_count == 0
+    for item, profile in zip(batch.results, BASE_PROFILES):
+        single = chatbot_service.process_chatbot_interaction(schemas.ChatbotInteractionRequest(model_type="base", inputs=profile))
+        assert item.recommendation == single.recommendation
+
+
+def test_batch_reports_invalid_rows_individually(loaded_models):
+    inputs = [BASE_PROFILES[0], dict(BASE_PROFILES[0], Risk_Appetite="Bogus"), {"Salary": 1}]
+    batch = chatbot_service.process_chatbot_batch(schemas.ChatbotBatchRequest(model_type="base", inputs=inputs))
+    assert batch.error_count == 2
+    assert batch.results[0].error is None and batch.results[0].recommendation
+    assert "Bogus" in batch.results[1].error
+    assert batch.results[2].error
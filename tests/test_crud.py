@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app import crud, database, models, schemas
+from app.database import install_row_counters, install_user_search
+
+START = datetime(2026, 8, 1, 9, 0, 0)
+
+
+def add_users(db, n):
+    db.add_all(models.User(email=f"user{i}@example.com", hashed_password="x") for i in range(1, n + 1))
+    db.commit()
+
+
+def add_inputs(db, timestamps, user_id=1, model_type="base"):
+    crud.bulk_create_user_data_inputs(db, [
+        {"user_id": user_id, "model_type": model_type, "input_data": {}, "timestamp": timestamp} for timestamp in timestamps
+    ])
+
+
+def assert_counts_match(db, user_ids=(1, 2, 3)):
+    assert crud.count_users(db) == db.scalar(crud.full_count_statement(models.User))
+    assert crud.count_user_data_inputs(db) == db.scalar(crud.full_count_statement(models.UserDataInput))
+    for user_id in user_ids:
+        assert crud.count_user_data_inputs(db, user_id) == db.scalar(crud.full_count_statement(models.UserDataInput, user_id))
+
+
+def test_triggers_count_inserts_deletes_and_moves(db):
+    add_users(db, 3)
+    add_inputs(db, [START] * 4, user_id=1)
+    add_inputs(db, [START] * 2, user_id=2)
+    assert (crud.count_users(db), crud.count_user_data_inputs(db)) == (3, 6)
+    assert [crud.count_user_data_inputs(db, user_id) for user_id in (1, 2, 3)] == [4, 2, 0]
+
+    db.execute(text("DELETE FROM user_data_inputs WHERE id IN (1, 5)"))
+    db.execute(text("UPDATE user_data_inputs SET user_id = 3 WHERE id = 2"))
+    db.execute(text("DELETE FROM users WHERE id = 3"))
+    db.commit()
+    assert (crud.count_users(db), crud.count_user_data_inputs(db)) == (2, 4)
+    assert [crud.count_user_data_inputs(db, user_id) for user_id in (1, 2, 3)] == [2, 1, 1]
+    assert_counts_match(db)
+
+
+def test_rolled_back_writes_are_not_counted(db):
+    add_users(db, 1)
+    add_inputs(db, [START])
+    db.add(models.UserDataInput(user_id=1, model_type="base", input_data={}))
+    db.flush()
+    db.rollback()
+    assert crud.count_user_data_inputs(db) == crud.count_user_data_inputs(db, 1) == 1
+
+
+def test_counts_are_seeded_when_the_triggers_are_installed(engine, db):
+    add_users(db, 2)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TRIGGER trg_user_data_inputs_count_insert"))
+    add_inputs(db, [START] * 3, user_id=2) # not counted: no trigger
+    assert crud.count_user_data_inputs(db) == 0
+
+    install_row_counters(bind=engine)
+    assert crud.count_user_data_inputs(db) == crud.count_user_data_inputs(db, 2) == 3
+    add_inputs(db, [START], user_id=2)
+    assert crud.count_user_data_inputs(db, 2) == 4
+    assert_counts_match(db)
+
+
+def test_filtered_and_archived_counts_are_exact(db):
+    add_users(db, 1)
+    add_inputs(db, [START] * 2, model_type="base")
+    add_inputs(db, [START + timedelta(days=1)], model_type="enhanced")
+    assert crud.count_user_data_inputs(db, filters=schemas.UserDataInputFilters(model_type="enhanced")) == 1
+    assert crud.count_user_data_inputs(db, filters=schemas.UserDataInputFilters()) == 3
+
+    assert crud.archive_user_data_inputs_chunk(db, before=START + timedelta(hours=1)) == 2
+    assert crud.count_user_data_inputs(db, archived=True) == 2
+    assert crud.count_user_data_inputs(db) == crud.count_user_data_inputs(db, 1) == 1
+
+
+def test_user_pages_walk_every_user_once_in_id_order(db):
+    add_users(db, 23)
+    ids, cursor, pages = [], None, 0
+    while True:
+        users, cursor = crud.get_users_page(db, cursor, limit=10)
+        ids += [user.id for user in users]
+        pages += 1
+        if cursor is None:
+            break
+    assert ids == list(range(1, 24))
+    assert pages == 3
+
+
+def walk_input_pages(db, limit, **kwargs):
+    ids, cursor = [], None
+    while True:
+        items, cursor = crud.get_user_data_inputs_page(db, cursor=cursor, limit=limit, **kwargs)
+        ids += [item.id for item in items]
+        if cursor is None:
+            return ids
+
+
+def test_input_pages_are_newest_first_with_ties_broken_by_id(db):
+    add_users(db, 2)
+    # Several rows per second, as CURRENT_TIMESTAMP stores them, inserted out of order
+    timestamps = [START + timedelta(seconds=s) for s in (3, 1, 3, 2, 1, 3, 0, 2, 1, 3)]
+    add_inputs(db, timestamps[:6], user_id=1)
+    add_inputs(db, timestamps[6:], user_id=2)
+    expected = [id for _, id in sorted(((t, i + 1) for i, t in enumerate(timestamps)), reverse=True)]
+
+    for limit in (1, 3, 4, 10, 11):
+        assert walk_input_pages(db, limit) == expected
+    assert walk_input_pages(db, 2, user_id=2) == [i for i in expected if i > 6]
+    # Pages match what OFFSET returns, for a key without ties
+    assert [item.id for item in crud.get_all_user_data_inputs(db, skip=0, limit=3)] == expected[:3]
+
+
+def test_filtered_and_archived_input_pages(db):
+    add_users(db, 1)
+    add_inputs(db, [START + timedelta(minutes=m) for m in range(5)], model_type="base")
+    add_inputs(db, [START + timedelta(minutes=m) for m in range(5)], model_type="enhanced")
+    filters = schemas.UserDataInputFilters(model_type="enhanced")
+    assert walk_input_pages(db, 2, filters=filters) == [10, 9, 8, 7, 6]
+
+    crud.archive_user_data_inputs_chunk(db, before=START + timedelta(minutes=2))
+    assert walk_input_pages(db, 2, archived=True) == [7, 2, 6, 1]
+    assert walk_input_pages(db, 2) == [10, 5, 9, 4, 8, 3]
+
+
+def test_cursors_are_opaque_and_validated(db):
+    cursor = crud.encode_cursor(["2026-08-01T09:00:00", 5])
+    assert "=" not in cursor and crud.decode_cursor(cursor) == ["2026-08-01T09:00:00", 5]
+    for bad in ("not a cursor", crud.encode_cursor({"a": 1}), crud.encode_cursor(["yesterday", 1])):
+        with pytest.raises(ValueError):
+            crud.get_user_data_inputs_page(db, cursor=bad)
+
+
+@pytest.fixture
+def search_db(engine, db, monkeypatch):
+    """Users with mixed-case emails and the users_fts trigram index installed (the flag is restored afterwards)."""
+    monkeypatch.setattr(database, "user_search_indexed", False)
+    assert install_user_search(bind=engine)
+    for email in ("Rohan.Sharma@Gmail.com", "rohit@example.com", "ro@x.io", "PRIYA.ro@yahoo.com", "aro@z.com", "sharma@finco.in"):
+        db.add(models.User(email=email, hashed_password="x"))
+    db.commit()
+    return db
+
+
+def search(db, term, limit=100):
+    users, cursor = crud.search_users_page(db, term, limit=limit)
+    return [user.email for user in users], cursor
+
+
+def query_plan(db, statement):
+    compiled = statement.compile(db.get_bind())
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return " ".join(row[-1] for row in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params))
+
+
+@pytest.mark.parametrize("term", ["ro", "Ro", "RO", " rO "])
+def test_short_terms_match_email_prefixes_whatever_their_case(search_db, term):
+    # Too short for trigrams: prefixes only (not "PRIYA.ro@" or "aro@"), shortest first
+    assert search(search_db, term) == (["ro@x.io", "rohit@example.com", "Rohan.Sharma@Gmail.com"], None)
+    assert crud.count_user_search(search_db, term) == 3
+    assert "ix_users_email_lower" in query_plan(search_db, crud.user_search_statement(term))
+
+
+def test_short_term_prefix_range_is_case_insensitive_at_the_edges(search_db):
+    search_db.add(models.User(email="S@edge.io", hashed_password="x"))
+    search_db.commit()
+    assert search(search_db, "s")[0] == ["S@edge.io", "sharma@finco.in"]
+    assert search(search_db, "Z")[0] == []
+
+
+@pytest.mark.parametrize("term", ["sharma", "SHARMA", "Sharma@"])
+def test_longer_terms_use_the_trigram_index(search_db, term):
+    emails, _ = search(search_db, term)
+    # Exact match first, then prefix matches, then the rest; shorter emails first within each
+    assert emails == ["sharma@finco.in", "Rohan.Sharma@Gmail.com"]
+    assert crud.count_user_search(search_db, term) == 2
+    statement = crud.user_search_statement(term, indexed=True)
+    assert "MATCH" in str(statement.compile(search_db.get_bind()))
+    assert "users_fts" in query_plan(search_db, statement)
+    # Same answer as the LIKE scan used without the index
+    assert [user.email for user, _ in search_db.execute(crud.user_search_statement(term, indexed=False))] == emails
+
+
+def test_exact_match_ranks_first(search_db):
+    assert search(search_db, "ROHIT@EXAMPLE.COM")[0] == ["rohit@example.com"]
+    assert search(search_db, "gmail.com")[0] == ["Rohan.Sharma@Gmail.com"]
+
+
+@pytest.mark.parametrize("term", ['a"b', "ro OR sh", "sha*", "NEAR(ro sh)", "x.io)"])
+def test_fts_syntax_in_terms_is_matched_literally(search_db, term):
+    expected = [user.email for user, _ in search_db.execute(crud.user_search_statement(term, indexed=False))]
+    assert search(search_db, term)[0] == expected
+    assert crud.count_user_search(search_db, term) == len(expected)
+
+
+def test_index_follows_user_changes(search_db):
+    search_db.add(models.User(email="New.Sharma@Example.com", hashed_password="x"))
+    search_db.execute(text("UPDATE users SET email = 'sharmila@finco.in' WHERE email = 'sharma@finco.in'"))
+    search_db.execute(text("DELETE FROM users WHERE email = 'Rohan.Sharma@Gmail.com'"))
+    search_db.commit()
+    assert search(search_db, "sharma")[0] == ["New.Sharma@Example.com"]
+    assert search(search_db, "sharmi")[0] == ["sharmila@finco.in"]
+
+
+def test_search_pages_walk_every_match_once(search_db):
+    search_db.add_all(models.User(email=f"Page{i:02d}@Sharma.net", hashed_password="x") for i in range(12))
+    search_db.commit()
+    everything = search(search_db, "sharma")[0]
+    emails, cursor = [], None
+    while True:
+        users, cursor = crud.search_users_page(search_db, "sharma", cursor, limit=5)
+        emails += [user.email for user in users]
+        if cursor is None:
+            break
+    assert emails == everything and len(emails) == 14
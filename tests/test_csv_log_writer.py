@@ -0,0 +1,82 @@
+import asyncio
+import csv
+import threading
+
+import pytest
+
+from app.services.csv_log_writer import BufferedCsvWriter, CsvLogQueueFull
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_stop_flushes_rows_still_buffered(tmp_path):
+    path = str(tmp_path / "log.csv")
+    # Neither threshold is reached, so only stop() can get the rows to disk
+    writer = BufferedCsvWriter(path, flush_rows=10000, flush_interval_seconds=3600)
+    writer.start()
+    for i in range(100):
+        writer.put([i, "row"])
+    writer.stop()
+
+    assert not writer.running
+    assert read_rows(path) == [[str(i), "row"] for i in range(100)]
+    assert writer.stats()["rows_written"] == 100 and writer.flushes == 1
+
+
+def test_initialize_runs_before_the_first_row(tmp_path):
+    path = tmp_path / "log.csv"
+    writer = BufferedCsvWriter(str(path), initialize=lambda: path.write_text("Id,Value\n"))
+    writer.start()
+    writer.put([1, "a"])
+    writer.stop()
+    assert read_rows(path) == [["Id", "Value"], ["1", "a"]]
+
+
+def test_no_rows_lost_under_backpressure(tmp_path):
+    path = str(tmp_path / "log.csv")
+    # A queue much smaller than the load, so producers keep waiting on the writer
+    writer = BufferedCsvWriter(path, max_queue_size=8, flush_rows=16, enqueue_timeout_seconds=30)
+    writer.start()
+
+    def produce(thread):
+        for i in range(500):
+            writer.put([thread, i])
+
+    threads = [threading.Thread(target=produce, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.stop()
+
+    rows = read_rows(path)
+    assert sorted((int(t), int(i)) for t, i in rows) == [(t, i) for t in range(4) for i in range(500)]
+    # Each producer's rows keep their order
+    for t in range(4):
+        assert [int(i) for thread, i in rows if thread == str(t)] == list(range(500))
+    assert writer.backpressure_waits > 0
+    assert (writer.dropped, writer.write_errors) == (0, 0)
+
+
+def test_submit_from_the_event_loop(tmp_path):
+    path = str(tmp_path / "log.csv")
+    writer = BufferedCsvWriter(path, max_queue_size=4, enqueue_timeout_seconds=30)
+    writer.start()
+
+    async def clients():
+        await asyncio.gather(*(writer.submit([c, i]) for c in range(10) for i in range(20)))
+
+    asyncio.run(clients())
+    writer.stop()
+    assert len(read_rows(path)) == 200
+
+
+def test_full_queue_gives_up_after_the_timeout(tmp_path):
+    writer = BufferedCsvWriter(str(tmp_path / "log.csv"), max_queue_size=1, enqueue_timeout_seconds=0.01)
+    writer.put([1]) # not started, so nothing drains the queue
+    with pytest.raises(CsvLogQueueFull):
+        writer.put([2])
+    assert (writer.backpressure_waits, writer.dropped) == (1, 1)
@@ -0,0 +1,139 @@
+import csv
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.services import csv_segments
+from app.services.csv_segments import SegmentedCsvWriter, merge_segments, segment_dir_for
+
+HEADERS = ["UserID", "Name"]
+
+
+@pytest.fixture(scope="module")
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    return str(tmp_path / "log.csv")
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def write_segment(segment_dir, name, rows, tail=""):
+    os.makedirs(segment_dir, exist_ok=True)
+    with open(os.path.join(segment_dir, name), "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+        f.write(tail)
+
+
+def write_rows(segment_dir, rows):
+    writer = SegmentedCsvWriter(segment_dir, flush_rows=4, flush_interval_seconds=0.01)
+    writer.start()
+    for row in rows:
+        writer.put(row)
+    writer.stop()
+    return writer
+
+
+def test_process_liveness(dead_pid):
+    assert csv_segments._process_alive(os.getpid())
+    assert not csv_segments._process_alive(dead_pid)
+    assert csv_segments._process_alive(None) # unknown owner: never treated as finished
+
+
+def test_writer_rows_reach_the_csv_once(csv_path):
+    segment_dir = segment_dir_for(csv_path)
+    writer = write_rows(segment_dir, [[i, f"name {i}, quoted \"x\""] for i in range(10)])
+    assert os.path.basename(writer.path).startswith(f"worker-{os.getpid()}-")
+
+    result = merge_segments(csv_path, HEADERS)
+    assert (result["rows_merged"], result["segments"], result["segments_removed"]) == (10, 1, 0)
+    assert read_rows(csv_path) == [HEADERS] + [[str(i), f"name {i}, quoted \"x\""] for i in range(10)]
+    assert merge_segments(csv_path, HEADERS)["rows_merged"] == 0
+    assert len(read_rows(csv_path)) == 11
+
+
+def test_recent_rows_of_a_live_worker_wait_for_the_settle_window(csv_path):
+    segment_dir = segment_dir_for(csv_path)
+    write_rows(segment_dir, [[1, "a"], [2, "b"]])
+    assert merge_segments(csv_path, HEADERS, settle_seconds=3600)["rows_merged"] == 0
+    assert merge_segments(csv_path, HEADERS, settle_seconds=0)["rows_merged"] == 2
+
+
+def test_segments_of_exited_workers_are_taken_whole_and_removed(csv_path, dead_pid):
+    segment_dir = segment_dir_for(csv_path)
+    name = f"worker-{dead_pid}-1.csv"
+    # Stamps far in the future would be held back for a live worker
+    write_segment(segment_dir, name, [[2 * 10**19, 1, "a"], [2 * 10**19 + 1, 2, "b"]], tail="99,3,torn")
+    result = merge_segments(csv_path, HEADERS, settle_seconds=3600)
+    assert (result["rows_merged"], result["segments_removed"]) == (2, 0) # the torn line is still unmerged
+
+    with open(os.path.join(segment_dir, name), "r+b") as f:
+        f.truncate(f.seek(0, os.SEEK_END) - len("99,3,torn"))
+    assert merge_segments(csv_path, HEADERS)["segments_removed"] == 1
+    assert not os.path.exists(os.path.join(segment_dir, name))
+    assert read_rows(csv_path)[1:] == [["1", "a"], ["2", "b"]]
+
+
+def test_rows_are_merged_in_stamp_order_across_segments(csv_path, dead_pid):
+    segment_dir = segment_dir_for(csv_path)
+    write_segment(segment_dir, f"worker-{dead_pid}-1.csv", [[10, 1, "a"], [30, 3, "c"]])
+    write_segment(segment_dir, f"worker-{dead_pid}-2.csv", [[20, 2, "b"], [40, 4, "d"]])
+    merge_segments(csv_path, HEADERS)
+    assert [row[0] for row in read_rows(csv_path)[1:]] == ["1", "2", "3", "4"]
+
+
+def test_an_unfinished_merge_is_cut_back(csv_path, dead_pid):
+    segment_dir = segment_dir_for(csv_path)
+    write_segment(segment_dir, f"worker-{dead_pid}-1.csv", [[10, 1, "a"]])
+    merge_segments(csv_path, HEADERS)
+
+    # A merge that died after appending but before recording its offsets
+    manifest_path = os.path.join(segment_dir, csv_segments.MERGE_MANIFEST)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["merging_from"] = os.path.getsize(csv_path)
+    csv_segments._write_manifest(manifest_path, manifest)
+    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+        f.write('0,half-merged\n1,"torn')
+
+    write_segment(segment_dir, f"worker-{dead_pid}-2.csv", [[20, 2, "b"]])
+    assert merge_segments(csv_path, HEADERS)["rows_merged"] == 1
+    assert read_rows(csv_path) == [HEADERS, ["1", "a"], ["2", "b"]]
+
+
+def _worker(segment_dir, worker_id, rows):
+    writer = SegmentedCsvWriter(segment_dir, flush_rows=16, flush_interval_seconds=0.01)
+    writer.start()
+    for seq in range(rows):
+        writer.put([worker_id, seq])
+    writer.stop()
+
+
+def test_concurrent_workers_and_merges_lose_nothing(csv_path):
+    segment_dir = segment_dir_for(csv_path)
+    workers = [multiprocessing.Process(target=_worker, args=(segment_dir, w, 300)) for w in range(3)]
+    for process in workers:
+        process.start()
+    while any(process.is_alive() for process in workers):
+        merge_segments(csv_path, HEADERS, settle_seconds=0.1)
+    for process in workers:
+        process.join()
+    merge_segments(csv_path, HEADERS)
+
+    rows = [(int(w), int(seq)) for w, seq in read_rows(csv_path)[1:]]
+    assert sorted(rows) == [(w, seq) for w in range(3) for seq in range(300)]
+    for w in range(3):
+        assert [seq for worker_id, seq in rows if worker_id == w] == list(range(300))
+    assert not [name for name in os.listdir(segment_dir) if name.startswith("worker-")]
@@ -0,0 +1,39 @@
+import csv
+
+from app import schemas
+from app.services import chatbot_service, data_service
+
+INPUTS = {'Salary': 60000, 'Expenses': 40000, 'Savings': 20000,
+          'Lifecycle_Stage': 'Early Career', 'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term'}
+ALLOCATION = {'Equity': 50, 'Debt': 30, 'Gold': 10, 'FD/Cash': 10}
+
+
+def test_model_answers_are_recorded():
+    request = schemas.ChatbotInteractionRequest(model_type="base", inputs=INPUTS)
+    response = schemas.ChatbotInteractionResponse(model_type="base", user_inputs=INPUTS, recommendation=ALLOCATION)
+    record = data_service.interaction_record(request, response)
+    assert record.model_type == "base"
+    assert record.input_data == INPUTS and record.output_data == ALLOCATION
+
+
+def test_fallback_advice_and_errors_are_not_recorded():
+    request = schemas.ChatbotInteractionRequest(model_type="base", inputs=INPUTS)
+    fallback = chatbot_service._degraded_response(request, "overloaded")
+    # The rule engine's allocation, which would pass for base-model output if stored
+    assert fallback.degraded and "error" not in fallback.recommendation
+    assert data_service.interaction_record(request, fallback) is None
+
+    failed = fallback.copy(update={"recommendation": {"error": "x"}, "degraded": False, "degraded_reason": None})
+    assert data_service.interaction_record(request, failed) is None
+
+
+def test_append_data_to_csv_writes_one_row(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_service, "CSV_FILE_PATH", str(tmp_path / "log.csv"))
+    data_service.initialize_csv()
+    data_service.append_data_to_csv(1, "test@example.com", "base", INPUTS, ALLOCATION)
+
+    with open(tmp_path / "log.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert rows[0]["UserEmail"] == "test@example.com" and rows[0]["ModelType"] == "base"
+    assert rows[0]["Equity (%)"] == "50"
@@ -0,0 +1,87 @@
+import joblib
+import numpy as np
+import pytest
+
+from app import schemas
+from app.services import chatbot_service
+from app.services.featurizer import build_base_featurizer, build_enhanced_featurizer
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return joblib.load(chatbot_service.ENHANCED_MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def items(pipeline):
+    mappings = pipeline['mappings']
+    rng = np.random.default_rng(0)
+    return [
+        schemas.EnhancedModelInputSchema(
+            Salary=float(rng.integers(20, 300) * 1000), Expenses=float(rng.uniform(5000, 90000)), Savings=float(rng.integers(1, 100) * 1000),
+            Lifecycle_Stage=str(rng.choice(list(mappings['lifecycle']))), Risk_Appetite=str(rng.choice(list(mappings['risk']))),
+            Investment_Horizon=str(rng.choice(list(mappings['horizon']))),
+            Profession=str(rng.choice(pipeline['profession_encoder'].classes_)), City=str(rng.choice(pipeline['city_encoder'].classes_)))
+        for _ in range(500)
+    ]
+
+
+def encoded_row(pipeline, item):
+    """The per-request featurization: LabelEncoders and mapping lookups, before the scaler."""
+    mappings = pipeline['mappings']
+    return [pipeline['profession_encoder'].transform([item.Profession])[0],
+            pipeline['city_encoder'].transform([item.City])[0],
+            item.Salary, item.Expenses, item.Savings,
+            mappings['lifecycle'][item.Lifecycle_Stage], mappings['risk'][item.Risk_Appetite],
+            mappings['horizon'][item.Investment_Horizon]]
+
+
+def test_matrices_match_the_encoders_and_scaler(pipeline, items):
+    featurizer = build_enhanced_featurizer(pipeline)
+    expected = np.asarray([encoded_row(pipeline, item) for item in items], dtype=float)
+    raw, raw_errors = featurizer.transform(items)
+    scaled, scaled_errors = featurizer.transform(items, scaled=True)
+    assert raw_errors == {} and scaled_errors == {}
+    assert np.array_equal(raw, expected)
+    assert np.array_equal(scaled, pipeline['scaler'].transform(expected))
+    for i, item in enumerate(items[:100]):
+        assert np.array_equal(featurizer.transform_one(item)[0], raw[i])
+        assert np.array_equal(featurizer.transform_one(item, scaled=True)[0], scaled[i])
+
+
+def test_base_featurizer_matches_the_scaler():
+    pipeline = joblib.load(chatbot_service.BASE_MODEL_PATH)
+    mappings = pipeline['mappings']
+    item = schemas.BaseModeInputSchema(Salary=60000, Expenses=31234.5, Savings=20000, Lifecycle_Stage="Mid-Career",
+                                       Risk_Appetite="High", Investment_Horizon="Short-term")
+    expected = np.array([[60000, 31234.5, 20000, mappings['lifecycle']["Mid-Career"],
+                          mappings['risk']["High"], mappings['horizon']["Short-term"]]], dtype=float)
+    featurizer = build_base_featurizer(pipeline)
+    assert np.array_equal(featurizer.transform_one(item), expected)
+    assert np.array_equal(featurizer.transform_one(item, scaled=True), pipeline['scaler'].transform(expected))
+
+
+def test_unknown_categories_raise_like_the_encoders(pipeline, items):
+    featurizer = build_enhanced_featurizer(pipeline)
+    unknown_city = items[0].copy(update={"City": "Atlantis"})
+    unknown_stage = items[1].copy(update={"Lifecycle_Stage": "Toddler"})
+    with pytest.raises(ValueError, match="previously unseen labels: 'Atlantis'"):
+        pipeline['city_encoder'].transform(["Atlantis"])
+    with pytest.raises(ValueError, match="previously unseen labels: 'Atlantis'"):
+        featurizer.transform_one(unknown_city)
+    with pytest.raises(KeyError):
+        featurizer.transform_one(unknown_stage)
+
+    X, errors = featurizer.transform([items[2], unknown_city, unknown_stage])
+    assert sorted(errors) == [1, 2]
+    assert isinstance(errors[1], ValueError) and isinstance(errors[2], KeyError)
+    assert np.isnan(X[1]).any() and not np.isnan(X[0]).any()
+
+
+def test_grid_rows_match_single_rows(pipeline, items):
+    featurizer = build_enhanced_featurizer(pipeline)
+    axes = [("Salary", [30000.0, 90000.0]), ("Risk_Appetite", list(pipeline['mappings']['risk']))]
+    grid = featurizer.transform_grid(items[0], axes, scaled=True)
+    expected = [featurizer.transform_one(items[0].copy(update={"Salary": salary, "Risk_Appetite": risk}), scaled=True)[0]
+                for salary in axes[0][1] for risk in axes[1][1]]
+    assert np.array_equal(grid, np.asarray(expected))
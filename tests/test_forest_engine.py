@@ -0,0 +1,96 @@
+import joblib
+import numpy as np
+import pytest
+
+from app.services import chatbot_service
+from app.services.forest_engine import CompiledForest
+
+MODEL_PATHS = {"base": chatbot_service.BASE_MODEL_PATH, "enhanced": chatbot_service.ENHANCED_MODEL_PATH}
+
+
+@pytest.fixture(scope="module", params=sorted(MODEL_PATHS))
+def pipeline(request):
+    return joblib.load(MODEL_PATHS[request.param])
+
+
+def sample_inputs(pipeline, n_rows, seed=0):
+    """Round and fractional rupee amounts around the training range, and every category code."""
+    rng = np.random.default_rng(seed)
+    money = np.column_stack([
+        np.round(rng.uniform(0, 400000, n_rows), -3),
+        rng.uniform(0, 300000, n_rows),
+        np.round(rng.uniform(0, 150000, n_rows), -2),
+    ])
+    categories = np.column_stack([rng.integers(0, 5, n_rows), rng.integers(0, 3, n_rows), rng.integers(0, 3, n_rows)])
+    if 'profession_encoder' not in pipeline:
+        return np.column_stack([money, categories]).astype(float)
+    codes = np.column_stack([rng.integers(0, len(pipeline['profession_encoder'].classes_), n_rows),
+                             rng.integers(0, len(pipeline['city_encoder'].classes_), n_rows)])
+    return np.column_stack([codes, money, categories]).astype(float)
+
+
+def sklearn_trees(pipeline, X):
+    """Per-tree sklearn predictions in predict_trees' layout, shape (n_trees, n_rows, n_outputs)."""
+    X_scaled = pipeline['scaler'].transform(X)
+    return np.stack([np.column_stack([tree.predict(X_scaled) for tree in trees])
+                     for trees in zip(*(forest.estimators_ for forest in pipeline['model'].estimators_))])
+
+
+def boundary_inputs(pipeline, engine, n_splits=3000, seed=1):
+    """
+    Rows that sit exactly on a folded threshold and one float64 step above it, in the split's
+    own feature; the sklearn side sees these through the scaler and the float32 cast.
+    """
+    rng = np.random.default_rng(seed)
+    splits = np.flatnonzero(np.isfinite(engine.threshold))
+    splits = rng.choice(splits, size=min(n_splits, len(splits)), replace=False)
+    base = sample_inputs(pipeline, len(splits), seed)
+    on, above = base.copy(), base.copy()
+    rows = np.arange(len(splits))
+    on[rows, engine.feature[splits]] = engine.threshold[splits]
+    above[rows, engine.feature[splits]] = np.nextafter(engine.threshold[splits], np.inf)
+    return np.vstack([on, above])
+
+
+def test_predict_matches_sklearn(pipeline):
+    engine = CompiledForest.from_pipeline(pipeline)
+    X = sample_inputs(pipeline, 2000)
+    expected = pipeline['model'].predict(pipeline['scaler'].transform(X))
+    assert np.array_equal(engine.predict(X), expected)
+    assert np.array_equal(engine.predict_trees(X), sklearn_trees(pipeline, X))
+
+
+def test_predict_matches_sklearn_on_threshold_boundaries(pipeline):
+    engine = CompiledForest.from_pipeline(pipeline)
+    X = boundary_inputs(pipeline, engine)
+    expected = pipeline['model'].predict(pipeline['scaler'].transform(X))
+    assert np.array_equal(engine.predict(X), expected)
+    assert np.array_equal(engine.predict_trees(X), sklearn_trees(pipeline, X))
+
+
+def test_folded_thresholds_split_where_the_scaler_does(pipeline):
+    folded = CompiledForest.from_pipeline(pipeline)
+    scaled = CompiledForest.from_pipeline(pipeline, fold_scaler=False)
+    scaler = pipeline['scaler']
+    split = np.isfinite(folded.threshold)
+    t, feature = folded.threshold[split], folded.feature[split]
+
+    def scaled_value(x):
+        return ((x - scaler.mean_[feature]) / scaler.scale_[feature]).astype(np.float32)
+    # The folded threshold is the largest raw value that still goes left
+    assert np.all(scaled_value(t) <= scaled.threshold[split])
+    assert not np.any(scaled_value(np.nextafter(t, np.inf)) <= scaled.threshold[split])
+
+
+def test_scaled_input_form_matches_sklearn(pipeline):
+    engine = CompiledForest.from_pipeline(pipeline, fold_scaler=False)
+    X_scaled = pipeline['scaler'].transform(sample_inputs(pipeline, 2000))
+    assert np.array_equal(engine.predict(X_scaled), pipeline['model'].predict(X_scaled))
+
+
+def test_explain_adds_up_to_the_prediction(pipeline):
+    engine = CompiledForest.from_pipeline(pipeline)
+    X = sample_inputs(pipeline, 500)
+    per_tree, contributions = engine.explain(X)
+    assert np.array_equal(per_tree, engine.predict_trees(X))
+    assert np.allclose(engine.bias + contributions.sum(axis=1), engine.predict(X), atol=1e-9)
@@ -0,0 +1,97 @@
+import joblib
+import numpy as np
+import pytest
+
+from app.services import chatbot_service, forest_format
+from app.services.featurizer import build_base_featurizer, build_enhanced_featurizer
+from app.services.forest_engine import CompiledForest
+
+MODELS = {
+    "base": (chatbot_service.BASE_MODEL_PATH, build_base_featurizer),
+    "enhanced": (chatbot_service.ENHANCED_MODEL_PATH, build_enhanced_featurizer),
+}
+
+
+class Profile:
+    pass
+
+
+@pytest.fixture(scope="module", params=sorted(MODELS))
+def model(request):
+    path, build_featurizer = MODELS[request.param]
+    return joblib.load(path), build_featurizer
+
+
+def random_profiles(pipeline, n_rows, seed=0):
+    """Random profiles over every category, as validated requests would carry them."""
+    rng = np.random.default_rng(seed)
+    mappings = pipeline['mappings']
+    profiles = []
+    for _ in range(n_rows):
+        profile = Profile()
+        profile.Salary = float(rng.integers(10, 400) * 1000)
+        profile.Expenses = float(rng.uniform(0.2, 1.0) * profile.Salary)
+        profile.Savings = profile.Salary - profile.Expenses
+        profile.Lifecycle_Stage = str(rng.choice(list(mappings['lifecycle'])))
+        profile.Risk_Appetite = str(rng.choice(list(mappings['risk'])))
+        profile.Investment_Horizon = str(rng.choice(list(mappings['horizon'])))
+        if 'profession_encoder' in pipeline:
+            profile.Profession = str(rng.choice(pipeline['profession_encoder'].classes_))
+            profile.City = str(rng.choice(pipeline['city_encoder'].classes_))
+        profiles.append(profile)
+    return profiles
+
+
+def test_unpruned_export_predicts_like_sklearn(model, tmp_path):
+    pipeline, build_featurizer = model
+    path = str(tmp_path / "model.forest")
+    forest_format.export_pipeline(pipeline, path)
+    engine, loaded = forest_format.load_compact(path)
+    profiles = random_profiles(pipeline, 2000)
+
+    # The loaded scaler parameters, mappings and encoder classes featurize exactly like the pickle
+    X_scaled, errors = build_featurizer(pipeline).transform(profiles, scaled=True)
+    loaded_X, loaded_errors = build_featurizer(loaded).transform(profiles, scaled=True)
+    assert errors == {} and loaded_errors == {}
+    assert np.array_equal(loaded_X, X_scaled)
+    assert loaded['model'] is None and engine.scaled_input
+    assert np.array_equal(engine.predict(X_scaled), pipeline['model'].predict(X_scaled))
+
+
+def test_pruned_export_keeps_the_requested_shape(model, tmp_path):
+    pipeline, _ = model
+    path = str(tmp_path / "model.forest")
+    full = CompiledForest.from_pipeline(pipeline, fold_scaler=False)
+    pruned = forest_format.export_pipeline(pipeline, path, max_depth=6, n_trees=25)
+    engine, _ = forest_format.load_compact(path)
+    header, _ = forest_format.read_header(path)
+
+    assert engine.n_trees == 25 and engine.max_depth <= 6
+    assert len(engine.value) == len(pruned.value) < len(full.value)
+    assert header["pruning"] == {"max_depth": 6, "n_trees": 25}
+    X = np.random.default_rng(1).normal(size=(200, full.n_features))
+    assert np.array_equal(engine.predict(X), pruned.predict(X))
+
+
+def test_pruning_nothing_keeps_every_prediction(model):
+    pipeline, _ = model
+    forest = CompiledForest.from_pipeline(pipeline, fold_scaler=False)
+    X = np.random.default_rng(2).normal(size=(500, forest.n_features)).astype(np.float32)
+    assert np.array_equal(forest_format.prune(forest).predict(X), forest.predict(X))
+
+
+def test_float32_thresholds_split_like_the_float64_ones():
+    rng = np.random.default_rng(3)
+    thresholds = rng.normal(size=5000)
+    t32 = forest_format._round_down_to_float32(thresholds)
+    # Inputs on and right next to every threshold, as sklearn sees them (float32)
+    x = np.concatenate([thresholds, np.nextafter(thresholds, np.inf), np.nextafter(thresholds, -np.inf)]).astype(np.float32)
+    t = np.tile(thresholds, 3)
+    assert np.array_equal(x <= np.tile(t32, 3), x.astype(np.float64) <= t)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"not a forest")
+    with pytest.raises(ValueError, match="not a compact forest file"):
+        forest_format.read_header(str(path))
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import crud, schemas
+from app.services import history_export
+
+BASE_INPUTS = {'Salary': 60000, 'Expenses': 40000, 'Savings': 20000, 'Lifecycle_Stage': 'Early Career',
+               'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term'}
+ALLOCATION = {'Equity': 50.0, 'Debt': 30.0, 'Gold': 10.0, 'FD/Cash': 10.0}
+START = datetime(2026, 8, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def rows(db):
+    """Five inputs of users 1 and 2, an hour apart; the last one is a rule-based answer with an extra input."""
+    values = []
+    for i in range(5):
+        model_type, inputs = ("base", BASE_INPUTS) if i < 4 else ("rule_based", {'Annual_Salary_Package': 900000, 'Note': 'x'})
+        item = schemas.UserDataInputCreate(model_type=model_type, input_data=inputs, output_data=ALLOCATION)
+        values.append(dict(crud.user_data_input_values(item, user_id=1 + i % 2), timestamp=START + timedelta(hours=i)))
+    crud.bulk_create_user_data_inputs(db, values)
+    return values
+
+
+def export(session_factory, export_format="ndjson", **kwargs):
+    return list(history_export.export_user_data_inputs(export_format, session_factory=session_factory, **kwargs))
+
+
+def test_ndjson_has_every_row_in_id_order(session_factory, rows):
+    chunks = export(session_factory, batch_size=2)
+    assert len(chunks) == 3 # one chunk per batch
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [r["id"] for r in records] == [1, 2, 3, 4, 5]
+    assert records[0] == {"id": 1, "user_id": 1, "model_type": "base", "timestamp": "2026-08-01T09:00:00",
+                          "input_data": BASE_INPUTS, "output_data": ALLOCATION}
+
+
+def test_csv_spreads_inputs_and_allocations_over_columns(session_factory, rows):
+    chunks = export(session_factory, "csv")
+    records = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert list(records[0]) == history_export.EXPORT_CSV_HEADERS
+    assert len(records) == 5
+    assert records[0]["Salary"] == "60000" and records[0]["Lifecycle_Stage"] == "Early Career"
+    assert (records[0]["equity_pct"], records[0]["cash_pct"]) == ("50.0", "10.0")
+    assert records[0]["other_inputs"] == ""
+    # Inputs no model takes are kept as JSON rather than dropped
+    assert records[4]["Annual_Salary_Package"] == "900000"
+    assert json.loads(records[4]["other_inputs"]) == {"Note": "x"}
+
+
+def test_empty_csv_export_is_just_the_header(session_factory):
+    assert export(session_factory, "csv") == [",".join(history_export.EXPORT_CSV_HEADERS) + "\r\n"]
+
+
+def test_filters_user_and_time_window(session_factory, rows):
+    def ids(**kwargs):
+        return [json.loads(line)["id"] for line in "".join(export(session_factory, **kwargs)).splitlines()]
+
+    assert ids(user_id=2) == [2, 4]
+    assert ids(filters=schemas.UserDataInputFilters(model_type="rule_based")) == [5]
+    # start is inclusive, end exclusive
+    assert ids(start=START + timedelta(hours=1), end=START + timedelta(hours=3)) == [2, 3]
+
+
+def test_archived_rows_are_exported_from_the_archive(session_factory, db, rows):
+    assert crud.archive_user_data_inputs_chunk(db, before=START + timedelta(hours=2)) == 2
+    assert [json.loads(line)["id"] for line in "".join(export(session_factory, archived=True)).splitlines()] == [1, 2]
+    assert [json.loads(line)["id"] for line in "".join(export(session_factory)).splitlines()] == [3, 4, 5]
+
+
+def test_session_is_closed_when_the_client_goes_away(session_factory, rows):
+    sessions = []
+
+    def tracking_factory():
+        session = session_factory()
+        sessions.append(session)
+        return session
+
+    closed = []
+    stream = history_export.export_user_data_inputs(batch_size=1, session_factory=tracking_factory)
+    next(stream)
+    close = sessions[0].close
+    sessions[0].close = lambda: (closed.append(True), close())
+    stream.close() # what a StreamingResponse does on disconnect
+    assert closed == [True]
+
+
+def test_as_utc_and_filename():
+    aware = datetime(2026, 8, 1, 14, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+    assert history_export.as_utc(aware) == datetime(2026, 8, 1, 9, 0)
+    assert history_export.as_utc(START) == START
+    assert history_export.as_utc(None) is None
+    assert history_export.export_filename("csv", {"user": 3, "model": None, "from": datetime(2026, 8, 1, 9, 0)}) == \
+        "user_data_inputs_user-3_from-2026-08-01T090000.csv"
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services import chatbot_service
+from app.services.inference_executor import InferenceExecutor, InferenceQueueFull, InferenceTimeout
+
+
+def test_rejects_calls_beyond_the_queue_depth():
+    executor = InferenceExecutor(backend="thread", max_workers=1, max_queue_depth=1, timeout_seconds=5)
+    executor.start()
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(sum, [1, 2])
+        release.set()
+        return await first
+
+    try:
+        assert asyncio.run(scenario()) is True
+    finally:
+        executor.shutdown()
+    assert (executor.rejected, executor.completed) == (1, 1)
+
+
+def test_slow_calls_time_out():
+    executor = InferenceExecutor(backend="thread", max_workers=1, timeout_seconds=0.05)
+    executor.start()
+    try:
+        with pytest.raises(InferenceTimeout):
+            asyncio.run(executor.run(time.sleep, 0.5))
+    finally:
+        executor.shutdown()
+    assert executor.timeouts == 1
+
+
+def test_process_calls_carry_the_current_model_version(loaded_models, monkeypatch):
+    calls = []
+
+    class RecordingExecutor:
+        backend = "process"
+
+        async def run(self, fn, *args):
+            calls.append((fn, args))
+
+    monkeypatch.setattr(chatbot_service, "inference_executor", RecordingExecutor())
+    asyncio.run(chatbot_service._run_inference(sum, [1, 2]))
+    assert calls == [(chatbot_service._run_in_worker,
+                      (chatbot_service.INFERENCE_ENGINE, loaded_models.version, sum, [1, 2]))]
+
+
+def test_process_workers_reload_models_when_the_version_changes():
+    executor = InferenceExecutor(backend="process", max_workers=1, timeout_seconds=120,
+                                 initializer=chatbot_service.init_inference_worker, initargs=("compiled", 7))
+    executor.start()
+
+    async def worker_model_version(server_version):
+        stats = await executor.run(chatbot_service._run_in_worker, "compiled", server_version,
+                                   chatbot_service.get_inference_stats)
+        return stats["model_version"]
+
+    async def scenario():
+        # The worker's own registry counts its loads: 1 at start-up, 2 after the server reloaded
+        return [await worker_model_version(version) for version in (7, 7, 8, 8)]
+
+    try:
+        assert asyncio.run(scenario()) == [1, 1, 2, 2]
+    finally:
+        executor.shutdown()
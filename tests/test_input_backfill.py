@@ -0,0 +1,82 @@
+from sqlalchemy import insert, update
+
+from app import crud, models
+from app.services import input_backfill
+
+INPUTS = {'Salary': 120000, 'Savings': 30000, 'Lifecycle_Stage': 'Mid-Career', 'Risk_Appetite': 'High',
+          'Investment_Horizon': 'Long-term'}
+OUTPUTS = {'Equity': 60.0, 'Debt': 20.0, 'Gold': 10.0, 'FD/Cash': 10.0}
+TYPED = ("lifecycle_stage", "risk_appetite", "investment_horizon", "salary", "savings",
+         "equity_pct", "debt_pct", "gold_pct", "cash_pct", "typed_columns_version")
+
+
+def add_json_only_rows(db, live, archived=0):
+    """Rows as written before the typed columns existed."""
+    db.execute(insert(models.UserDataInput), [
+        {"user_id": 1, "model_type": "base", "input_data": INPUTS, "output_data": OUTPUTS} for _ in range(live)])
+    if archived:
+        db.execute(insert(models.UserDataInputArchive), [
+            {"id": 1000 + i, "user_id": 1, "model_type": "base", "input_data": INPUTS, "output_data": OUTPUTS} for i in range(archived)])
+    db.commit()
+
+
+def typed_values(db, model):
+    db.expire_all()
+    return [{column: getattr(row, column) for column in TYPED} for row in db.query(model).order_by(model.id)]
+
+
+def backfill(session_factory, **kwargs):
+    return input_backfill.backfill_typed_columns(pause_seconds=0, session_factory=session_factory, **kwargs)
+
+
+def test_backfill_fills_live_and_archived_rows_once(session_factory, db):
+    add_json_only_rows(db, live=5, archived=3)
+    result = backfill(session_factory, chunk_rows=2)
+    assert (result["rows_updated"], result["chunks"], result["complete"]) == (8, 5, True) # 3 live chunks, 2 archived
+
+    expected = crud.typed_columns(INPUTS, OUTPUTS)
+    assert typed_values(db, models.UserDataInput) == [expected] * 5
+    assert typed_values(db, models.UserDataInputArchive) == [expected] * 3
+    assert expected["equity_pct"] == 60.0 and expected["salary"] == 120000.0
+
+    # Idempotent: nothing left to do, and nothing changes
+    again = backfill(session_factory, chunk_rows=2)
+    assert (again["rows_updated"], again["chunks"]) == (0, 0)
+    assert typed_values(db, models.UserDataInput) == [expected] * 5
+
+
+def test_an_interrupted_backfill_carries_on_where_it_stopped(session_factory, db):
+    add_json_only_rows(db, live=5, archived=2)
+    first = backfill(session_factory, chunk_rows=2, max_chunks=2)
+    assert (first["rows_updated"], first["complete"]) == (4, False)
+    assert [row["typed_columns_version"] for row in typed_values(db, models.UserDataInput)] == [1, 1, 1, 1, None]
+
+    second = backfill(session_factory, chunk_rows=2)
+    assert (second["rows_updated"], second["complete"]) == (3, True)
+    assert backfill(session_factory)["rows_updated"] == 0
+
+
+def test_rows_of_an_older_version_are_recomputed(session_factory, db):
+    add_json_only_rows(db, live=3)
+    backfill(session_factory)
+    db.execute(update(models.UserDataInput).where(models.UserDataInput.id == 2).values(typed_columns_version=0, equity_pct=None))
+    db.commit()
+    assert backfill(session_factory)["rows_updated"] == 1
+    assert typed_values(db, models.UserDataInput)[1]["equity_pct"] == 60.0
+
+
+def test_rows_written_with_typed_columns_are_skipped(session_factory, db):
+    crud.bulk_create_user_data_inputs(db, [
+        dict(crud.typed_columns(INPUTS, OUTPUTS), user_id=1, model_type="base", input_data=INPUTS, output_data=OUTPUTS)])
+    assert backfill(session_factory)["rows_updated"] == 0
+
+
+def test_only_one_maintenance_job_at_a_time(session_factory, db):
+    add_json_only_rows(db, live=1)
+    with input_backfill.maintenance_lock:
+        assert "error" in backfill(session_factory)
+    assert backfill(session_factory)["rows_updated"] == 1
+
+    status = input_backfill.get_backfill_status()
+    assert status["current"] is None
+    assert status["last"]["rows_updated"] == 1 and status["version"] == crud.TYPED_COLUMNS_VERSION
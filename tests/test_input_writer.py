@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import crud, models, schemas
+from app.services.input_writer import BatchedInputWriter, InputWriterQueueFull
+
+ITEM = schemas.UserDataInputCreate(model_type="base", input_data={'Salary': 60000, 'Lifecycle_Stage': 'Early Career'},
+                                   output_data={'Equity': 50.0, 'Debt': 50.0})
+
+
+def stored(db):
+    db.expire_all()
+    return db.query(models.UserDataInput).order_by(models.UserDataInput.id).all()
+
+
+def test_stop_commits_records_still_queued(session_factory, db):
+    # Neither threshold is reached, so only stop() can commit them
+    writer = BatchedInputWriter(session_factory=session_factory, batch_rows=10000, flush_interval_seconds=3600)
+    writer.start()
+    for user_id in range(1, 51):
+        writer.put(BatchedInputWriter.build_record(ITEM, user_id))
+    writer.stop()
+
+    assert not writer.running
+    rows = stored(db)
+    assert [row.user_id for row in rows] == list(range(1, 51))
+    assert rows[0].equity_pct == 50.0 and rows[0].lifecycle_stage == "Early Career" # typed columns filled
+    assert (writer.rows_written, writer.transactions) == (50, 1)
+
+
+def test_flush_waits_for_earlier_records(session_factory, db):
+    writer = BatchedInputWriter(session_factory=session_factory, batch_rows=10000, flush_interval_seconds=3600)
+    writer.start()
+    for _ in range(3):
+        writer.put(BatchedInputWriter.build_record(ITEM, 1))
+    assert writer.flush(timeout=10)
+    assert len(stored(db)) == 3 and writer.running
+    writer.stop()
+
+
+def test_queued_burst_is_split_into_batches(session_factory, db):
+    writer = BatchedInputWriter(session_factory=session_factory, batch_rows=10)
+    for _ in range(25):
+        writer.put(BatchedInputWriter.build_record(ITEM, 1)) # queued before the thread starts
+    writer.start()
+    writer.stop()
+    assert len(stored(db)) == 25
+    assert (writer.transactions, writer.largest_batch) == (3, 10)
+
+
+def test_no_records_lost_under_backpressure(session_factory, db):
+    writer = BatchedInputWriter(session_factory=session_factory, max_queue_size=8, batch_rows=16,
+                                flush_interval_seconds=0.01, enqueue_timeout_seconds=30)
+    writer.start()
+
+    def produce(user_id):
+        for _ in range(100):
+            writer.put(BatchedInputWriter.build_record(ITEM, user_id))
+
+    threads = [threading.Thread(target=produce, args=(user_id,)) for user_id in range(1, 5)]
+    for thread in threads:
+        thread.start()
+
+    async def from_the_loop():
+        await asyncio.gather(*(writer.submit(BatchedInputWriter.build_record(ITEM, 5)) for _ in range(100)))
+
+    asyncio.run(from_the_loop())
+    for thread in threads:
+        thread.join()
+    writer.stop()
+
+    assert len(stored(db)) == 500
+    assert [crud.count_user_data_inputs(db, user_id) for user_id in range(1, 6)] == [100] * 5
+    assert writer.backpressure_waits > 0
+    assert (writer.dropped, writer.write_errors) == (0, 0)
+
+
+def failing_sessions(session_factory, failures):
+    """A session factory whose first `failures` sessions fail to commit, like a database that stays locked."""
+    remaining = [failures]
+
+    def factory():
+        session = session_factory()
+        if remaining[0] > 0:
+            remaining[0] -= 1
+
+            def commit():
+                raise OperationalError("INSERT", {}, Exception("database is locked"))
+            session.commit = commit
+        return session
+    return factory
+
+
+def test_failed_transactions_are_retried(session_factory, db):
+    writer = BatchedInputWriter(session_factory=failing_sessions(session_factory, 2), retry_delay_seconds=0)
+    writer.start()
+    writer.put(BatchedInputWriter.build_record(ITEM, 1))
+    writer.stop()
+    assert len(stored(db)) == 1
+    assert (writer.write_errors, writer.dropped, writer.rows_written) == (2, 0, 1)
+
+
+def test_records_are_dropped_after_max_attempts(session_factory, db):
+    writer = BatchedInputWriter(session_factory=failing_sessions(session_factory, 3), max_attempts=3, retry_delay_seconds=0)
+    writer.put(BatchedInputWriter.build_record(ITEM, 1))
+    writer.put(BatchedInputWriter.build_record(ITEM, 1))
+    writer.start() # both in one transaction
+    writer.stop()
+    assert stored(db) == []
+    assert (writer.write_errors, writer.dropped) == (3, 2)
+
+
+def test_full_queue_gives_up_after_the_timeout(session_factory):
+    writer = BatchedInputWriter(session_factory=session_factory, max_queue_size=1, enqueue_timeout_seconds=0.01)
+    writer.put(BatchedInputWriter.build_record(ITEM, 1)) # not started, so nothing drains the queue
+    with pytest.raises(InputWriterQueueFull):
+        writer.put(BatchedInputWriter.build_record(ITEM, 1))
+    assert writer.backpressure_waits == 1
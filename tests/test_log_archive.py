@@ -0,0 +1,115 @@
+import csv
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services import data_service, log_archive
+
+BASE_INPUTS = {'Salary': 60000, 'Expenses': 40000, 'Savings': 20000,
+               'Lifecycle_Stage': 'Early Career', 'Risk_Appetite': 'Medium', 'Investment_Horizon': 'Long-term'}
+ALLOCATION = {'Equity': 50.0, 'Debt': 30.0, 'Gold': 10.0, 'FD/Cash': 10.0}
+
+
+def log_row(user_id, model_type, timestamp, equity=50.0):
+    row = data_service.build_csv_row(user_id, f"user{user_id}@example.com", model_type, BASE_INPUTS,
+                                     dict(ALLOCATION, Equity=equity))
+    row[data_service.CSV_HEADERS.index('Timestamp')] = timestamp
+    return row
+
+
+def append_rows(path, rows, header=False):
+    with open(path, "a", newline='') as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(data_service.CSV_HEADERS)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "log.csv"), str(tmp_path / "archive")
+
+
+def test_rows_are_split_by_day_and_model(paths):
+    csv_path, archive_dir = paths
+    append_rows(csv_path, [
+        log_row(1, "base", "2026-08-01 09:00:00"),
+        log_row(2, "enhanced", "2026-08-01 10:00:00"),
+        log_row(3, "base", "2026-08-02 11:00:00"),
+    ], header=True)
+
+    result = log_archive.compact_csv(csv_path, archive_dir)
+    assert (result["rows"], result["partitions_written"], result["total_rows"]) == (3, 3, 3)
+    assert [(p["day"], p["model_type"]) for p in log_archive.list_partitions(archive_dir)] == [
+        ("2026-08-01", "base"), ("2026-08-01", "enhanced"), ("2026-08-02", "base")]
+
+
+def test_compaction_is_incremental(paths):
+    csv_path, archive_dir = paths
+    append_rows(csv_path, [log_row(1, "base", "2026-08-01 09:00:00")], header=True)
+    log_archive.compact_csv(csv_path, archive_dir)
+    assert log_archive.compact_csv(csv_path, archive_dir)["rows"] == 0
+
+    append_rows(csv_path, [log_row(2, "base", "2026-08-01 12:00:00"), log_row(3, "base", "2026-08-03 12:00:00")])
+    result = log_archive.compact_csv(csv_path, archive_dir)
+    assert (result["rows"], result["total_rows"]) == (2, 3)
+    frame = log_archive.read_archive(['UserID'], archive_dir=archive_dir)
+    assert frame['UserID'].tolist() == [1, 2, 3]
+
+
+def test_a_partly_written_row_waits_for_the_next_run(paths):
+    csv_path, archive_dir = paths
+    append_rows(csv_path, [log_row(1, "base", "2026-08-01 09:00:00")], header=True)
+    with open(csv_path, "a") as f:
+        f.write("2,user2@example.com,base")
+    assert log_archive.compact_csv(csv_path, archive_dir)["rows"] == 1
+
+    with open(csv_path, "a", newline='') as f:
+        f.write("," + ",".join(str(v) for v in log_row(2, "base", "2026-08-01 10:00:00")[3:]) + "\r\n")
+    assert log_archive.compact_csv(csv_path, archive_dir)["rows"] == 1
+    assert log_archive.read_archive(['UserID'], archive_dir=archive_dir)['UserID'].tolist() == [1, 2]
+
+
+def test_rebuild_and_a_shrunk_csv_start_over(paths):
+    csv_path, archive_dir = paths
+    append_rows(csv_path, [log_row(i, "base", "2026-08-01 09:00:00") for i in range(5)], header=True)
+    log_archive.compact_csv(csv_path, archive_dir)
+    assert log_archive.compact_csv(csv_path, archive_dir, rebuild=True)["total_rows"] == 5
+
+    with open(csv_path, "w"):
+        pass # rotated
+    append_rows(csv_path, [log_row(9, "enhanced", "2026-08-05 09:00:00")], header=True)
+    assert log_archive.compact_csv(csv_path, archive_dir)["total_rows"] == 1
+    assert [p["model_type"] for p in log_archive.list_partitions(archive_dir)] == ["enhanced"]
+
+
+def test_read_archive_filters_days_models_and_columns(paths):
+    csv_path, archive_dir = paths
+    append_rows(csv_path, [
+        log_row(1, "base", "2026-08-01 09:00:00", equity=10.0),
+        log_row(2, "base", "2026-08-03 09:00:00", equity=20.0),
+        log_row(3, "enhanced", "2026-08-03 08:00:00", equity=30.0),
+        log_row(4, "base", "2026-08-05 09:00:00", equity=40.0),
+    ], header=True)
+    log_archive.compact_csv(csv_path, archive_dir)
+
+    frame = log_archive.read_archive(['UserID', 'Equity (%)'], start=date(2026, 8, 2), end=date(2026, 8, 4),
+                                     model_types=['base'], archive_dir=archive_dir)
+    assert list(frame.columns) == ['UserID', 'Equity (%)']
+    assert frame.to_dict('records') == [{'UserID': 2, 'Equity (%)': 20.0}]
+
+    # Every row, back in time order across partitions, with typed columns
+    frame = log_archive.read_archive(['UserID', 'Timestamp', 'Salary', 'City'], archive_dir=archive_dir)
+    assert frame['UserID'].tolist() == [1, 3, 2, 4]
+    assert frame['Salary'].tolist() == [60000.0] * 4
+    assert frame['Timestamp'].iloc[0] == np.datetime64('2026-08-01T09:00:00')
+    assert frame['City'].tolist() == [''] * 4 # blank for the base model, so never stored
+
+    with pytest.raises(ValueError):
+        log_archive.read_archive(['NoSuchColumn'], archive_dir=archive_dir)
+
+
+def test_empty_archive_reads_as_an_empty_frame(tmp_path):
+    frame = log_archive.read_archive(['UserID', 'Equity (%)'], archive_dir=str(tmp_path / "missing"))
+    assert len(frame) == 0 and list(frame.columns) == ['UserID', 'Equity (%)']
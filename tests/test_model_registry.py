@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from app.services.model_registry import ModelRegistry, ModelVersion
+
+
+def build_version(version):
+    return ModelVersion(version, base_pipeline={"name": f"base v{version}"}, enhanced_pipeline=None)
+
+
+def test_load_publishes_versions_in_order_and_notifies_listeners():
+    swapped = []
+    registry = ModelRegistry(build=build_version, warm_up=lambda candidate, current: None,
+                             on_swap=[lambda models: swapped.append(models.version)])
+    registry.load()
+    registry.load()
+    assert registry.current.version == 2 and swapped == [1, 2]
+    assert registry.last_reload["status"] == "succeeded"
+
+
+def test_rejected_candidate_keeps_the_current_version():
+    rejecting = [False]
+
+    def warm_up(candidate, current):
+        if rejecting[0]:
+            raise ValueError("predictions differ too much")
+
+    registry = ModelRegistry(build=build_version, warm_up=warm_up)
+    serving = registry.load()
+    rejecting[0] = True
+    with pytest.raises(ValueError):
+        registry.load()
+    assert registry.current is serving
+    assert registry.last_reload["status"] == "failed" and registry.last_reload["version"] == 2
+    # The rejected number is reused by the next attempt
+    rejecting[0] = False
+    assert registry.load().version == 2
+
+
+def test_a_failing_listener_does_not_undo_the_swap():
+    def broken_listener(models):
+        raise RuntimeError("listener bug")
+
+    registry = ModelRegistry(build=build_version, warm_up=lambda candidate, current: None, on_swap=[broken_listener])
+    assert registry.load() is registry.current
+
+
+def test_only_one_background_reload_runs_at_a_time():
+    release = threading.Event()
+
+    def slow_build(version):
+        release.wait(5)
+        return build_version(version)
+
+    registry = ModelRegistry(build=slow_build, warm_up=lambda candidate, current: None)
+    assert registry.reload_in_background()
+    assert not registry.reload_in_background()
+    assert registry.status()["reloading"]
+    release.set()
+    registry.wait_for_reload(5)
+    assert registry.current.version == 1 and not registry.reloading
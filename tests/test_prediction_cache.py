@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import prediction_cache
+from app.services.prediction_cache import PredictionCache
+
+
+def test_hit_returns_a_copy_of_the_stored_value():
+    cache = PredictionCache()
+    assert cache.get_or_compute("k", lambda: {"Equity": 50.0}) == {"Equity": 50.0}
+    value = cache.get_or_compute("k", lambda: pytest.fail("computed twice"))
+    value["Equity"] = 0
+    assert cache.get("k") == {"Equity": 50.0}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = PredictionCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"Equity": 1.0}
+
+    with ThreadPoolExecutor(4) as pool:
+        owner = pool.submit(cache.get_or_compute, "k", compute)
+        started.wait(5)
+        waiters = [pool.submit(cache.get_or_compute, "k", compute) for _ in range(3)]
+        while cache.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [owner.result()] + [w.result() for w in waiters]
+
+    assert calls == [1]
+    assert results == [{"Equity": 1.0}] * 4
+    assert (cache.misses, cache.coalesced) == (1, 3)
+
+
+def test_failed_computation_reaches_every_waiter_and_is_not_stored():
+    cache = PredictionCache()
+    with pytest.raises(ValueError):
+        cache.get_or_compute("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert cache.get_or_compute("k", lambda: {"error": "bad input"}) == {"error": "bad input"}
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    cache.get("a")
+    cache.put("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1} and cache.get("c") == {"v": 3}
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(ttl_seconds=10)
+    cache.put("k", {"v": 1})
+    now[0] += 9
+    assert cache.get("k") == {"v": 1}
+    now[0] += 2
+    assert cache.get("k") is None
+    assert cache.expirations == 1
+
+
+def test_results_computed_before_clear_are_not_stored():
+    cache = PredictionCache()
+    # A reload clears the cache while a prediction against the old models is running
+    assert cache.get_or_compute("k", lambda: (cache.clear(), {"v": "old"})[1]) == {"v": "old"}
+    assert cache.get("k") is None
+
+
+def test_async_callers_share_one_computation():
+    cache = PredictionCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"Equity": 1.0}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute_async("k", compute) for _ in range(4)))
+
+    assert asyncio.run(scenario()) == [{"Equity": 1.0}] * 4
+    assert calls == [1]
+    assert (cache.misses, cache.coalesced) == (1, 3)
+    assert cache.get("k") == {"Equity": 1.0}
+
+
+def test_cancelling_the_first_async_caller_does_not_fail_the_others():
+    cache = PredictionCache()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return {"Equity": 1.0}
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.get_or_compute_async("k", compute))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_compute_async("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(scenario()) == ({"Equity": 1.0}, True)
+    assert cache.get("k") == {"Equity": 1.0}
+
+
+def test_async_errors_reach_every_caller_and_are_not_stored():
+    cache = PredictionCache()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute_async("k", compute) for _ in range(3)),
+                                    return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(scenario()))
+    assert cache.get("k") is None
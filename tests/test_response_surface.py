@@ -0,0 +1,135 @@
+import joblib
+import numpy as np
+import pytest
+
+from app import schemas
+from app.services import chatbot_service
+from app.services.featurizer import build_base_featurizer
+from app.services.response_surface import ResponseSurface, build_surface, load_surface, save_surface, surface_path_for
+
+AMOUNT_RANGES = {"Salary": (10000.0, 1000000.0), "Expenses": (5000.0, 500000.0), "Savings": (1000.0, 250000.0)}
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return joblib.load(chatbot_service.BASE_MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def categories(pipeline):
+    mappings = pipeline['mappings']
+    return [('Lifecycle_Stage', list(mappings['lifecycle'])), ('Risk_Appetite', list(mappings['risk'])),
+            ('Investment_Horizon', list(mappings['horizon']))]
+
+
+def template(categories):
+    return schemas.BaseModeInputSchema(
+        Salary=0.0, Expenses=0.0, Savings=0.0, Lifecycle_Stage=categories[0][1][0],
+        Risk_Appetite=categories[1][1][0], Investment_Horizon=categories[2][1][0])
+
+
+def multilinear_score(X):
+    """Outputs that are multilinear in the log amounts, so interpolating in log space reproduces them exactly."""
+    salary, expenses, savings = np.log(X[:, 0]), np.log(X[:, 1]), np.log(X[:, 2])
+    categories = X[:, 3] + 10 * X[:, 4] + 100 * X[:, 5]
+    return np.column_stack([salary + categories, salary * expenses, expenses * savings - categories, salary * expenses * savings])
+
+
+@pytest.fixture(scope="module")
+def surface(pipeline, categories):
+    return build_surface(build_base_featurizer(pipeline), multilinear_score, template(categories), categories, AMOUNT_RANGES, 2)
+
+
+def random_items(categories, n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def log_uniform(field):
+        low, high = AMOUNT_RANGES[field]
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+
+    return [
+        schemas.BaseModeInputSchema(
+            Salary=log_uniform("Salary"), Expenses=log_uniform("Expenses"), Savings=log_uniform("Savings"),
+            Lifecycle_Stage=str(rng.choice(categories[0][1])), Risk_Appetite=str(rng.choice(categories[1][1])),
+            Investment_Horizon=str(rng.choice(categories[2][1])))
+        for _ in range(n)
+    ]
+
+
+def test_grid_shape_follows_points_per_decade(surface, categories):
+    # two decades at 2 points per decade -> 5 points; log10(250) * 2 rounds up to 5 -> 6 points
+    assert [n for *_, n in surface.amounts] == [5, 5, 6]
+    assert surface.values.shape == tuple(len(labels) for _, labels in categories) + (5, 5, 6, 4)
+
+
+def test_lookups_interpolate_exactly_between_grid_points(pipeline, surface, categories):
+    items = random_items(categories, 200)
+    expected = multilinear_score(build_base_featurizer(pipeline).transform(items)[0])
+    out, covered = surface.lookup(items)
+    assert covered.all()
+    np.testing.assert_allclose(out, expected, rtol=1e-9)
+    single = np.asarray([surface.lookup_one(item) for item in items])
+    np.testing.assert_allclose(single, out, rtol=0, atol=1e-9)
+
+
+def test_lookup_hits_the_grid_bounds(pipeline, surface, categories):
+    low = template(categories).copy(update={"Salary": 10000.0, "Expenses": 5000.0, "Savings": 1000.0})
+    high = low.copy(update={"Salary": 1000000.0, "Expenses": 500000.0, "Savings": 250000.0})
+    expected = multilinear_score(build_base_featurizer(pipeline).transform([low, high])[0])
+    out, covered = surface.lookup([low, high])
+    assert covered.all()
+    np.testing.assert_allclose(out, expected, rtol=1e-9)
+    np.testing.assert_allclose(surface.lookup_one(high), expected[1], rtol=1e-9)
+
+
+def test_rows_outside_the_grid_are_not_covered(categories):
+    surface = ResponseSurface(categories, [(f, low, high, 3) for f, (low, high) in AMOUNT_RANGES.items()],
+                              np.zeros(tuple(len(labels) for _, labels in categories) + (3, 3, 3, 1)))
+    inside = template(categories).copy(update={"Salary": 50000.0, "Expenses": 20000.0, "Savings": 5000.0})
+    outside = [
+        inside.copy(update={"Salary": 9999.0}),
+        inside.copy(update={"Savings": 250001.0}),
+        inside.copy(update={"Expenses": 0.0}),
+        inside.copy(update={"Risk_Appetite": "Reckless"}),
+    ]
+    _, covered = surface.lookup([inside] + outside)
+    assert covered.tolist() == [True, False, False, False, False]
+    assert surface.lookup_one(inside) is not None
+    assert all(surface.lookup_one(item) is None for item in outside)
+    assert (surface.hits, surface.fallbacks) == (2, 8)
+    assert surface.info()["hits"] == 2
+
+
+def test_save_and_load_round_trip(tmp_path, surface, categories):
+    path = surface_path_for(str(tmp_path / "model.pkl"))
+    assert path == str(tmp_path / "model.surface.npy")
+    save_surface(surface, path, {"size": 123})
+    loaded, source = load_surface(path)
+    assert source == {"size": 123}
+    assert loaded.categories == surface.categories
+    assert loaded.amounts == surface.amounts
+    items = random_items(categories, 50, seed=1)
+    np.testing.assert_array_equal(loaded.lookup(items)[0], surface.lookup(items)[0])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["model.surface.json", "model.surface.npy"]
+
+
+def test_load_rejects_an_array_that_does_not_match_its_grid(tmp_path, surface):
+    path = str(tmp_path / "model.surface.npy")
+    save_surface(surface, path)
+    np.save(path, np.zeros((2, 2)))
+    with pytest.raises(ValueError):
+        load_surface(path)
+
+
+def test_base_surface_matches_the_model_on_grid_points(loaded_models, categories, monkeypatch):
+    monkeypatch.setattr(chatbot_service, "RESPONSE_SURFACE_POINTS_PER_DECADE", 1)
+    surface = chatbot_service.build_base_surface(loaded_models)
+    grid = {field: ResponseSurface.grid(low, high, n) for field, low, high, n in surface.amounts}
+    items = random_items(categories, 30, seed=2)
+    items = [item.copy(update={field: float(values[i % len(values)]) for field, values in grid.items()})
+             for i, item in enumerate(items)]
+    X = loaded_models.base_featurizer.transform(items)[0]
+    exact = chatbot_service._predict_raw(loaded_models.base_pipeline, loaded_models.base_engine, X)
+    out, covered = surface.lookup(items)
+    assert covered.all()
+    np.testing.assert_allclose(out, exact, rtol=1e-9, atol=1e-9)
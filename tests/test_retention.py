@@ -0,0 +1,102 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app import crud, models
+from app.services import retention
+from app.services.input_backfill import maintenance_lock
+
+NOW = datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def add_inputs(db, ages_in_days, user_id=1):
+    """One input per age, in insertion (id) order."""
+    crud.bulk_create_user_data_inputs(db, [
+        {"user_id": user_id, "model_type": "base", "input_data": {"Salary": 1000 * i}, "timestamp": NOW - timedelta(days=age)}
+        for i, age in enumerate(ages_in_days)
+    ])
+
+
+def live_and_archived_ids(db):
+    db.expire_all()
+    live = [row.id for row in db.query(models.UserDataInput).order_by(models.UserDataInput.id)]
+    archived = [row.id for row in db.query(models.UserDataInputArchive).order_by(models.UserDataInputArchive.id)]
+    return live, archived
+
+
+def archive(session_factory, **kwargs):
+    return retention.archive_old_inputs(**{"retention_days": 30, "pause_seconds": 0, "session_factory": session_factory, **kwargs})
+
+
+def test_old_inputs_move_to_the_archive_in_chunks(session_factory, db):
+    add_inputs(db, [400, 200, 100, 50, 10, 1, 35], user_id=1)
+    add_inputs(db, [90, 5], user_id=2)
+    result = archive(session_factory, chunk_rows=2)
+    assert (result["rows_archived"], result["chunks"], result["running"]) == (6, 3, False)
+    assert live_and_archived_ids(db) == ([5, 6, 9], [1, 2, 3, 4, 7, 8])
+
+    # Rows keep their ids and contents, and the maintained counts follow the move
+    moved = db.get(models.UserDataInputArchive, 2)
+    assert (moved.user_id, moved.input_data) == (1, {"Salary": 1000})
+    assert (crud.count_user_data_inputs(db), crud.count_user_data_inputs(db, archived=True)) == (3, 6)
+    assert [crud.count_user_data_inputs(db, user_id) for user_id in (1, 2)] == [2, 1]
+
+
+def test_oldest_inputs_go_first_and_an_interrupted_run_carries_on(session_factory, db):
+    # Out of id order, as after a clock change; the newest id stays live whatever its age
+    add_inputs(db, [60, 300, 40, 200, 100, 500])
+    first = archive(session_factory, chunk_rows=2, max_chunks=1)
+    assert first["rows_archived"] == 2
+    assert live_and_archived_ids(db) == ([1, 3, 5, 6], [2, 4])
+
+    second = archive(session_factory, chunk_rows=2)
+    assert (second["rows_archived"], second["chunks"]) == (3, 2)
+    assert live_and_archived_ids(db) == ([6], [1, 2, 3, 4, 5])
+
+    # Idempotent: nothing left to move
+    again = archive(session_factory)
+    assert (again["rows_archived"], again["chunks"]) == (0, 0)
+    assert crud.count_user_data_inputs(db) + crud.count_user_data_inputs(db, archived=True) == 6
+
+
+def test_new_inputs_never_reuse_archived_ids(session_factory, db):
+    add_inputs(db, [100, 100, 100])
+    archive(session_factory)
+    add_inputs(db, [0])
+    assert live_and_archived_ids(db) == ([3, 4], [1, 2])
+
+
+def test_archived_inputs_are_read_from_the_archive(session_factory, db):
+    add_inputs(db, [100, 80, 60, 20, 10])
+    archive(session_factory)
+    items, cursor = crud.get_user_data_inputs_page(db, user_id=1, limit=10, archived=True)
+    assert [item.id for item in items] == [3, 2, 1] and cursor is None
+    assert [item.id for item in crud.get_user_data_inputs_page(db, user_id=1, limit=10)[0]] == [5, 4]
+
+
+def test_only_one_maintenance_job_at_a_time(session_factory, db):
+    add_inputs(db, [100, 1])
+    with maintenance_lock:
+        assert "error" in archive(session_factory)
+    assert live_and_archived_ids(db) == ([1, 2], [])
+    assert archive(session_factory)["rows_archived"] == 1
+
+    status = retention.get_retention_status()
+    assert status["current"] is None
+    assert status["last"]["rows_archived"] == 1
+
+
+def test_nothing_is_archived_without_a_retention_period(session_factory, db):
+    add_inputs(db, [1000, 1])
+    assert "error" in retention.archive_old_inputs(session_factory=session_factory)
+    assert live_and_archived_ids(db) == ([1, 2], [])
+
+
+def test_a_stopping_job_leaves_the_rest_for_the_next_run(session_factory, db, monkeypatch):
+    add_inputs(db, [100, 90, 1])
+    stop = threading.Event()
+    stop.set()
+    monkeypatch.setattr(retention, "_retention_stop", stop)
+    assert archive(session_factory, chunk_rows=1)["rows_archived"] == 0
+
+    monkeypatch.setattr(retention, "_retention_stop", None)
+    assert archive(session_factory, chunk_rows=1)["rows_archived"] == 2
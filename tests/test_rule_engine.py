@@ -0,0 +1,89 @@
+import contextlib
+import io
+
+import pytest
+
+from Reference import rulebasedmodel as reference
+from app.services import rule_engine
+
+# The app has always shown shorter asset labels and tips than the reference script; apart from
+# these, every label and text of the compiled table is a prefix of the reference wording
+REWORDED = {
+    "- Aims for a balance between growth (equity) and stability (debt, gold).":
+        "- Aims for a balance between growth and stability.",
+    "- Get Adequately Insured: Ensure you have sufficient health insurance for yourself and your family. "
+    "If you have dependents, a term life insurance policy is crucial.":
+        "- Get Adequately Insured: Health and Term Life Insurance are crucial.",
+    "- Invest Regularly & Be Disciplined: Consistency through SIPs (Systematic Investment Plans) is key, "
+    "especially for long-term goals. Don't try to time the market.":
+        "- Invest Regularly & Be Disciplined (e.g. SIPs).",
+    "- Review Periodically: Revisit your financial plan and investments at least annually, "
+    "or when major life events occur (marriage, new job, child, etc.).":
+        "- Review Periodically: Revisit your financial plan annually or on major life events.",
+    "- Understand Your Investments: Before investing in any product, understand its risks, "
+    "costs (like expense ratios for MFs), and how it fits your goals.":
+        "- Understand Your Investments: Know the risks and costs.",
+}
+
+# Intended deviation: the reference only gives the healthcare tip to "Late Career/Pre-Retirement",
+# a stage the app's form calls "Late Career"
+HEALTHCARE_TIP = "- Plan for healthcare expenses in retirement."
+
+# Saves 33.3% of the salary, above the reference's extra under-15% tip
+PROFILE = {"Annual_Salary_Package": 900000.0, "Monthly_In_hand_Salary": 60000.0, "Total_Monthly_Expenses": 40000.0}
+
+
+def same_text(app_text, reference_text):
+    if reference_text in REWORDED:
+        return app_text == REWORDED[reference_text]
+    return reference_text.lower().startswith(app_text.rstrip(".)").lower())
+
+
+def reference_tips(lifecycle, monthly_savings, salary):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        reference.provide_general_financial_tips(lifecycle, monthly_savings, salary)
+    return [line[2:] for line in out.getvalue().splitlines() if line.startswith("* ")]
+
+
+@pytest.mark.parametrize("risk, horizon, lifecycle", list(rule_engine.RULE_TABLE))
+def test_matches_the_reference_script(risk, horizon, lifecycle):
+    profile = dict(PROFILE, Risk_Appetite=risk, Investment_Horizon=horizon, Lifecycle_Stage=lifecycle)
+    allocation, justification, tips = rule_engine.evaluate(profile)
+    savings = profile["Monthly_In_hand_Salary"] - profile["Total_Monthly_Expenses"]
+    # The reference works on lowercase risk and horizon values
+    expected_allocation, expected_justification = reference.allocate_savings_simplified(
+        savings, risk.lower(), horizon.lower(), lifecycle)
+    expected_tips = reference_tips(lifecycle, savings, profile["Monthly_In_hand_Salary"])
+    if lifecycle == "Late Career":
+        expected_tips.append(HEALTHCARE_TIP)
+
+    assert list(allocation.values()) == [round(share * 100, 1) for share in expected_allocation.values()]
+    assert all(same_text(label, expected) for label, expected in zip(allocation, expected_allocation))
+    assert len(justification) == len(expected_justification)
+    assert all(same_text(point, expected) for point, expected in zip(justification, expected_justification))
+    assert len(tips) == len(expected_tips)
+    assert all(same_text(tip, expected) for tip, expected in zip(tips, expected_tips))
+
+
+def test_batch_matches_single_evaluation():
+    profiles = [dict(PROFILE, Risk_Appetite=risk, Investment_Horizon=horizon, Lifecycle_Stage=lifecycle)
+                for risk, horizon, lifecycle in rule_engine.RULE_TABLE]
+    assert rule_engine.evaluate_batch(profiles) == [rule_engine.evaluate(profile) for profile in profiles]
+
+
+def test_no_savings_gets_budgeting_advice():
+    profile = dict(PROFILE, Risk_Appetite="Low", Investment_Horizon="Short-term", Lifecycle_Stage="Student",
+                   Total_Monthly_Expenses=70000.0)
+    allocation, justification, tips = rule_engine.evaluate(profile)
+    assert allocation == dict(rule_engine.NO_SAVINGS_ALLOCATION)
+    assert tips[:2] == [rule_engine.NO_SAVINGS_PRIORITY_TIP, rule_engine.BUDGET_TIP]
+    assert same_text(tips[1], reference_tips("Student", -10000.0, 60000.0)[0])
+
+
+def test_unknown_risk_gets_an_empty_allocation():
+    # Intended deviation: the reference divides by the zero total of an empty allocation
+    with pytest.raises(ZeroDivisionError):
+        reference.allocate_savings_simplified(20000.0, "unknown", "long-term", "Student")
+    profile = dict(PROFILE, Risk_Appetite="Unknown", Investment_Horizon="Long-term", Lifecycle_Stage="Student")
+    assert rule_engine.evaluate(profile)[0] == {}
@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_active_user
+from app.main import app
+
+RULE_INPUTS = {"Lifecycle_Stage": "Early Career", "Risk_Appetite": "Medium", "Investment_Horizon": "Long-term",
+               "Annual_Salary_Package": 900000, "Monthly_In_hand_Salary": 60000, "Total_Monthly_Expenses": 30000}
+
+
+@pytest.fixture
+def client():
+    # No `with`: the startup handlers (database, writers, models) are not needed to validate requests
+    app.dependency_overrides[get_current_active_user] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("sweep", [
+    {"Monthly_In_hand_Salary": {"start": 40000, "stop": 80000, "steps": 0}},
+    # Two negative step counts used to multiply to a positive point count
+    {"Monthly_In_hand_Salary": {"start": 40000, "stop": 80000, "steps": -3},
+     "Total_Monthly_Expenses": {"start": 10000, "stop": 30000, "steps": -3}},
+])
+def test_ranges_without_steps_are_rejected(client, sweep):
+    response = client.post("/api/chatbot/sweep", json={"model_type": "rule_based", "inputs": RULE_INPUTS, "sweep": sweep})
+    assert response.status_code == 422
+
+
+def test_a_single_step_range_is_one_point(client):
+    response = client.post("/api/chatbot/sweep", json={
+        "model_type": "rule_based", "inputs": RULE_INPUTS,
+        "sweep": {"Monthly_In_hand_Salary": {"start": 40000, "stop": 80000, "steps": 1},
+                  "Risk_Appetite": ["Low", "High"]}})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["shape"] == [1, 2] and body["error_count"] == 0
+    assert body["axes"]["Monthly_In_hand_Salary"] == [40000.0]